@@ -0,0 +1,136 @@
+"""
+================================================================================
+Local Stub of the Anthropic Messages Endpoint
+================================================================================
+Answers POST /v1/messages with canned summaries so github_sync's single and
+batched summarization paths can be exercised offline. Batched prompts (READMEs
+wrapped in <readme id="..."> tags) get a JSON array back; single prompts get
+the {"high_level", "detailed"} object.
+
+--drop-rate omits a fraction of batch entries and --garble-rate returns
+unparseable text, to exercise the per-repo fallback.
+
+Usage:
+    python backend/benchmarks/anthropic_stub.py [--port 8787] [--latency 0.5]
+    ANTHROPIC_API_URL=http://127.0.0.1:8787/v1/messages  (in the sync's env)
+================================================================================
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+README_ID = re.compile(r'<readme id="([^"]+)">')
+
+
+class StubState:
+    """Behaviour knobs and request counters shared by all handler threads"""
+
+    def __init__(self, latency=0.0, drop_rate=0.0, garble_rate=0.0):
+        self.latency = latency
+        self.drop_rate = drop_rate
+        self.garble_rate = garble_rate
+        self.requests = 0
+        self.batched_requests = 0
+        self.entries = 0
+        self.batch_ids = []  # the readme ids of each batched prompt
+        self.lock = threading.Lock()
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'batched_requests': self.batched_requests,
+            'entries': self.entries
+        }
+
+
+def summary(readme_id):
+    return {
+        'high_level': f'Stub summary of {readme_id}.',
+        'detailed': f'Stub detailed summary of {readme_id}. Generated offline.'
+    }
+
+
+def reply_text(prompt, state):
+    """Build the assistant text for a prompt, counting what was asked for"""
+    ids = README_ID.findall(prompt)
+    with state.lock:
+        state.requests += 1
+        state.batched_requests += bool(ids)
+        state.entries += len(ids) or 1
+        if ids:
+            state.batch_ids.append(ids)
+
+    if random.random() < state.garble_rate:
+        return 'Sorry, I cannot produce JSON right now.'
+    if not ids:
+        return json.dumps(summary('readme'))
+
+    entries = [dict(summary(i), id=i) for i in ids if random.random() >= state.drop_rate]
+    return 'Here are the summaries:\n' + json.dumps(entries)
+
+
+def make_handler(state):
+    class MessagesHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out as separate writes; don't let Nagle hold the body
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            prompt = body['messages'][0]['content']
+            if state.latency:
+                time.sleep(state.latency)
+
+            payload = json.dumps({
+                'type': 'message',
+                'role': 'assistant',
+                'model': body.get('model'),
+                'stop_reason': 'end_turn',
+                'content': [{'type': 'text', 'text': reply_text(prompt, state)}]
+            }).encode('utf-8')
+
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MessagesHandler
+
+
+def serve(port=0, **options):
+    """Start the stub on a background thread; returns (server, state)"""
+    state = StubState(**options)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(state))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, state
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8787)
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds to wait per request')
+    parser.add_argument('--drop-rate', type=float, default=0.0, help='Fraction of batch entries omitted')
+    parser.add_argument('--garble-rate', type=float, default=0.0, help='Fraction of unparseable replies')
+    args = parser.parse_args()
+
+    server, state = serve(args.port, latency=args.latency,
+                          drop_rate=args.drop_rate, garble_rate=args.garble_rate)
+    print(f'Stub messages endpoint on http://127.0.0.1:{server.server_port}/v1/messages')
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print(json.dumps(state.stats()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,478 @@
+"""
+================================================================================
+Local DynamoDB and Secrets Manager Stand-In
+================================================================================
+An in-memory server speaking the AWS JSON protocol for the operations the
+Lambdas use, so the real boto3 code paths run offline:
+
+    DynamoDB:        GetItem, PutItem, UpdateItem (SET), DeleteItem, Query
+                     (hash-key equality on a GSI), Scan (segmented, 1 MB
+                     pages), BatchGetItem, BatchWriteItem
+    Secrets Manager: GetSecretValue, BatchGetSecretValue
+
+Tables follow terraform/modules/database (keys and list indexes). Item
+expressions are limited to what db_client builds. Consumed capacity is
+estimated from item sizes the way DynamoDB bills it (4 KB read units, 1 KB
+write units) and returned when ReturnConsumedCapacity is set.
+
+--unprocessed-rate leaves a fraction of batch keys/items unprocessed, to
+exercise the retry paths.
+
+Usage:
+    python backend/benchmarks/aws_stub.py [--port 8789] [--latency 0.002]
+        [--secret github-token='{"token": "x"}']
+    AWS_ENDPOINT_URL_DYNAMODB=http://127.0.0.1:8789
+    AWS_ENDPOINT_URL_SECRETS_MANAGER=http://127.0.0.1:8789
+================================================================================
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import random
+import re
+import threading
+import time
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Table name suffix -> key schema, as in terraform/modules/database
+TABLE_SCHEMAS = {
+    'github-repos': {'key': 'repo_id', 'indexes': {'stars-index': ('list_pk', 'stars')}},
+    'medium-posts': {'key': 'post_id', 'indexes': {'published-index': ('list_pk', 'published_date')}},
+    'youtube-videos': {'key': 'video_id', 'indexes': {'published-index': ('list_pk', 'published_date')}},
+    'sync-metadata': {'key': 'service_name', 'indexes': {}},
+    'summary-cache': {'key': 'summary_key', 'indexes': {}}
+}
+
+# Environment variable the Lambdas read each table name from
+TABLE_ENV = {
+    'GITHUB_REPOS_TABLE': 'github-repos',
+    'MEDIUM_POSTS_TABLE': 'medium-posts',
+    'YOUTUBE_VIDEOS_TABLE': 'youtube-videos',
+    'SYNC_METADATA_TABLE': 'sync-metadata',
+    'SUMMARY_CACHE_TABLE': 'summary-cache'
+}
+
+SCAN_PAGE_BYTES = 1024 * 1024
+BATCH_GET_MAX = 100
+BATCH_WRITE_MAX = 25
+SECRET_ARN_PREFIX = 'arn:aws:secretsmanager:us-east-1:000000000000:secret:'
+
+ASSIGNMENT = re.compile(r'^\s*(#?\w+)\s*=\s*(:\w+)\s*$')
+
+
+class ClientError(Exception):
+    """Answered as a 400 with the given AWS error type"""
+
+    def __init__(self, error_type, message):
+        self.error_type = error_type
+        super().__init__(message)
+
+
+def table_env(prefix='bench'):
+    """Environment mapping each table variable to its stub table name"""
+    return {env: f'{prefix}-{suffix}' for env, suffix in TABLE_ENV.items()}
+
+
+def item_size(item):
+    """Approximate DynamoDB item size in bytes"""
+    return sum(len(name) + len(json.dumps(value)) for name, value in item.items())
+
+
+def sort_value(value):
+    """Comparable Python value for an AttributeValue (index range keys)"""
+    if 'N' in value:
+        return Decimal(value['N'])
+    return next(iter(value.values()))
+
+
+class Table:
+    def __init__(self, name, key, indexes):
+        self.name = name
+        self.key = key
+        self.indexes = indexes
+        self.items = {}
+
+    def item_key(self, key):
+        if set(key) != {self.key}:
+            raise ClientError('ValidationException',
+                              'The provided key element does not match the schema')
+        return json.dumps(key[self.key], sort_keys=True)
+
+    def check_index_keys(self, item):
+        """Reject empty strings in index key attributes, as DynamoDB does"""
+        for attributes in self.indexes.values():
+            for name in attributes:
+                if item.get(name) == {'S': ''}:
+                    raise ClientError('ValidationException',
+                                      'One or more parameter values are not valid. A value specified for '
+                                      'a secondary index key is not supported. The AttributeValue for a '
+                                      f'key attribute cannot contain an empty string value. Key: {name}')
+
+
+class AwsStub:
+    """Tables, secrets, behaviour knobs and request counters"""
+
+    def __init__(self, prefix='bench', secrets=None, latency=0.0, unprocessed_rate=0.0):
+        self.tables = {}
+        for suffix, schema in TABLE_SCHEMAS.items():
+            name = f'{prefix}-{suffix}'
+            self.tables[name] = Table(name, schema['key'], schema['indexes'])
+        self.secrets = dict(secrets or {})
+        self.latency = latency
+        self.unprocessed_rate = unprocessed_rate
+        self.operations = {'dynamodb': {}, 'secretsmanager': {}}
+        self.read_units = 0.0
+        self.write_units = 0.0
+        self.lock = threading.Lock()
+
+    # ------------------------------------------------------------------------
+    # Dispatch
+    # ------------------------------------------------------------------------
+
+    def handle(self, target, body):
+        service, _, operation = target.partition('.')
+        service = 'secretsmanager' if service == 'secretsmanager' else 'dynamodb'
+        handler = getattr(self, f'{service}_{operation}', None)
+        if handler is None:
+            raise ClientError('UnknownOperationException', f'{target} is not supported')
+
+        with self.lock:
+            counts = self.operations[service]
+            counts[operation] = counts.get(operation, 0) + 1
+        if self.latency:
+            time.sleep(self.latency)
+        with self.lock:
+            return handler(body)
+
+    def table(self, name):
+        table = self.tables.get(name)
+        if table is None:
+            raise ClientError('ResourceNotFoundException', f'Requested resource not found: {name}')
+        return table
+
+    def consumed(self, body, table_name, units, reads=True):
+        """Account capacity and return the ConsumedCapacity entry if requested"""
+        if reads:
+            self.read_units += units
+        else:
+            self.write_units += units
+        if body.get('ReturnConsumedCapacity', 'NONE') == 'NONE':
+            return None
+        return {'TableName': table_name, 'CapacityUnits': units}
+
+    @staticmethod
+    def read_units_for(size, consistent=False):
+        return max(1, math.ceil(size / 4096)) * (1.0 if consistent else 0.5)
+
+    @staticmethod
+    def write_units_for(size):
+        return float(max(1, math.ceil(size / 1024)))
+
+    @staticmethod
+    def names(body):
+        return body.get('ExpressionAttributeNames') or {}
+
+    def project(self, item, body):
+        expression = body.get('ProjectionExpression')
+        if not expression:
+            return item
+        names = self.names(body)
+        fields = [names.get(part.strip(), part.strip()) for part in expression.split(',')]
+        return {field: item[field] for field in fields if field in item}
+
+    @staticmethod
+    def respond(response, consumed):
+        if consumed is not None:
+            response['ConsumedCapacity'] = consumed
+        return response
+
+    # ------------------------------------------------------------------------
+    # Single-item operations
+    # ------------------------------------------------------------------------
+
+    def dynamodb_GetItem(self, body):
+        table = self.table(body['TableName'])
+        item = table.items.get(table.item_key(body['Key']))
+        units = self.read_units_for(item_size(item) if item else 0, body.get('ConsistentRead'))
+        response = {'Item': self.project(item, body)} if item else {}
+        return self.respond(response, self.consumed(body, table.name, units))
+
+    def dynamodb_PutItem(self, body):
+        table = self.table(body['TableName'])
+        item = body['Item']
+        table.check_index_keys(item)
+        table.items[table.item_key({table.key: item[table.key]})] = item
+        return self.respond({}, self.consumed(body, table.name, self.write_units_for(item_size(item)), False))
+
+    def dynamodb_DeleteItem(self, body):
+        table = self.table(body['TableName'])
+        item = table.items.pop(table.item_key(body['Key']), None)
+        units = self.write_units_for(item_size(item) if item else 0)
+        return self.respond({}, self.consumed(body, table.name, units, False))
+
+    def dynamodb_UpdateItem(self, body):
+        table = self.table(body['TableName'])
+        expression = body.get('UpdateExpression', '')
+        if not expression.startswith('SET '):
+            raise ClientError('ValidationException', f'Unsupported UpdateExpression: {expression}')
+
+        names, values = self.names(body), body.get('ExpressionAttributeValues') or {}
+        key = table.item_key(body['Key'])
+        item = dict(table.items.get(key) or body['Key'])
+        for assignment in expression[4:].split(','):
+            match = ASSIGNMENT.match(assignment)
+            if not match:
+                raise ClientError('ValidationException', f'Unsupported assignment: {assignment}')
+            item[names.get(match.group(1), match.group(1))] = values[match.group(2)]
+        table.check_index_keys(item)
+        table.items[key] = item
+        return self.respond({}, self.consumed(body, table.name, self.write_units_for(item_size(item)), False))
+
+    # ------------------------------------------------------------------------
+    # Multi-item operations
+    # ------------------------------------------------------------------------
+
+    def dynamodb_Query(self, body):
+        table = self.table(body['TableName'])
+        index = table.indexes.get(body.get('IndexName'))
+        if index is None:
+            raise ClientError('ValidationException', 'Query is only supported on a list index')
+        hash_key, range_key = index
+
+        match = ASSIGNMENT.match(body['KeyConditionExpression'])
+        if not match or self.names(body).get(match.group(1), match.group(1)) != hash_key:
+            raise ClientError('ValidationException', 'Only hash key equality is supported')
+        hash_value = body['ExpressionAttributeValues'][match.group(2)]
+
+        # Sparse index: items missing either index key are not in it
+        rows = [item for item in table.items.values()
+                if item.get(hash_key) == hash_value and range_key in item]
+        rows.sort(key=lambda item: (sort_value(item[range_key]), json.dumps(item[table.key])),
+                  reverse=not body.get('ScanIndexForward', True))
+
+        start = 0
+        if body.get('ExclusiveStartKey'):
+            # The key schema and condition are checked, and the sort key's type
+            # against the stored rows (the stub has no attribute definitions)
+            exclusive = body['ExclusiveStartKey']
+            invalid = set(exclusive) != {table.key, hash_key, range_key} or exclusive[hash_key] != hash_value
+            if not invalid and rows:
+                invalid = exclusive[range_key].keys() != rows[0][range_key].keys()
+            if invalid:
+                raise ClientError('ValidationException', 'The provided starting key is invalid')
+            start_key = exclusive[table.key]
+            start = next((i + 1 for i, item in enumerate(rows) if item[table.key] == start_key), len(rows))
+
+        limit = body.get('Limit', len(rows))
+        page = rows[start:start + limit]
+        response = {'Items': [self.project(item, body) for item in page], 'Count': len(page)}
+        if start + limit < len(rows) and page:
+            last = page[-1]
+            response['LastEvaluatedKey'] = {
+                name: last[name] for name in (table.key, hash_key, range_key)
+            }
+        units = self.read_units_for(sum(item_size(item) for item in page))
+        return self.respond(response, self.consumed(body, table.name, units))
+
+    def dynamodb_Scan(self, body):
+        table = self.table(body['TableName'])
+        keys = list(table.items)
+        if 'TotalSegments' in body:
+            keys = [key for key in keys
+                    if int(hashlib.md5(key.encode()).hexdigest(), 16) % body['TotalSegments']
+                    == body['Segment']]
+
+        start = 0
+        if body.get('ExclusiveStartKey'):
+            start_key = table.item_key(body['ExclusiveStartKey'])
+            start = keys.index(start_key) + 1 if start_key in keys else len(keys)
+
+        page, size = [], 0
+        for key in keys[start:]:
+            item = table.items[key]
+            page.append(item)
+            size += item_size(item)
+            if size >= SCAN_PAGE_BYTES:
+                break
+
+        response = {'Items': [self.project(item, body) for item in page], 'Count': len(page)}
+        if page and start + len(page) < len(keys):
+            response['LastEvaluatedKey'] = {table.key: page[-1][table.key]}
+        return self.respond(response, self.consumed(body, table.name, self.read_units_for(size)))
+
+    def unprocessed(self, entries):
+        """Split entries into (processed, left unprocessed by --unprocessed-rate)"""
+        if not self.unprocessed_rate or len(entries) < 2:
+            return entries, []
+        left = [entry for entry in entries[1:] if random.random() < self.unprocessed_rate]
+        return [entry for entry in entries if entry not in left], left
+
+    def dynamodb_BatchGetItem(self, body):
+        requests = body['RequestItems']
+        if sum(len(request['Keys']) for request in requests.values()) > BATCH_GET_MAX:
+            raise ClientError('ValidationException', f'Too many items requested (max {BATCH_GET_MAX})')
+
+        responses, unprocessed, consumed = {}, {}, []
+        for table_name, request in requests.items():
+            table = self.table(table_name)
+            keys, left = self.unprocessed(request['Keys'])
+            if left:
+                unprocessed[table_name] = dict(request, Keys=left)
+
+            found = [table.items[table.item_key(key)] for key in keys
+                     if table.item_key(key) in table.items]
+            responses[table_name] = [self.project(item, request) for item in found]
+            units = sum(self.read_units_for(item_size(item)) for item in found)
+            entry = self.consumed(body, table_name, units)
+            if entry:
+                consumed.append(entry)
+
+        return self.respond({'Responses': responses, 'UnprocessedKeys': unprocessed}, consumed or None)
+
+    def dynamodb_BatchWriteItem(self, body):
+        requests = body['RequestItems']
+        if sum(len(entries) for entries in requests.values()) > BATCH_WRITE_MAX:
+            raise ClientError('ValidationException', f'Too many items requested (max {BATCH_WRITE_MAX})')
+
+        # A single invalid item fails the whole request
+        for table_name, entries in requests.items():
+            for entry in entries:
+                if 'PutRequest' in entry:
+                    self.table(table_name).check_index_keys(entry['PutRequest']['Item'])
+
+        unprocessed, consumed = {}, []
+        for table_name, entries in requests.items():
+            table = self.table(table_name)
+            entries, left = self.unprocessed(entries)
+            if left:
+                unprocessed[table_name] = left
+
+            units = 0.0
+            for entry in entries:
+                if 'PutRequest' in entry:
+                    item = entry['PutRequest']['Item']
+                    table.items[table.item_key({table.key: item[table.key]})] = item
+                else:
+                    item = table.items.pop(table.item_key(entry['DeleteRequest']['Key']), None) or {}
+                units += self.write_units_for(item_size(item))
+            entry = self.consumed(body, table_name, units, False)
+            if entry:
+                consumed.append(entry)
+
+        return self.respond({'UnprocessedItems': unprocessed}, consumed or None)
+
+    # ------------------------------------------------------------------------
+    # Secrets Manager
+    # ------------------------------------------------------------------------
+
+    def secret(self, secret_id):
+        name = secret_id[len(SECRET_ARN_PREFIX):] if secret_id.startswith(SECRET_ARN_PREFIX) else secret_id
+        if name not in self.secrets:
+            raise ClientError('ResourceNotFoundException', f"Secrets Manager can't find {secret_id}")
+        return {'ARN': SECRET_ARN_PREFIX + name, 'Name': name,
+                'SecretString': json.dumps(self.secrets[name])}
+
+    def secretsmanager_GetSecretValue(self, body):
+        return self.secret(body['SecretId'])
+
+    def secretsmanager_BatchGetSecretValue(self, body):
+        values, errors = [], []
+        for secret_id in body['SecretIdList']:
+            try:
+                values.append(self.secret(secret_id))
+            except ClientError as e:
+                errors.append({'SecretId': secret_id, 'ErrorCode': e.error_type, 'Message': str(e)})
+        return {'SecretValues': values, 'Errors': errors}
+
+    # ------------------------------------------------------------------------
+    # Inspection
+    # ------------------------------------------------------------------------
+
+    def item_count(self, name):
+        with self.lock:
+            return len(self.table(name).items)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'dynamodb': {
+                    'requests': sum(self.operations['dynamodb'].values()),
+                    'operations': dict(self.operations['dynamodb']),
+                    'read_units': self.read_units,
+                    'write_units': self.write_units
+                },
+                'secretsmanager': {
+                    'requests': sum(self.operations['secretsmanager'].values()),
+                    'operations': dict(self.operations['secretsmanager'])
+                }
+            }
+
+
+def make_handler(aws):
+    class AwsHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out as separate writes; don't let Nagle hold the body
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+            try:
+                status, response = 200, aws.handle(self.headers.get('X-Amz-Target', ''), body)
+            except ClientError as e:
+                status, response = 400, {'__type': e.error_type, 'message': str(e)}
+            except (KeyError, TypeError, ValueError) as e:
+                status, response = 400, {'__type': 'ValidationException', 'message': repr(e)}
+
+            payload = json.dumps(response).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/x-amz-json-1.0')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return AwsHandler
+
+
+def serve(port=0, **options):
+    """Start the stand-in on a background thread; returns (server, aws)"""
+    aws = AwsStub(**options)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(aws))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, aws
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8789)
+    parser.add_argument('--prefix', default='bench', help='Table name prefix (see table_env)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds to wait per request')
+    parser.add_argument('--unprocessed-rate', type=float, default=0.0,
+                        help='Fraction of batch keys/items returned unprocessed')
+    parser.add_argument('--secret', action='append', default=[], metavar='NAME=JSON',
+                        help='Secret to serve (repeatable)')
+    args = parser.parse_args()
+
+    secrets = {}
+    for secret in args.secret:
+        name, _, value = secret.partition('=')
+        secrets[name] = json.loads(value)
+
+    server, aws = serve(args.port, prefix=args.prefix, secrets=secrets, latency=args.latency,
+                        unprocessed_rate=args.unprocessed_rate)
+    print(f'DynamoDB / Secrets Manager stand-in on http://127.0.0.1:{server.server_port}')
+    print(json.dumps(table_env(args.prefix), indent=2))
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print(json.dumps(aws.stats()))
+
+
+if __name__ == '__main__':
+    main()
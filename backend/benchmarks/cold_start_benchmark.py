@@ -0,0 +1,182 @@
+"""
+================================================================================
+Lambda Cold-Start Benchmark
+================================================================================
+Measures, for every handler, the time a fresh Python process spends importing
+the handler module (the Lambda init phase) and optionally the first
+invocation. Each sample runs in a new subprocess so nothing is warm.
+
+Runs fully offline. --invoke also calls lambda_handler once, against the
+same local stand-ins load_test.py uses (aws_stub, github_stub, ...) seeded
+with a small dataset. A first invocation that does not return 200 fails the
+benchmark rather than being timed as if it had succeeded.
+
+Results are printed (and optionally written) as JSON. Pass --baseline with a
+previous result file to fail when a handler's median import time regresses
+by more than --tolerance.
+
+Usage:
+    python backend/benchmarks/cold_start_benchmark.py [--runs 7] [--invoke]
+        [--output results.json] [--baseline previous.json] [--tolerance 0.2]
+================================================================================
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+import load_test
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SHARED_DIR = os.path.join(BACKEND_DIR, 'shared')
+
+HANDLERS = {
+    'api_handler': {'routeKey': 'GET /api/repos', 'headers': {}},
+    'github_sync': {},
+    'medium_sync': {},
+    'youtube_sync': {}
+}
+
+# Environment the handlers expect at import time (values are placeholders)
+HANDLER_ENV = {
+    'AWS_DEFAULT_REGION': 'us-east-1',
+    'GITHUB_REPOS_TABLE': 'bench-github-repos',
+    'MEDIUM_POSTS_TABLE': 'bench-medium-posts',
+    'YOUTUBE_VIDEOS_TABLE': 'bench-youtube-videos',
+    'SYNC_METADATA_TABLE': 'bench-sync-metadata'
+}
+
+# Stand-ins for --invoke: a small dataset and no added latency, so the first
+# invocation measures the handler rather than the fake upstreams
+STUB_OPTIONS = argparse.Namespace(
+    repos=20, videos=50, posts=20, latency=0.0, anthropic_latency=0.0, dynamodb_latency=0.0,
+    unprocessed_rate=0.0, github_limit=5000, github_backend='rest', youtube_quota=10000
+)
+
+# Runs inside the fresh subprocess; prints one JSON line with its timings
+PROBE = r'''
+import importlib.util, json, sys, time
+
+handler_path, invoke, event = sys.argv[1], sys.argv[2] == '1', json.loads(sys.argv[3])
+
+class Context:
+    def get_remaining_time_in_millis(self):
+        return 300000
+
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location('handler', handler_path)
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+result = {'import_ms': (time.perf_counter() - start) * 1000}
+
+if invoke:
+    start = time.perf_counter()
+    response = module.lambda_handler(event, Context())
+    result['first_invoke_ms'] = (time.perf_counter() - start) * 1000
+    result['status_code'] = response.get('statusCode')
+
+print(json.dumps(result))
+'''
+
+
+def run_probe(name, environment=None):
+    """Time one fresh import, and the first invocation when given the stand-ins"""
+    handler_path = os.path.join(BACKEND_DIR, 'lambda_functions', name, 'handler.py')
+    env = dict(os.environ, **(environment.env if environment else HANDLER_ENV))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [SHARED_DIR, env.get('PYTHONPATH')]))
+
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', PROBE, handler_path,
+         '1' if environment else '0', json.dumps(HANDLERS[name])],
+        capture_output=True, text=True, env=env
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f'{name} probe failed:\n{completed.stderr[-2000:]}')
+
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    if environment and result['status_code'] != 200:
+        raise RuntimeError(f"{name} first invocation returned {result['status_code']}:\n"
+                           f'{completed.stderr[-2000:]}')
+    result['top_imports'] = parse_importtime(completed.stderr)
+    return result
+
+
+def parse_importtime(stderr, limit=5):
+    """Top-level imports by cumulative time (us) from -X importtime output"""
+    imports = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        # Only top-level imports (name not indented) to avoid double counting
+        name = name[1:].rstrip()
+        if not name.startswith(' '):
+            imports.append((int(cumulative), name))
+    imports.sort(reverse=True)
+    return [{'module': name, 'cumulative_us': us} for us, name in imports[:limit]]
+
+
+def summarize(samples, key):
+    values = [sample[key] for sample in samples if key in sample]
+    if not values:
+        return None
+    return {
+        'median': round(statistics.median(values), 2),
+        'min': round(min(values), 2),
+        'max': round(max(values), 2)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=7, help='Fresh processes per handler')
+    parser.add_argument('--invoke', action='store_true', help='Also time the first invocation')
+    parser.add_argument('--handlers', nargs='+', default=list(HANDLERS), choices=list(HANDLERS))
+    parser.add_argument('--output', help='Write results JSON to this file')
+    parser.add_argument('--baseline', help='Previous results JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed median import time regression (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    environment = load_test.Environment(STUB_OPTIONS) if args.invoke else None
+    results = {}
+    try:
+        for name in args.handlers:
+            samples = [run_probe(name, environment) for _ in range(args.runs)]
+            results[name] = {
+                'import_ms': summarize(samples, 'import_ms'),
+                'first_invoke_ms': summarize(samples, 'first_invoke_ms'),
+                'top_imports': samples[-1]['top_imports']
+            }
+    finally:
+        if environment:
+            environment.shutdown()
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        regressions = []
+        for name, result in results.items():
+            previous = baseline.get(name, {}).get('import_ms')
+            if not previous:
+                continue
+            limit = previous['median'] * (1 + args.tolerance)
+            if result['import_ms']['median'] > limit:
+                regressions.append(f"{name}: {result['import_ms']['median']}ms > {limit:.2f}ms")
+
+        if regressions:
+            print('Cold-start regressions:\n  ' + '\n  '.join(regressions), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
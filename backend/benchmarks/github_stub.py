@@ -0,0 +1,290 @@
+"""
+================================================================================
+Local Fake GitHub API
+================================================================================
+Serves the endpoints github_sync uses, so GitHubClient's pagination,
+conditional requests and rate-limit governor can be exercised offline:
+
+    GET /users/{user}/repos?per_page=&page=   (with a Link header)
+    GET /repos/{owner}/{repo}/readme          (base64 content)
+    POST /graphql                             (the repository listing and
+                                               README text queries used by
+                                               the GraphQL fetch backend)
+
+Responses carry ETags (a matching If-None-Match gets a 304 that doesn't
+count against the quota) and X-RateLimit-Limit/Remaining/Reset headers.
+Once the quota is spent requests get a primary-limit 403 until the window
+resets; --secondary-every injects a secondary-limit rejection with
+Retry-After (a 403, or a 429 with --secondary-status 429).
+
+Names added to missing_readmes have no README (404, no blob in GraphQL);
+names in broken_readmes fail with a 502 (a null object in GraphQL).
+
+--private makes the first N repositories private. As on GitHub, the REST
+listing of a user's repos never includes them, and the GraphQL listing
+includes them unless the query filters on privacy: PUBLIC.
+
+Usage:
+    python backend/benchmarks/github_stub.py [--port 8788] [--repos 250] [--limit 5000]
+    GITHUB_API_URL=http://127.0.0.1:8788  (in the sync's env)
+================================================================================
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+REPOS_PATH = re.compile(r'^/users/([^/]+)/repos$')
+README_PATH = re.compile(r'^/repos/([^/]+)/([^/]+)/readme$')
+PUBLIC_ONLY = re.compile(r'privacy:\s*PUBLIC')
+
+
+class FakeGitHub:
+    """Repository fixtures, quota accounting and request counters"""
+
+    def __init__(self, repos=250, limit=5000, window=3600, secondary_every=0,
+                 retry_after=1, latency=0.0, private=0, secondary_status=403):
+        self.repos = [self.make_repo(i, private=i < private) for i in range(repos)]
+        self.readme_edits = {}
+        self.missing_readmes = set()
+        self.broken_readmes = set()
+        self.limit = limit
+        self.window = window
+        self.secondary_every = secondary_every
+        self.retry_after = retry_after
+        self.secondary_status = secondary_status
+        self.latency = latency
+        self.remaining = limit
+        self.reset_at = int(time.time()) + window
+        self.requests = 0
+        self.graphql_requests = 0
+        self.not_modified = 0
+        self.rejected = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def make_repo(i, private=False):
+        return {
+            'id': 1000 + i,
+            'name': f'project-{i}',
+            'private': private,
+            'owner': {'login': 'octocat'},
+            'description': f'Synthetic repository {i}',
+            'language': 'Python',
+            'stargazers_count': i % 50,
+            'forks_count': i % 7,
+            'updated_at': '2024-01-01T00:00:00Z',
+            'pushed_at': '2024-01-01T00:00:00Z',
+            'html_url': f'https://github.com/octocat/project-{i}'
+        }
+
+    def readme(self, name):
+        edits = self.readme_edits.get(name, 0)
+        return f'# {name}\n\nA synthetic README used for offline testing (rev {edits}).\n'
+
+    def edit_readme(self, name):
+        """Change a README so its blob oid, content hash and the push time move"""
+        self.readme_edits[name] = self.readme_edits.get(name, 0) + 1
+        for repo in self.repos:
+            if repo['name'] == name:
+                repo['pushed_at'] = repo['updated_at'] = time.strftime(
+                    '%Y-%m-%dT%H:%M:%SZ', time.gmtime(time.time() + self.readme_edits[name]))
+
+    def readme_oid(self, name):
+        """Git blob id of the README, as GraphQL reports it"""
+        content = self.readme(name).encode('utf-8')
+        return hashlib.sha1(b'blob %d\0' % len(content) + content).hexdigest()
+
+    def public_repos(self):
+        return [repo for repo in self.repos if not repo['private']]
+
+    def graphql(self, query, variables):
+        """Answer the listing query (has $login) or the aliased README text query"""
+        if 'login' in variables:
+            repos = self.public_repos() if PUBLIC_ONLY.search(query) else self.repos
+            start = int(variables.get('cursor') or 0)
+            page = repos[start:start + 100]
+            nodes = [{
+                'databaseId': repo['id'],
+                'name': repo['name'],
+                'description': repo['description'],
+                'url': repo['html_url'],
+                'updatedAt': repo['updated_at'],
+                'pushedAt': repo['pushed_at'],
+                'stargazerCount': repo['stargazers_count'],
+                'forkCount': repo['forks_count'],
+                'owner': repo['owner'],
+                'primaryLanguage': {'name': repo['language']},
+                'readme0': (None if repo['name'] in self.missing_readmes
+                            else {'oid': self.readme_oid(repo['name'])})
+            } for repo in page]
+            more = start + 100 < len(repos)
+            return {'repositoryOwner': {'repositories': {
+                'pageInfo': {'hasNextPage': more, 'endCursor': str(start + 100) if more else None},
+                'nodes': nodes
+            }}}
+
+        data = {}
+        i = 0
+        while f'n{i}' in variables:
+            name = variables[f'n{i}']
+            data[f'r{i}'] = None if name in self.broken_readmes else {
+                'object': {'text': self.readme(name), 'isBinary': False}
+            }
+            i += 1
+        return data
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'graphql_requests': self.graphql_requests,
+            'not_modified': self.not_modified,
+            'rejected': self.rejected,
+            'max_in_flight': self.max_in_flight,
+            'remaining': self.remaining
+        }
+
+
+def make_handler(github):
+    class GitHubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out as separate writes; don't let Nagle hold the body
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            with github.lock:
+                github.requests += 1
+                github.in_flight += 1
+                github.max_in_flight = max(github.max_in_flight, github.in_flight)
+            try:
+                if github.latency:
+                    time.sleep(github.latency)
+                self.route()
+            finally:
+                with github.lock:
+                    github.in_flight -= 1
+
+        def do_POST(self):
+            self.do_GET()
+
+        def route(self):
+            url = urlparse(self.path)
+            query = parse_qs(url.query)
+
+            with github.lock:
+                now = time.time()
+                if now >= github.reset_at:
+                    github.remaining = github.limit
+                    github.reset_at = int(now) + github.window
+                if github.secondary_every and github.requests % github.secondary_every == 0:
+                    github.rejected += 1
+                    return self.reply(github.secondary_status,
+                                      {'message': 'You have exceeded a secondary rate limit.'},
+                                      {'Retry-After': str(github.retry_after)})
+                if github.remaining <= 0:
+                    github.rejected += 1
+                    return self.reply(403, {'message': 'API rate limit exceeded.'})
+
+            if url.path == '/graphql' and self.command == 'POST':
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                with github.lock:
+                    github.graphql_requests += 1
+                return self.reply(200, {'data': github.graphql(body.get('query', ''),
+                                                               body.get('variables') or {})})
+
+            match = REPOS_PATH.match(url.path)
+            if match:
+                per_page = int(query.get('per_page', ['30'])[0])
+                page = int(query.get('page', ['1'])[0])
+                repos = github.public_repos()
+                last_page = max(1, -(-len(repos) // per_page))
+                link = (f'<http://{self.headers["Host"]}{url.path}?per_page={per_page}'
+                        f'&page={last_page}>; rel="last"')
+                body = repos[(page - 1) * per_page:page * per_page]
+                return self.reply(200, body, {'Link': link})
+
+            match = README_PATH.match(url.path)
+            if match and match.group(2) in github.missing_readmes:
+                return self.reply(404, {'message': 'Not Found'})
+            if match and match.group(2) in github.broken_readmes:
+                return self.reply(502, {'message': 'Server Error'})
+            if match:
+                content = github.readme(match.group(2)).encode('utf-8')
+                return self.reply(200, {'content': base64.b64encode(content).decode('ascii'),
+                                        'encoding': 'base64'})
+
+            self.reply(404, {'message': 'Not Found'})
+
+        def reply(self, status, body, headers=None):
+            payload = json.dumps(body).encode('utf-8')
+            etag = '"' + hashlib.md5(payload).hexdigest() + '"'
+            if status == 200 and self.headers.get('If-None-Match') == etag:
+                # Conditional hits are free, as on GitHub
+                status, payload = 304, b''
+                with github.lock:
+                    github.not_modified += 1
+            elif status == 200:
+                with github.lock:
+                    github.remaining -= 1
+
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(payload)))
+            self.send_header('ETag', etag)
+            self.send_header('X-RateLimit-Limit', str(github.limit))
+            self.send_header('X-RateLimit-Remaining', str(max(0, github.remaining)))
+            self.send_header('X-RateLimit-Reset', str(github.reset_at))
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return GitHubHandler
+
+
+def serve(port=0, **options):
+    """Start the fake API on a background thread; returns (server, github)"""
+    github = FakeGitHub(**options)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(github))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, github
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8788)
+    parser.add_argument('--repos', type=int, default=250, help='Number of fixture repositories')
+    parser.add_argument('--limit', type=int, default=5000, help='Requests per rate-limit window')
+    parser.add_argument('--window', type=int, default=3600, help='Rate-limit window in seconds')
+    parser.add_argument('--secondary-every', type=int, default=0,
+                        help='Reject every Nth request with a secondary limit (0 = never)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds to wait per request')
+    parser.add_argument('--secondary-status', type=int, default=403, choices=[403, 429],
+                        help='Status of injected secondary-limit rejections')
+    parser.add_argument('--private', type=int, default=0, help='Number of private repositories')
+    args = parser.parse_args()
+
+    server, github = serve(args.port, repos=args.repos, limit=args.limit, window=args.window,
+                           secondary_every=args.secondary_every, latency=args.latency,
+                           private=args.private, secondary_status=args.secondary_status)
+    print(f'Fake GitHub API on http://127.0.0.1:{server.server_port}')
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print(json.dumps(github.stats()))
+
+
+if __name__ == '__main__':
+    main()
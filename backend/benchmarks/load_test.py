@@ -0,0 +1,329 @@
+"""
+================================================================================
+Offline Sync and API Load Test
+================================================================================
+Runs the real handlers against local stand-ins, with no AWS account or
+network access:
+
+    aws_stub        DynamoDB tables and Secrets Manager
+    github_stub     GitHub REST/GraphQL API (rate-limit headers, quota)
+    anthropic_stub  Anthropic messages endpoint
+    youtube_stub    YouTube Data API (quota units)
+    medium_stub     Medium RSS feed
+
+The stand-ins are seeded with synthetic datasets (--repos, --videos,
+--posts). Each sync runs twice: cold, against empty tables, and warm, after
+a small upstream change (1% of READMEs edited, one new post). The API is then
+load-tested per route, once with the warm-container response cache disabled
+and once with it enabled.
+
+Every scenario runs in a fresh Python process. For each one the report has:
+    wall_ms         handler wall time (syncs) or the whole loop (api)
+    peak_rss_mb     peak resident set size of that process
+    stages/counters per-stage timings and counters from instrumentation
+    upstream        requests seen by each fake upstream server
+    dynamodb        DynamoDB requests by operation and consumed capacity
+    routes          p50/p99/mean latency and payload bytes per API route
+
+Results are printed (and optionally written) as JSON. Pass --baseline with a
+previous result file to fail when a sync's wall time or a route's p99
+regresses by more than --tolerance.
+
+Usage:
+    python backend/benchmarks/load_test.py [--repos 1000] [--videos 5000]
+        [--posts 500] [--latency 0.02] [--output results.json]
+        [--baseline previous.json] [--tolerance 0.2]
+================================================================================
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import anthropic_stub
+import aws_stub
+import github_stub
+import medium_stub
+import youtube_stub
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+SHARED_DIR = os.path.join(BACKEND_DIR, 'shared')
+
+SCENARIOS = ['github_sync', 'medium_sync', 'youtube_sync', 'api']
+
+# API routes load-tested, as API Gateway HTTP API events
+API_ROUTES = {
+    'GET /api/repos': {'routeKey': 'GET /api/repos'},
+    'GET /api/repos?limit=20': {'routeKey': 'GET /api/repos', 'queryStringParameters': {'limit': '20'}},
+    'GET /api/repos/{id}': {'routeKey': 'GET /api/repos/{id}', 'pathParameters': {'id': '1000'}},
+    'GET /api/posts': {'routeKey': 'GET /api/posts'},
+    'GET /api/videos': {'routeKey': 'GET /api/videos'},
+    'GET /api/videos?limit=50&fields=title,url': {
+        'routeKey': 'GET /api/videos',
+        'queryStringParameters': {'limit': '50', 'fields': 'title,url'}
+    }
+}
+
+# Stand-in stats that are levels, not counters, so are reported rather than diffed
+GAUGES = {'remaining', 'max_in_flight'}
+
+SECRETS = {
+    'bench/github-token': {'token': 'ghp_benchmark'},
+    'bench/anthropic-key': {'api_key': 'sk-benchmark'},
+    'bench/youtube-key': {'api_key': 'yt-benchmark'}
+}
+
+# Runs inside the fresh subprocess; prints one JSON line with its results
+PROBE = r'''
+import base64, gzip, importlib.util, json, resource, statistics, sys, time
+
+handler_path, spec = sys.argv[1], json.loads(sys.argv[2])
+
+class Context:
+    function_name = spec['name']
+    invoked_function_arn = 'arn:aws:lambda:us-east-1:000000000000:function:' + spec['name']
+    aws_request_id = 'benchmark'
+
+    def __init__(self, timeout_ms):
+        self.deadline = time.time() * 1000 + timeout_ms
+
+    def get_remaining_time_in_millis(self):
+        return int(self.deadline - time.time() * 1000)
+
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def percentile(values, p):
+    return statistics.quantiles(values, n=100, method='inclusive')[p - 1] if len(values) > 1 else values[0]
+
+module_spec = importlib.util.spec_from_file_location('handler', handler_path)
+module = importlib.util.module_from_spec(module_spec)
+module_spec.loader.exec_module(module)
+from instrumentation import metrics
+
+result = {}
+start = time.perf_counter()
+if 'routes' not in spec:
+    response = module.lambda_handler({}, Context(spec['timeout_ms']))
+    result['wall_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    result['status_code'] = response.get('statusCode')
+    result['stages'] = {name: {'ms': round(total, 1), 'calls': count}
+                        for name, (total, count) in sorted(metrics.stages.items())}
+    result['counters'] = {name: round(value, 2) for name, value in sorted(metrics.counters.items())}
+else:
+    result['routes'] = {}
+    for route, event in spec['routes'].items():
+        event = dict(event, headers={'accept-encoding': 'gzip'})
+        latencies, statuses = [], set()
+        for _ in range(spec['requests']):
+            request_start = time.perf_counter()
+            response = module.lambda_handler(event, Context(spec['timeout_ms']))
+            latencies.append((time.perf_counter() - request_start) * 1000)
+            statuses.add(response['statusCode'])
+
+        body = response['body'].encode('utf-8')
+        if response.get('isBase64Encoded'):
+            body = base64.b64decode(body)
+        encoded = response['headers'].get('Content-Encoding') == 'gzip'
+        result['routes'][route] = {
+            'status_codes': sorted(statuses),
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+            'mean_ms': round(statistics.fmean(latencies), 3),
+            'bytes': len(body),
+            'json_bytes': len(gzip.decompress(body)) if encoded else len(body)
+        }
+    result['wall_ms'] = round((time.perf_counter() - start) * 1000, 1)
+
+result['peak_rss_mb'] = peak_rss_mb()
+print(json.dumps(result))
+'''
+
+
+def diff_stats(before, after):
+    """Counters that moved between two stats() snapshots (gauges as-is)"""
+    moved = {}
+    for name, value in after.items():
+        if name in GAUGES:
+            moved[name] = value
+        elif isinstance(value, dict):
+            nested = diff_stats(before.get(name, {}), value)
+            if nested:
+                moved[name] = nested
+        elif isinstance(value, (int, float)) and value != before.get(name, 0):
+            moved[name] = round(value - before.get(name, 0), 2)
+    return moved
+
+
+class Environment:
+    """The running stand-ins and the handler environment pointing at them"""
+
+    def __init__(self, args):
+        self.servers = {}
+        _, self.aws = self.start('aws', aws_stub.serve, secrets=SECRETS, latency=args.dynamodb_latency,
+                                 unprocessed_rate=args.unprocessed_rate)
+        _, self.github = self.start('github', github_stub.serve, repos=args.repos, limit=args.github_limit,
+                                    latency=args.latency)
+        _, self.anthropic = self.start('anthropic', anthropic_stub.serve, latency=args.anthropic_latency)
+        _, self.youtube = self.start('youtube', youtube_stub.serve, videos=args.videos,
+                                     quota=args.youtube_quota, latency=args.latency)
+        _, self.medium = self.start('medium', medium_stub.serve, posts=args.posts, latency=args.latency)
+
+        self.upstreams = {'github': self.github, 'anthropic': self.anthropic,
+                          'youtube': self.youtube, 'medium': self.medium}
+        self.env = dict(
+            aws_stub.table_env(),
+            AWS_DEFAULT_REGION='us-east-1',
+            AWS_ACCESS_KEY_ID='benchmark',
+            AWS_SECRET_ACCESS_KEY='benchmark',
+            AWS_ENDPOINT_URL_DYNAMODB=self.url('aws'),
+            AWS_ENDPOINT_URL_SECRETS_MANAGER=self.url('aws'),
+            GITHUB_USERNAME='octocat',
+            GITHUB_TOKEN_SECRET='bench/github-token',
+            AI_API_KEY_SECRET='bench/anthropic-key',
+            GITHUB_API_URL=self.url('github'),
+            GITHUB_FETCH_BACKEND=args.github_backend,
+            ANTHROPIC_API_URL=self.url('anthropic') + '/v1/messages',
+            YOUTUBE_API_KEY_SECRET='bench/youtube-key',
+            YOUTUBE_CHANNEL_ID=youtube_stub.CHANNEL_ID,
+            YOUTUBE_API_URL=self.url('youtube'),
+            MEDIUM_USERNAME=self.medium.user,
+            MEDIUM_URL=self.url('medium'),
+            SYNC_SELF_INVOKE='false',
+            DEBUG_SAMPLE_RATE='0'
+        )
+
+    def start(self, name, serve, **options):
+        server, state = serve(**options)
+        self.servers[name] = server
+        return server, state
+
+    def url(self, name):
+        return f'http://127.0.0.1:{self.servers[name].server_port}'
+
+    def stats(self):
+        aws = self.aws.stats()
+        upstream = {name: stub.stats() for name, stub in self.upstreams.items()}
+        return {'upstream': dict(upstream, secretsmanager=aws['secretsmanager']),
+                'dynamodb': aws['dynamodb']}
+
+    def shutdown(self):
+        for server in self.servers.values():
+            server.shutdown()
+
+
+def run_scenario(environment, name, spec, extra_env=None):
+    """Run one handler in a fresh process and attach what the stand-ins saw"""
+    handler_path = os.path.join(BACKEND_DIR, 'lambda_functions', name, 'handler.py')
+    env = dict(os.environ, **environment.env, **(extra_env or {}))
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [SHARED_DIR, env.get('PYTHONPATH')]))
+
+    before = environment.stats()
+    completed = subprocess.run(
+        [sys.executable, '-c', PROBE, handler_path, json.dumps(dict(spec, name=name))],
+        capture_output=True, text=True, env=env
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f'{name} probe failed:\n{completed.stderr[-2000:]}')
+
+    result = json.loads(completed.stdout.strip().splitlines()[-1])
+    moved = diff_stats(before, environment.stats())
+    result['upstream'] = {service: stats for service, stats in moved.get('upstream', {}).items()
+                          if stats.get('requests')}
+    result['dynamodb'] = moved.get('dynamodb', {})
+    return result
+
+
+def perturb(environment, name):
+    """The upstream change a warm sync picks up"""
+    if name == 'github_sync':
+        for repo in environment.github.repos[::100]:
+            environment.github.edit_readme(repo['name'])
+    elif name == 'medium_sync':
+        environment.medium.publish()
+
+
+def compare(results, baseline, tolerance):
+    """Regressions of sync wall time and route p99 against a baseline run"""
+    regressions = []
+    for name, result in results['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if not previous:
+            continue
+        measures = [('wall_ms', result.get('wall_ms'), previous.get('wall_ms'))]
+        if 'routes' in result:
+            measures = [(f'{route} p99_ms', stats['p99_ms'], previous.get('routes', {}).get(route, {}).get('p99_ms'))
+                        for route, stats in result['routes'].items()]
+        for measure, value, before in measures:
+            if value is not None and before and value > before * (1 + tolerance):
+                regressions.append(f'{name} {measure}: {value} > {before * (1 + tolerance):.2f}')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--scenarios', nargs='+', default=SCENARIOS, choices=SCENARIOS)
+    parser.add_argument('--repos', type=int, default=1000, help='Synthetic GitHub repositories')
+    parser.add_argument('--videos', type=int, default=5000, help='Synthetic YouTube videos')
+    parser.add_argument('--posts', type=int, default=500, help='Synthetic Medium posts')
+    parser.add_argument('--latency', type=float, default=0.02,
+                        help='Seconds per GitHub/YouTube/Medium request')
+    parser.add_argument('--anthropic-latency', type=float, default=0.5,
+                        help='Seconds per Anthropic request')
+    parser.add_argument('--dynamodb-latency', type=float, default=0.005,
+                        help='Seconds per DynamoDB request')
+    parser.add_argument('--unprocessed-rate', type=float, default=0.0,
+                        help='Fraction of DynamoDB batch keys/items returned unprocessed')
+    parser.add_argument('--github-limit', type=int, default=5000, help='GitHub requests per hour')
+    parser.add_argument('--github-backend', default='rest', choices=['rest', 'graphql'])
+    parser.add_argument('--youtube-quota', type=int, default=10000, help='YouTube quota units')
+    parser.add_argument('--requests', type=int, default=200, help='Requests per API route')
+    parser.add_argument('--lambda-timeout', type=int, default=900, help='Seconds each sync may run')
+    parser.add_argument('--output', help='Write results JSON to this file')
+    parser.add_argument('--baseline', help='Previous results JSON to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Allowed wall time / p99 regression (0.2 = 20%%)')
+    args = parser.parse_args()
+
+    environment = Environment(args)
+    results = {'config': vars(args), 'python': sys.version.split()[0], 'scenarios': {}}
+    spec = {'timeout_ms': args.lambda_timeout * 1000}
+    try:
+        for name in args.scenarios:
+            if name == 'api':
+                continue
+            results['scenarios'][f'{name}/cold'] = run_scenario(environment, name, spec)
+            perturb(environment, name)
+            results['scenarios'][f'{name}/warm'] = run_scenario(environment, name, spec)
+
+        if 'api' in args.scenarios:
+            api_spec = dict(spec, routes=API_ROUTES, requests=args.requests)
+            # CACHE_MAX_ENTRIES=0 evicts every response as soon as it is cached
+            results['scenarios']['api_handler/uncached'] = run_scenario(
+                environment, 'api_handler', api_spec, {'CACHE_MAX_ENTRIES': '0'})
+            results['scenarios']['api_handler/cached'] = run_scenario(environment, 'api_handler', api_spec)
+    finally:
+        environment.shutdown()
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print('Load test regressions:\n  ' + '\n  '.join(regressions), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
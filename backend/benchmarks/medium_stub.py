@@ -0,0 +1,195 @@
+"""
+================================================================================
+Local Fake Medium RSS Feed
+================================================================================
+Serves GET /feed/@{user} as an RSS 2.0 document shaped like Medium's (guid,
+pubDate, full post HTML in content:encoded), newest post first, so
+medium_sync can be exercised offline with feeds of any size.
+
+The feed carries ETag and Last-Modified headers; a matching If-None-Match
+or If-Modified-Since gets an empty 304. publish() adds a post to the top of
+the feed and moves both validators.
+
+Usage:
+    python backend/benchmarks/medium_stub.py [--port 8791] [--posts 500] [--words 800]
+    MEDIUM_URL=http://127.0.0.1:8791  (in the sync's env)
+================================================================================
+"""
+
+import argparse
+import hashlib
+import json
+import sys
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+
+EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+LOREM = ('performance portfolio lambda dynamodb latency throughput cache serverless '
+         'python terraform benchmark profile').split()
+
+FEED_HEADER = '''<?xml version="1.0" encoding="UTF-8"?>
+<rss xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:content="http://purl.org/rss/1.0/modules/content/" \
+xmlns:atom="http://www.w3.org/2005/Atom" version="2.0">
+<channel>
+<title><![CDATA[Stories by {user} on Medium]]></title>
+<link>https://medium.com/@{user}</link>
+<lastBuildDate>{updated}</lastBuildDate>
+'''
+
+ITEM = '''<item>
+<title><![CDATA[{title}]]></title>
+<link>{link}</link>
+<guid isPermaLink="false">{guid}</guid>
+<category><![CDATA[benchmark]]></category>
+<dc:creator><![CDATA[{user}]]></dc:creator>
+<pubDate>{published}</pubDate>
+<content:encoded><![CDATA[{content}]]></content:encoded>
+</item>
+'''
+
+
+class FakeMedium:
+    """Post fixtures, the rendered feed and request counters"""
+
+    def __init__(self, posts=500, words=800, latency=0.0, user='benchmark'):
+        self.words = words
+        self.latency = latency
+        self.user = user
+        self.posts = [self.make_post(i) for i in reversed(range(posts))]
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+        self.render()
+
+    def make_post(self, i):
+        body = ' '.join(LOREM[(i + n) % len(LOREM)] for n in range(self.words))
+        paragraphs = ''.join(f'<p>{escape(body[start:start + 600])}</p>'
+                             for start in range(0, len(body), 600))
+        slug = f'synthetic-post-{i}-{hashlib.md5(str(i).encode()).hexdigest()[:12]}'
+        return {
+            'title': f'Synthetic post {i}',
+            'link': f'https://medium.com/@{self.user}/{slug}?source=rss',
+            'guid': f'https://medium.com/p/{slug[-12:]}',
+            'published': EPOCH + timedelta(days=i),
+            'content': f'<h3>Synthetic post {i}</h3>{paragraphs}'
+        }
+
+    def render(self):
+        """Rebuild the feed document and its validators"""
+        self.updated = self.posts[0]['published'] if self.posts else EPOCH
+        items = ''.join(ITEM.format(user=self.user, published=format_datetime(post['published']),
+                                    **{k: v for k, v in post.items() if k != 'published'})
+                        for post in self.posts)
+        self.feed = (FEED_HEADER.format(user=self.user, updated=format_datetime(self.updated))
+                     + items + '</channel>\n</rss>\n').encode('utf-8')
+        self.etag = 'W/"' + hashlib.md5(self.feed).hexdigest() + '"'
+
+    def publish(self):
+        """Add a new post at the top of the feed"""
+        with self.lock:
+            post = self.make_post(len(self.posts))
+            post['published'] = max(post['published'], self.updated + timedelta(minutes=1))
+            self.posts.insert(0, post)
+            self.render()
+            return post
+
+    def stats(self):
+        return {
+            'requests': self.requests,
+            'not_modified': self.not_modified,
+            'bytes_sent': self.bytes_sent
+        }
+
+
+class FeedServer(ThreadingHTTPServer):
+    def handle_error(self, request, client_address):
+        # A streaming client that stops reading early resets the connection
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+def make_handler(medium):
+    class MediumHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out as separate writes; don't let Nagle hold the body
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            if medium.latency:
+                time.sleep(medium.latency)
+            with medium.lock:
+                medium.requests += 1
+                feed, etag, updated = medium.feed, medium.etag, medium.updated
+
+            if self.path.split('?')[0] != f'/feed/@{medium.user}':
+                return self.reply(404, b'Not Found', {})
+
+            headers = {'ETag': etag, 'Last-Modified': format_datetime(updated, usegmt=True)}
+            if self.not_modified(etag, updated):
+                with medium.lock:
+                    medium.not_modified += 1
+                return self.reply(304, b'', headers)
+            self.reply(200, feed, headers)
+
+        def not_modified(self, etag, updated):
+            if_none_match = self.headers.get('If-None-Match')
+            if if_none_match:
+                return etag in [tag.strip() for tag in if_none_match.split(',')]
+            if_modified_since = self.headers.get('If-Modified-Since')
+            if if_modified_since:
+                try:
+                    return updated.replace(microsecond=0) <= parsedate_to_datetime(if_modified_since)
+                except (TypeError, ValueError):
+                    return False
+            return False
+
+        def reply(self, status, payload, headers):
+            with medium.lock:
+                medium.bytes_sent += len(payload)
+            self.send_response(status)
+            self.send_header('Content-Type', 'text/xml; charset=UTF-8')
+            self.send_header('Content-Length', str(len(payload)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return MediumHandler
+
+
+def serve(port=0, **options):
+    """Start the fake feed on a background thread; returns (server, medium)"""
+    medium = FakeMedium(**options)
+    server = FeedServer(('127.0.0.1', port), make_handler(medium))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, medium
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8791)
+    parser.add_argument('--posts', type=int, default=500, help='Number of posts in the feed')
+    parser.add_argument('--words', type=int, default=800, help='Words per post body')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds to wait per request')
+    args = parser.parse_args()
+
+    server, medium = serve(args.port, posts=args.posts, words=args.words, latency=args.latency)
+    print(f'Fake Medium feed on http://127.0.0.1:{server.server_port}/feed/@{medium.user} '
+          f'({len(medium.feed)} bytes)')
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print(json.dumps(medium.stats()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+================================================================================
+DynamoDB -> JSON Serialization Micro-Benchmark
+================================================================================
+Compares the two read paths for list responses on a synthetic table:
+
+    decimal:   boto3 resource-style deserialization (TypeDeserializer, every
+               number becomes a Decimal) + json.dumps(cls=DecimalEncoder)
+    transcode: raw AttributeValue maps transcoded straight to JSON text with
+               db_client.items_to_json (numbers written verbatim)
+
+Runs fully offline - no AWS credentials or network access required.
+
+Usage:
+    python backend/benchmarks/transcode_benchmark.py [--items 10000] [--repeat 5]
+================================================================================
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+
+# The shared layer is importable from backend/shared when run from the repo
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'shared'))
+os.environ.setdefault('AWS_DEFAULT_REGION', 'us-east-1')
+
+from boto3.dynamodb.types import TypeDeserializer
+from db_client import DecimalEncoder, items_to_json
+
+
+def make_raw_repo(i):
+    """A synthetic repo row in low-level AttributeValue form"""
+    return {
+        'repo_id': {'S': str(100000 + i)},
+        'name': {'S': f'project-{i}'},
+        'description': {'S': 'A synthetic repository used for benchmarking ' * 2},
+        'language': {'S': random.choice(['Python', 'Go', 'TypeScript', 'HCL'])},
+        'stars': {'N': str(random.randint(0, 5000))},
+        'forks': {'N': str(random.randint(0, 500))},
+        'updated_at': {'S': '2024-01-01T00:00:00Z'},
+        'url': {'S': f'https://github.com/example/project-{i}'},
+        'high_level_summary': {'S': 'One-sentence summary of the project. ' * 2},
+        'last_synced': {'N': str(1700000000 + i)}
+    }
+
+
+def decimal_path(raw_items):
+    deserializer = TypeDeserializer()
+    items = [{k: deserializer.deserialize(v) for k, v in item.items()} for item in raw_items]
+    return json.dumps(items, cls=DecimalEncoder)
+
+
+def transcode_path(raw_items):
+    return items_to_json(raw_items)
+
+
+def best_of(fn, raw_items, repeat):
+    """Best wall time in seconds over repeat runs"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(raw_items)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--items', type=int, default=10000, help='Synthetic table size')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per path (best is reported)')
+    args = parser.parse_args()
+
+    random.seed(42)
+    raw_items = [make_raw_repo(i) for i in range(args.items)]
+
+    # Both paths must produce the same document
+    assert json.loads(decimal_path(raw_items)) == json.loads(transcode_path(raw_items))
+
+    decimal_time = best_of(decimal_path, raw_items, args.repeat)
+    transcode_time = best_of(transcode_path, raw_items, args.repeat)
+
+    print(json.dumps({
+        'items': args.items,
+        'decimal_ms': round(decimal_time * 1000, 2),
+        'transcode_ms': round(transcode_time * 1000, 2),
+        'speedup': round(decimal_time / transcode_time, 2)
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+================================================================================
+Local Fake YouTube Data API
+================================================================================
+Serves the three YouTube Data API v3 calls youtube_sync makes, so the
+uploads-playlist walk and batched detail lookups can be exercised offline:
+
+    GET /youtube/v3/channels?id=            (uploads playlist id)
+    GET /youtube/v3/playlistItems?playlistId=&pageToken=&maxResults=
+    GET /youtube/v3/videos?id=a,b,c         (snippet, duration, statistics)
+
+Every call costs one quota unit, as on YouTube; once --quota units are spent
+requests get a 403 quotaExceeded error.
+
+Usage:
+    python backend/benchmarks/youtube_stub.py [--port 8790] [--videos 5000]
+    YOUTUBE_API_URL=http://127.0.0.1:8790  (in the sync's env)
+================================================================================
+"""
+
+import argparse
+import json
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+CHANNEL_ID = 'UCbenchmark'
+UPLOADS_PLAYLIST = 'UUbenchmark'
+EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+
+
+class FakeYouTube:
+    """Video fixtures, quota accounting and request counters"""
+
+    def __init__(self, videos=5000, quota=10000, latency=0.0):
+        # Newest first, as the uploads playlist lists them
+        self.videos = [self.make_video(i) for i in reversed(range(videos))]
+        self.by_id = {video['id']: video for video in self.videos}
+        self.quota = quota
+        self.latency = latency
+        self.units = 0
+        self.requests = {}
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def make_video(i):
+        published = EPOCH + timedelta(hours=6 * i)
+        return {
+            'id': f'vid{i:07d}',
+            'snippet': {
+                'title': f'Synthetic video {i}',
+                'description': f'Description of synthetic video {i}. ' * 8,
+                'publishedAt': published.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                'thumbnails': {'high': {'url': f'https://i.ytimg.com/vi/vid{i:07d}/hqdefault.jpg'}}
+            },
+            'contentDetails': {'duration': f'PT{i % 50 + 1}M{i % 60}S'},
+            'statistics': {'viewCount': str(i * 37 % 100000)}
+        }
+
+    def channels(self, query):
+        if query.get('id') != CHANNEL_ID:
+            return {'items': []}
+        return {'items': [{
+            'id': CHANNEL_ID,
+            'contentDetails': {'relatedPlaylists': {'uploads': UPLOADS_PLAYLIST}}
+        }]}
+
+    def playlist_items(self, query):
+        if query.get('playlistId') != UPLOADS_PLAYLIST:
+            return {'items': []}
+        start = int(query.get('pageToken') or 0)
+        size = min(50, int(query.get('maxResults', 5)))
+        page = self.videos[start:start + size]
+        response = {'items': [{'contentDetails': {'videoId': video['id']}} for video in page]}
+        if start + size < len(self.videos):
+            response['nextPageToken'] = str(start + size)
+        return response
+
+    def video_details(self, query):
+        ids = [video_id for video_id in query.get('id', '').split(',') if video_id]
+        return {'items': [self.by_id[video_id] for video_id in ids[:50] if video_id in self.by_id]}
+
+    def stats(self):
+        return {
+            'requests': sum(self.requests.values()),
+            'calls': dict(self.requests),
+            'quota_units': self.units,
+            'rejected': self.rejected
+        }
+
+
+def make_handler(youtube):
+    routes = {
+        'channels': youtube.channels,
+        'playlistItems': youtube.playlist_items,
+        'videos': youtube.video_details
+    }
+
+    class YouTubeHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        # Headers and body go out as separate writes; don't let Nagle hold the body
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {name: values[0] for name, values in parse_qs(url.query).items()}
+            name = url.path.rstrip('/').rsplit('/', 1)[-1]
+            if youtube.latency:
+                time.sleep(youtube.latency)
+
+            route = routes.get(name)
+            if route is None:
+                return self.reply(404, {'error': {'code': 404, 'message': 'Not Found'}})
+
+            with youtube.lock:
+                youtube.requests[name] = youtube.requests.get(name, 0) + 1
+                if youtube.units >= youtube.quota:
+                    youtube.rejected += 1
+                    return self.reply(403, {'error': {
+                        'code': 403,
+                        'message': 'The request cannot be completed because you have exceeded your quota.',
+                        'errors': [{'reason': 'quotaExceeded', 'domain': 'youtube.quota'}]
+                    }})
+                youtube.units += 1
+            self.reply(200, route(query))
+
+        def reply(self, status, body):
+            payload = json.dumps(body).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=UTF-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return YouTubeHandler
+
+
+def serve(port=0, **options):
+    """Start the fake API on a background thread; returns (server, youtube)"""
+    youtube = FakeYouTube(**options)
+    server = ThreadingHTTPServer(('127.0.0.1', port), make_handler(youtube))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, youtube
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--port', type=int, default=8790)
+    parser.add_argument('--videos', type=int, default=5000, help='Number of fixture videos')
+    parser.add_argument('--quota', type=int, default=10000, help='Quota units before quotaExceeded')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds to wait per request')
+    args = parser.parse_args()
+
+    server, youtube = serve(args.port, videos=args.videos, quota=args.quota, latency=args.latency)
+    print(f'Fake YouTube API on http://127.0.0.1:{server.server_port} (channel {CHANNEL_ID})')
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print(json.dumps(youtube.stats()))
+
+
+if __name__ == '__main__':
+    main()
@@ -1,29 +1,86 @@
+import base64
+import gzip
+import hashlib
 import json
 import os
 import sys
+from decimal import Decimal
+from urllib.parse import urlencode
 sys.path.append('/opt/python')
 
-from db_client import DBClient, DecimalEncoder
+# Optional import - brotli is preferred when packaged, gzip otherwise
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from db_client import LIST_KEY, DBClient, DecimalEncoder
+from instrumentation import metrics
+from response_cache import ResponseCache
+from snapshots import COLLECTIONS, read_snapshot, serialize_collection
 
 db_client = DBClient()
 
-def lambda_handler(event, context):
-    """Main API handler"""
-    print(f"Event: {json.dumps(event)}")
+# Sync services whose last_sync_time marks a new data generation
+SYNC_SERVICES = ['github', 'medium', 'youtube']
+
+# Finished responses are cached across warm invocations and invalidated when
+# a sync Lambda records a new last_sync_time (checked at most every
+# CACHE_CHECK_INTERVAL seconds)
+response_cache = ResponseCache(
+    load_generations=lambda: db_client.get_sync_generations(SYNC_SERVICES),
+    ttl=int(os.environ.get('CACHE_TTL_SECONDS', '300')),
+    max_entries=int(os.environ.get('CACHE_MAX_ENTRIES', '64')),
+    check_interval=int(os.environ.get('CACHE_CHECK_INTERVAL', '30'))
+)
+
+# Parallel scan segments for list endpoints (1 = plain sequential scan)
+SCAN_SEGMENTS = int(os.environ.get('SCAN_SEGMENTS', '1'))
+
+# Cursor pagination for list endpoints (?limit=&cursor=&fields=)
+PAGE_PARAMS = ('limit', 'cursor', 'fields')
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Bodies smaller than this are sent uncompressed
+COMPRESSION_MIN_BYTES = int(os.environ.get('COMPRESSION_MIN_BYTES', '1024'))
+
+# Browser / CloudFront caching per route. Data changes at most every 12 hours,
+# so clients may reuse a response briefly and then revalidate with the ETag
+# in the background (stale-while-revalidate) instead of blocking on it.
+CACHE_CONTROL = {
+    'GET /api/repos': 'public, max-age=300, stale-while-revalidate=3600',
+    'GET /api/repos/{id}': 'public, max-age=900, stale-while-revalidate=86400',
+    'GET /api/posts': 'public, max-age=600, stale-while-revalidate=3600',
+    'GET /api/videos': 'public, max-age=600, stale-while-revalidate=3600'
+}
 
+@metrics.handler('api_handler')
+def lambda_handler(event, context):
+    """Main API handler (the event is logged only for sampled invocations)"""
     route_key = event.get('routeKey', '')
+    metrics.set_property('route', route_key)
     path_params = event.get('pathParameters', {})
+    request_headers = event.get('headers') or {}
+    query_params = {k: v for k, v in (event.get('queryStringParameters') or {}).items()
+                    if k in PAGE_PARAMS}
 
     try:
         # Route requests
+        cache_key = route_key
+        if query_params:
+            cache_key = f'{route_key}?{urlencode(sorted(query_params.items()))}'
+
         if route_key == 'GET /api/repos':
-            return get_all_repos()
+            service, build_response = 'github', lambda: get_all_repos(query_params)
         elif route_key == 'GET /api/repos/{id}':
-            return get_repo(path_params.get('id'))
+            repo_id = path_params.get('id')
+            cache_key = f'{route_key}:{repo_id}'
+            service, build_response = 'github', lambda: get_repo(repo_id)
         elif route_key == 'GET /api/posts':
-            return get_all_posts()
+            service, build_response = 'medium', lambda: get_all_posts(query_params)
         elif route_key == 'GET /api/videos':
-            return get_all_videos()
+            service, build_response = 'youtube', lambda: get_all_videos(query_params)
         else:
             return {
                 'statusCode': 404,
@@ -34,6 +91,11 @@ def lambda_handler(event, context):
                 'body': json.dumps({'error': 'Not found'})
             }
 
+        response = cached_response(route_key, cache_key, service, build_response)
+        response = encoded_response(cache_key, service, response,
+                                    request_headers.get('accept-encoding'))
+        return conditional_response(response, request_headers.get('if-none-match'))
+
     except Exception as e:
         print(f"Error: {str(e)}")
         return {
@@ -45,25 +107,104 @@ def lambda_handler(event, context):
             'body': json.dumps({'error': str(e)})
         }
 
-def get_all_repos():
-    """Get all GitHub repositories"""
-    repos = db_client.get_all_repos()
+def cached_response(route_key, cache_key, service, build_response):
+    """
+    Serve a response from the warm-container cache, building it on a miss.
+    Successful responses get a strong ETag and the route's Cache-Control.
+    """
+    response = response_cache.get(cache_key, service)
+    metrics.add('response_cache_hits' if response is not None else 'response_cache_misses')
+    if response is None:
+        response = build_response()
+        if response['statusCode'] == 200:
+            response['headers']['ETag'] = compute_etag(response['body'])
+            response['headers']['Cache-Control'] = CACHE_CONTROL[route_key]
+            response['headers']['Vary'] = 'Accept-Encoding'
+            response_cache.put(cache_key, service, response)
+    return response
 
-    # Sort by stars
-    repos.sort(key=lambda x: x.get('stars', 0), reverse=True)
+def encoded_response(cache_key, service, response, accept_encoding):
+    """
+    Compress a successful response if the client accepts gzip or brotli and
+    the body is over COMPRESSION_MIN_BYTES. The compressed variant is cached
+    next to the plain one, so each generation is compressed only once.
+    """
+    encoding = negotiate_encoding(accept_encoding)
+    if (response['statusCode'] != 200 or not encoding
+            or len(response['body']) < COMPRESSION_MIN_BYTES):
+        return response
 
-    return {
-        'statusCode': 200,
-        'headers': {
-            'Content-Type': 'application/json',
-            'Access-Control-Allow-Origin': '*'
-        },
-        'body': json.dumps(repos, cls=DecimalEncoder)
-    }
+    variant_key = f'{cache_key}#{encoding}'
+    encoded = response_cache.get(variant_key, service)
+    if encoded is None:
+        body = response['body'].encode('utf-8')
+        with metrics.stage('compress'):
+            data = brotli.compress(body) if encoding == 'br' else gzip.compress(body)
+
+        headers = dict(response['headers'], **{'Content-Encoding': encoding})
+        # Each representation needs its own strong ETag
+        headers['ETag'] = headers['ETag'][:-1] + f'-{encoding}"'
+        encoded = {
+            'statusCode': 200,
+            'headers': headers,
+            'body': base64.b64encode(data).decode('ascii'),
+            'isBase64Encoded': True
+        }
+        response_cache.put(variant_key, service, encoded)
+    return encoded
+
+def negotiate_encoding(accept_encoding):
+    """Pick 'br' or 'gzip' from an Accept-Encoding header, or None"""
+    if not accept_encoding:
+        return None
+
+    accepted = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        quality = 1.0
+        if params.strip().startswith('q='):
+            try:
+                quality = float(params.strip()[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip().lower()] = quality
+
+    if brotli and accepted.get('br', 0) > 0:
+        return 'br'
+    if accepted.get('gzip', 0) > 0:
+        return 'gzip'
+    return None
+
+def compute_etag(body):
+    """Strong ETag derived from the serialized body"""
+    return '"' + hashlib.sha256(body.encode('utf-8')).hexdigest()[:32] + '"'
+
+def conditional_response(response, if_none_match):
+    """Answer 304 Not Modified with an empty body if the client's ETag matches"""
+    etag = response['headers'].get('ETag')
+    if not etag or not if_none_match:
+        return response
+
+    candidates = [tag.strip() for tag in if_none_match.split(',')]
+    if etag in candidates or '*' in candidates or f'W/{etag}' in candidates:
+        return {
+            'statusCode': 304,
+            'headers': {
+                'ETag': etag,
+                'Cache-Control': response['headers']['Cache-Control'],
+                'Access-Control-Allow-Origin': '*'
+            },
+            'body': ''
+        }
+    return response
+
+def get_all_repos(query_params=None):
+    """Get GitHub repositories (sorted by stars)"""
+    return collection_response('repos', query_params)
 
 def get_repo(repo_id):
     """Get single repository with summaries"""
-    repo = db_client.get_repo(repo_id)
+    repo = db_client.get_repo_json(repo_id)
 
     if not repo:
         return {
@@ -81,15 +222,30 @@ def get_repo(repo_id):
             'Content-Type': 'application/json',
             'Access-Control-Allow-Origin': '*'
         },
-        'body': json.dumps(repo, cls=DecimalEncoder)
+        'body': repo
     }
 
-def get_all_posts():
-    """Get all Medium posts"""
-    posts = db_client.get_all_posts()
+def get_all_posts(query_params=None):
+    """Get Medium posts (sorted by published date)"""
+    return collection_response('posts', query_params)
+
+def get_all_videos(query_params=None):
+    """Get YouTube videos (sorted by published date)"""
+    return collection_response('videos', query_params)
+
+def collection_response(name, query_params=None):
+    """
+    Serve a list collection from its sync-time snapshot (a single GetItem),
+    falling back to a live scan + sort when no snapshot has been written yet.
+    With limit/cursor/fields parameters, serve one page from the sorted
+    list index instead (see page_response).
+    """
+    if query_params:
+        return page_response(name, query_params)
 
-    # Sort by published date
-    posts.sort(key=lambda x: x.get('published_date', ''), reverse=True)
+    body = read_snapshot(db_client, name)
+    if body is None:
+        body = serialize_collection(db_client, name, segments=SCAN_SEGMENTS)
 
     return {
         'statusCode': 200,
@@ -97,15 +253,52 @@ def get_all_posts():
             'Content-Type': 'application/json',
             'Access-Control-Allow-Origin': '*'
         },
-        'body': json.dumps(posts, cls=DecimalEncoder)
+        'body': body
     }
 
-def get_all_videos():
-    """Get all YouTube videos"""
-    videos = db_client.get_all_videos()
+def page_response(name, query_params):
+    """
+    Serve one page of a collection with a DynamoDB Query on its sorted GSI.
 
-    # Sort by published date
-    videos.sort(key=lambda x: x.get('published_date', ''), reverse=True)
+    Query parameters:
+        limit: Page size (1 to MAX_PAGE_SIZE, default DEFAULT_PAGE_SIZE)
+        cursor: Opaque cursor from a previous page's next_cursor
+        fields: Comma-separated attribute names to return
+
+    Response body: {"items": [...], "next_cursor": "..." or null}
+    """
+    collection = COLLECTIONS[name]
+    try:
+        limit = int(query_params.get('limit', DEFAULT_PAGE_SIZE))
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            raise ValueError(f'limit must be between 1 and {MAX_PAGE_SIZE}')
+
+        fields = collection['fields']
+        if query_params.get('fields'):
+            fields = [f.strip() for f in query_params['fields'].split(',') if f.strip()]
+            unknown = set(fields) - set(collection['fields'])
+            if unknown:
+                raise ValueError(f'Unknown fields: {", ".join(sorted(unknown))}')
+
+        # A cursor is the LastEvaluatedKey of a list index query: the table
+        # key plus the index's partition and sort keys
+        start_key = decode_cursor(query_params.get('cursor'),
+                                  {collection['key'], LIST_KEY, collection['sort_key']})
+    except ValueError as e:
+        return bad_request(str(e))
+
+    try:
+        items, last_key = getattr(db_client, collection['page_loader'])(limit, start_key, fields)
+    except Exception as e:
+        # A stale or tampered cursor of the right shape is still refused by
+        # DynamoDB; that's the client's error, not a 500
+        if start_key and getattr(e, 'response', {}).get('Error', {}).get('Code') == 'ValidationException':
+            print(f"Rejected cursor: {e}")
+            return bad_request('Invalid cursor')
+        raise
+
+    with metrics.stage('serialize'):
+        body = json.dumps({'items': items, 'next_cursor': encode_cursor(last_key)}, cls=DecimalEncoder)
 
     return {
         'statusCode': 200,
@@ -113,5 +306,42 @@ def get_all_videos():
             'Content-Type': 'application/json',
             'Access-Control-Allow-Origin': '*'
         },
-        'body': json.dumps(videos, cls=DecimalEncoder)
+        'body': body
+    }
+
+def bad_request(message):
+    """400 response for an invalid query parameter"""
+    return {
+        'statusCode': 400,
+        'headers': {
+            'Content-Type': 'application/json',
+            'Access-Control-Allow-Origin': '*'
+        },
+        'body': json.dumps({'error': message})
     }
+
+def encode_cursor(last_key):
+    """Turn a LastEvaluatedKey into an opaque URL-safe cursor"""
+    if not last_key:
+        return None
+    raw = json.dumps(last_key, cls=DecimalEncoder, separators=(',', ':'))
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, key_names):
+    """
+    Turn a cursor back into an ExclusiveStartKey. ValueError if it is
+    malformed or its keys aren't exactly key_names with scalar values.
+    """
+    if not cursor:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        start_key = json.loads(raw, parse_float=Decimal)
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+    if not isinstance(start_key, dict) or set(start_key) != set(key_names):
+        raise ValueError('Invalid cursor')
+    if not all(isinstance(value, (str, int, Decimal)) and not isinstance(value, bool)
+               for value in start_key.values()):
+        raise ValueError('Invalid cursor')
+    return start_key
@@ -16,6 +16,19 @@ Environment Variables:
     - AI_API_KEY_SECRET: ARN of Anthropic API key in Secrets Manager
     - GITHUB_REPOS_TABLE: DynamoDB table name for storing repos
     - SYNC_METADATA_TABLE: DynamoDB table name for sync metadata
+    - SUMMARY_CACHE_TABLE: DynamoDB table name for cached AI summaries
+    - SYNC_CONCURRENCY: (optional) Worker pool size, default 4
+    - DEADLINE_BUFFER_MS: (optional) Time reserved before timeout, default 78050
+      (one batched summarization request plus the wrap-up reserve)
+    - SUMMARY_BATCH_MAX: (optional) READMEs per summarization request, default 8
+    - SUMMARY_BATCH_TOKEN_BUDGET: (optional) Input tokens per request, default 20000
+    - ANTHROPIC_API_URL: (optional) Messages endpoint override, e.g. a local stub
+    - GITHUB_API_URL: (optional) GitHub API override, e.g. a local fake server
+    - GITHUB_FETCH_BACKEND: (optional) "rest" or "graphql", default rest
+    - SYNC_CHECKPOINTS: (optional) Save progress and resume runs, default true
+    - SYNC_SELF_INVOKE: (optional) Re-invoke immediately to continue a run, default false
+    - GITHUB_RATE_LIMIT_FLOOR: (optional) Quota kept in reserve, default 50
+    - GITHUB_MAX_RATE_LIMIT_WAIT: (optional) Longest wait for a reset in seconds, default 60
 
 External Dependencies:
     - GitHub API v3: For fetching repositories and README files
@@ -27,10 +40,10 @@ External Dependencies:
 
 import json
 import os
-import boto3
 import hashlib
 import time
-import requests
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from itertools import islice
 
 # ============================================================================
 # Import Shared Modules from Lambda Layer
@@ -38,30 +51,85 @@ import requests
 # Lambda layers are mounted at /opt, so we add /opt/python to the path
 import sys
 sys.path.append('/opt/python')  # Lambda layer path for shared modules
-from db_client import DBClient
-from api_clients import GitHubClient
+from db_client import BATCH_GET_SIZE, BATCH_WRITE_SIZE, LIST_KEY, DBClient
+from api_clients import TIMEOUTS, GitHubClient, get_session
+from rate_limiter import RateLimitExceeded
+from http_cache import ConditionalCache
+from instrumentation import metrics
+from secrets_provider import SecretsProvider, is_auth_error
+from snapshots import write_snapshot
+
+# Module-level so cached secrets survive across warm invocations
+secrets_provider = SecretsProvider()
 
 # ============================================================================
-# Helper Functions
+# Configuration
 # ============================================================================
 
-def get_secret(secret_arn):
-    """
-    Retrieve a secret value from AWS Secrets Manager.
-
-    Args:
-        secret_arn (str): ARN of the secret in Secrets Manager
-
-    Returns:
-        dict: Parsed JSON secret value
-
-    Raises:
-        ClientError: If secret cannot be retrieved
-    """
-    client = boto3.client('secretsmanager')
-    response = client.get_secret_value(SecretId=secret_arn)
-    return json.loads(response['SecretString'])
+# Number of repos processed in parallel (README fetches and Claude calls)
+SYNC_CONCURRENCY = int(os.environ.get('SYNC_CONCURRENCY', '4'))
+
+# Time kept for the final writes, checkpoint and sync metadata. No Claude
+# request is started unless its full timeout fits before this reserve;
+# READMEs left unsummarized stay pending for the next invocation.
+WRAP_UP_MS = 15000
+
+# Stop scheduling new repos when less than this much time remains. Covers a
+# round of batched summarization requests (their timeout) plus the wrap-up.
+DEADLINE_BUFFER_MS = int(os.environ.get(
+    'DEADLINE_BUFFER_MS', str(int(sum(TIMEOUTS['anthropic_batch']) * 1000) + WRAP_UP_MS)
+))
+
+# Summaries are cached by content hash + model + prompt version (see
+# summary_cache_key). Bump PROMPT_VERSION whenever the prompt changes so old
+# cache entries are no longer matched.
+SUMMARY_MODEL = "claude-3-haiku-20240307"
+PROMPT_VERSION = "1"
+README_CHAR_LIMIT = 4000
+SUMMARY_CACHE_TTL_DAYS = int(os.environ.get('SUMMARY_CACHE_TTL_DAYS', '90'))
+
+# Fallback text stored when summarization fails (never cached)
+SUMMARY_FAILED = "Summary generation failed"
+
+# Messages endpoint; point at a local stub for offline testing
+# (see benchmarks/anthropic_stub.py)
+ANTHROPIC_API_URL = os.environ.get('ANTHROPIC_API_URL', 'https://api.anthropic.com/v1/messages')
+
+# Batched summarization: several READMEs are packed into one request until
+# either the estimated input token budget or the entry limit is reached.
+# Output tokens are reserved per entry so the JSON array isn't truncated.
+SUMMARY_BATCH_MAX = int(os.environ.get('SUMMARY_BATCH_MAX', '8'))
+SUMMARY_BATCH_TOKEN_BUDGET = int(os.environ.get('SUMMARY_BATCH_TOKEN_BUDGET', '20000'))
+SUMMARY_OUTPUT_TOKENS_PER_ENTRY = 256
+CHARS_PER_TOKEN = 4
+
+# Checkpointing: progress is saved to the sync metadata table so a run cut
+# short by the deadline resumes where it stopped. With SYNC_SELF_INVOKE the
+# function immediately re-invokes itself (asynchronously) to continue, up to
+# SYNC_MAX_CONTINUATIONS times per run. Checkpoints older than
+# CHECKPOINT_MAX_AGE_HOURS are discarded and the run starts over.
+CHECKPOINTS_ENABLED = os.environ.get('SYNC_CHECKPOINTS', 'true').lower() == 'true'
+SELF_INVOKE = os.environ.get('SYNC_SELF_INVOKE', 'false').lower() == 'true'
+MAX_CONTINUATIONS = int(os.environ.get('SYNC_MAX_CONTINUATIONS', '10'))
+CHECKPOINT_MAX_AGE_HOURS = int(os.environ.get('CHECKPOINT_MAX_AGE_HOURS', '72'))
+
+# How repositories and READMEs are fetched: "rest" (listing + one README
+# request per repo) or "graphql" (100 repos per query with README blob oids;
+# README text is only downloaded for repos whose oid changed)
+FETCH_BACKEND = os.environ.get('GITHUB_FETCH_BACKEND', 'rest').lower()
+
+# Stored attributes the planner diffs the listing against (see plan_repo),
+# plus the list index key for backfilling
+PLAN_FIELDS = ['repo_id', 'name', 'description', 'language', 'stars', 'forks', 'updated_at',
+               'pushed_at', 'url', 'readme_hash', 'readme_oid', LIST_KEY]
+
+# Refuse to prune more than this fraction of stored repos in one run; a
+# truncated or empty listing must not wipe the table
+MAX_DELETE_FRACTION = float(os.environ.get('MAX_DELETE_FRACTION', '0.5'))
 
+# ============================================================================
+# Helper Functions
+# ============================================================================
 
 def generate_summaries(readme_content, ai_api_key):
     """
@@ -80,9 +148,9 @@ def generate_summaries(readme_content, ai_api_key):
         tuple: (high_level_summary, detailed_summary) as strings
 
     Note:
-        - README content is truncated to 4000 chars to stay within token limits
+        - README content is truncated to README_CHAR_LIMIT chars to stay within token limits
         - Falls back to error message if API call fails
-        - Model: claude-3-5-sonnet-20241022 (latest Sonnet version)
+        - Model: SUMMARY_MODEL; failures are never written to the summary cache
     """
     # Construct the prompt for Claude
     prompt = f"""Analyze this README and provide two summaries:
@@ -90,65 +158,385 @@ def generate_summaries(readme_content, ai_api_key):
 2. A detailed 2-3 sentence technical summary
 
 README:
-{readme_content[:4000]}
+{readme_content[:README_CHAR_LIMIT]}
 
 Respond in JSON format:
 {{"high_level": "...", "detailed": "..."}}
 """
 
     try:
-        # Call Claude API directly using requests to avoid SDK issues
-        headers = {
-            "x-api-key": ai_api_key,
-            "anthropic-version": "2023-06-01",
-            "content-type": "application/json"
-        }
+        result = json.loads(call_claude(prompt, ai_api_key, max_tokens=1024))
+        return result.get('high_level', ''), result.get('detailed', '')
 
-        payload = {
-            "model": "claude-3-haiku-20240307",
-            "max_tokens": 1024,
-            "messages": [{"role": "user", "content": prompt}]
-        }
+    except Exception as e:
+        # Log the error and return fallback messages
+        print(f"Error generating summaries: {e}")
+        return SUMMARY_FAILED, SUMMARY_FAILED
+
+
+def generate_summaries_batch(readmes, ai_api_key):
+    """
+    Summarize several READMEs with a single Claude request.
+
+    Each README is sent tagged with a short ordinal id (1..n), not its
+    64-character summary key, and the model answers with a JSON array of
+    {"id", "high_level", "detailed"} objects. Ids are mapped back to the
+    keys locally.
+
+    Args:
+        readmes (dict): {key: readme_content}
+        ai_api_key (str): Anthropic API key for Claude access
+
+    Returns:
+        dict: {key: (high_level_summary, detailed_summary)} for every entry
+              that came back well-formed. Missing keys should be retried with
+              generate_summaries.
+    """
+    keys = {str(ordinal): key for ordinal, key in enumerate(readmes, 1)}
+    sections = "\n\n".join(
+        f'<readme id="{readme_id}">\n{readmes[key][:README_CHAR_LIMIT]}\n</readme>'
+        for readme_id, key in keys.items()
+    )
+    prompt = f"""Analyze each README below and provide two summaries for each:
+1. A one-sentence high-level summary
+2. A detailed 2-3 sentence technical summary
+
+{sections}
 
-        response = requests.post(
-            "https://api.anthropic.com/v1/messages",
+Respond with only a JSON array containing one object per README, using the id from its tag:
+[{{"id": "...", "high_level": "...", "detailed": "..."}}]
+"""
+
+    max_tokens = SUMMARY_OUTPUT_TOKENS_PER_ENTRY * len(readmes) + 256
+    try:
+        text = call_claude(prompt, ai_api_key, max_tokens=max_tokens,
+                           timeout=TIMEOUTS['anthropic_batch'])
+        # Tolerate prose around the array
+        entries = json.loads(text[text.index('['):text.rindex(']') + 1])
+    except Exception as e:
+        print(f"Error generating batched summaries: {e}")
+        return {}
+
+    results = {}
+    for entry in entries:
+        if not isinstance(entry, dict):
+            continue
+        key = keys.get(str(entry.get('id')))
+        high_level, detailed = entry.get('high_level'), entry.get('detailed')
+        if key and isinstance(high_level, str) and isinstance(detailed, str):
+            results[key] = (high_level, detailed)
+    return results
+
+
+def call_claude(prompt, ai_api_key, max_tokens, timeout=None):
+    """Send a single-turn prompt to the messages endpoint and return the reply text"""
+    # Call Claude API directly using requests to avoid SDK issues
+    headers = {
+        "x-api-key": ai_api_key,
+        "anthropic-version": "2023-06-01",
+        "content-type": "application/json"
+    }
+
+    payload = {
+        "model": SUMMARY_MODEL,
+        "max_tokens": max_tokens,
+        "messages": [{"role": "user", "content": prompt}]
+    }
+
+    # Shared pooled session: the TLS connection is reused across repos
+    with metrics.stage('anthropic'):
+        response = get_session().post(
+            ANTHROPIC_API_URL,
             headers=headers,
             json=payload,
-            timeout=30
+            timeout=timeout or TIMEOUTS['anthropic']
         )
-        response.raise_for_status()
+    response.raise_for_status()
 
-        # Parse the JSON response
-        message = response.json()
-        result = json.loads(message['content'][0]['text'])
-        return result.get('high_level', ''), result.get('detailed', '')
+    message = response.json()
+    if message.get('stop_reason') == 'max_tokens':
+        print(f"  Summary response truncated at {max_tokens} tokens")
+    return message['content'][0]['text']
 
-    except Exception as e:
-        # Log the error and return fallback messages
-        print(f"Error generating summaries: {e}")
-        return "Summary generation failed", "Summary generation failed"
+
+def estimate_tokens(readme_content):
+    """Rough input token count for a README as it is sent to the model"""
+    return len(readme_content[:README_CHAR_LIMIT]) // CHARS_PER_TOKEN + 32
+
+
+def pack_summary_batches(readmes):
+    """
+    Split {id: readme_content} into batches that fit SUMMARY_BATCH_MAX entries
+    and SUMMARY_BATCH_TOKEN_BUDGET estimated input tokens. Short READMEs are
+    packed densely; a README larger than the budget gets a batch of its own.
+    """
+    batches, batch, batch_tokens = [], {}, 0
+    for readme_id, content in readmes.items():
+        tokens = estimate_tokens(content)
+        if batch and (len(batch) >= SUMMARY_BATCH_MAX
+                      or batch_tokens + tokens > SUMMARY_BATCH_TOKEN_BUDGET):
+            batches.append(batch)
+            batch, batch_tokens = {}, 0
+        batch[readme_id] = content
+        batch_tokens += tokens
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def has_time_for(timeout, time_left):
+    """True if a request with this (connect, read) timeout ends before the wrap-up reserve"""
+    return time_left is None or time_left() > sum(timeout) * 1000 + WRAP_UP_MS
+
+
+def summarize_batch(readmes, ai_api_key, time_left=None):
+    """
+    Summarize a packed batch, falling back to one request per README for
+    entries the batched response didn't cover.
+
+    time_left, when given, returns the remaining invocation time in ms and
+    is checked before every request (see has_time_for).
+
+    Returns:
+        dict: {id: (high_level_summary, detailed_summary)} for every id a
+              request was made for; ids skipped for time are absent
+    """
+    batched = len(readmes) > 1 and has_time_for(TIMEOUTS['anthropic_batch'], time_left)
+    results = generate_summaries_batch(readmes, ai_api_key) if batched else {}
+
+    for readme_id, content in readmes.items():
+        if readme_id not in results:
+            if not has_time_for(TIMEOUTS['anthropic'], time_left):
+                print(f"  No time left to summarize {len(readmes) - len(results)} READMEs")
+                break
+            if batched:
+                print(f"  Batched summary missing for {readme_id} - retrying individually")
+            results[readme_id] = generate_summaries(content, ai_api_key)
+    return results
+
+
+def summary_cache_key(readme_content):
+    """
+    Content address of a summary: depends only on the README text actually
+    sent to the model, the model and the prompt version. Forks, templates and
+    rolled-back READMEs therefore hit the same entry.
+    """
+    material = f"{SUMMARY_MODEL}\n{PROMPT_VERSION}\n{readme_content[:README_CHAR_LIMIT]}"
+    return hashlib.sha256(material.encode('utf-8')).hexdigest()
+
+def time_remaining_ms(context):
+    """Remaining invocation time, or unlimited when run outside Lambda"""
+    if context is None or not hasattr(context, 'get_remaining_time_in_millis'):
+        return float('inf')
+    return context.get_remaining_time_in_millis()
+
+
+def chunked(iterable, size):
+    """Yield lists of up to size items from any iterable (including generators)"""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def plan_repo(repo, stored_repo):
+    """
+    Classify a listed repository against its stored row without any GitHub
+    request.
+
+    Returns:
+        str: 'new'       - not stored yet
+             'readme'    - the README may have changed: the GraphQL blob oid
+                           moved, or (REST) pushed_at moved
+             'metadata'  - only listing fields (stars, description, ...) moved
+             'unchanged' - nothing to do
+    """
+    if stored_repo is None:
+        return 'new'
+
+    if 'readme_oid' in repo:
+        readme_moved = repo['readme_oid'] != stored_repo.get('readme_oid')
+    else:
+        readme_moved = repo.get('pushed_at') != stored_repo.get('pushed_at')
+    if readme_moved:
+        return 'readme'
+
+    metadata = repo_metadata(repo)
+    if any(stored_repo.get(field) != value for field, value in metadata.items()):
+        return 'metadata'
+    return 'unchanged'
+
+
+def prepare_repo(repo, stored_repo, github_client):
+    """
+    Fetch a repository's README and detect whether it changed. Runs on a
+    worker thread for repos planned as new or README-possibly-changed;
+    summaries and writes are batched by the handler.
+
+    Args:
+        repo (dict): Repository object from the GitHub listing
+        stored_repo (dict): Stored planning fields for the repo, or None if new
+        github_client (GitHubClient): GitHub API client
+
+    Returns:
+        dict: {'repo', 'readme', 'readme_hash'} for new or changed READMEs
+              ('readme' is None if there is no README), or {'repo',
+              'readme_unchanged': True} if only the listing fields moved
+
+    Raises:
+        Exception: if the README couldn't be fetched. Nothing is written for
+                   the repo, so the planner picks it up again next run.
+    """
+    repo_name = repo['name']
+    metrics.debug('processing repo', repo_name)
+
+    if 'readme_oid' in repo:
+        # GraphQL listing: the text was prefetched for repos whose oid moved
+        readme_content = repo.get('readme_text')
+        if repo['readme_path'] and readme_content is None:
+            raise RuntimeError(f"README of {repo_name} could not be fetched")
+    else:
+        # Fetch README file from GitHub
+        readme_content = github_client.get_readme(repo['owner']['login'], repo_name)
+
+    if not readme_content:
+        return {'repo': repo, 'readme': None, 'readme_hash': None}
+
+    # Calculate MD5 hash to detect if README has changed
+    # This saves on AI API costs by only regenerating summaries when needed
+    readme_hash = hashlib.md5(readme_content.encode()).hexdigest()
+
+    # A push that didn't touch the README: keep the summaries
+    if stored_repo and stored_repo.get('readme_hash') == readme_hash:
+        metrics.debug('README unchanged', repo_name)
+        return {'repo': repo, 'readme_unchanged': True}
+
+    return {'repo': repo, 'readme': readme_content, 'readme_hash': readme_hash}
+
+
+def repo_metadata(repo):
+    """Stored attributes that come straight from the listing"""
+    metadata = {
+        'name': repo['name'],                        # Repository name
+        'description': repo.get('description', ''),  # Short description
+        'language': repo.get('language', 'Unknown'), # Primary language
+        'stars': repo.get('stargazers_count', 0),    # Star count
+        'forks': repo.get('forks_count', 0),         # Fork count
+        'updated_at': repo['updated_at'],            # Last GitHub update
+        'pushed_at': repo.get('pushed_at'),          # Last push to any branch
+        'url': repo['html_url']                      # GitHub URL
+    }
+    if 'readme_oid' in repo:
+        metadata['readme_oid'] = repo['readme_oid']  # Git blob id (GraphQL backend)
+    return metadata
+
+
+def build_repo_data(repo, readme_hash, high_level, detailed):
+    """Build the DynamoDB item for a repository"""
+    return dict(
+        repo_metadata(repo),
+        repo_id=str(repo['id']),                     # Primary key
+        high_level_summary=high_level,               # AI-generated summary
+        detailed_summary=detailed,                   # AI-generated detailed summary
+        last_synced=int(time.time()),                # Unix timestamp
+        readme_hash=readme_hash                      # MD5 hash for change detection
+    )
+
+def load_checkpoint(db_client):
+    """
+    Return the run state to continue: the saved checkpoint if there is a
+    recent one, otherwise a fresh run.
+
+    Returns:
+        dict: {'run_started_at', 'continuation', 'completed' and 'pending'
+               (sets of repo ids), 'synced_total'}
+    """
+    now = int(time.time())
+    fresh = {'run_started_at': now, 'continuation': 0, 'completed': set(), 'pending': set(),
+             'synced_total': 0}
+    if not CHECKPOINTS_ENABLED:
+        return fresh
+
+    checkpoint = db_client.get_checkpoint('github')
+    if not checkpoint:
+        return fresh
+    if now - int(checkpoint['run_started_at']) > CHECKPOINT_MAX_AGE_HOURS * 3600:
+        print("Discarding stale checkpoint - starting a new run")
+        return fresh
+
+    completed = set(checkpoint.get('completed', []))
+    print(f"Resuming run from checkpoint: {len(completed)} repos already done")
+    return {
+        'run_started_at': int(checkpoint['run_started_at']),
+        'continuation': int(checkpoint.get('continuation', 0)) + 1,
+        'completed': completed,
+        'pending': set(checkpoint.get('pending', [])),
+        'synced_total': int(checkpoint.get('synced_total', 0))
+    }
+
+
+def save_checkpoint(db_client, run, pending, last_repo_id):
+    """
+    Record progress: every repo finished so far in this run, the repos that
+    were started but not finished (retried first on resume) and the last
+    completed one.
+    """
+    if not CHECKPOINTS_ENABLED:
+        return
+    db_client.put_checkpoint('github', {
+        'run_started_at': run['run_started_at'],
+        'continuation': run['continuation'],
+        'completed': sorted(run['completed']),
+        'pending': sorted(pending),
+        'last_repo_id': last_repo_id,
+        'synced_total': run['synced_total']
+    })
+
+
+def invoke_continuation(context, run):
+    """Asynchronously invoke this function again to resume the run"""
+    if not SELF_INVOKE or context is None or not hasattr(context, 'invoked_function_arn'):
+        return False
+    if run['continuation'] >= MAX_CONTINUATIONS:
+        print(f"Reached {MAX_CONTINUATIONS} continuations - the next scheduled run will resume")
+        return False
+
+    import boto3
+    boto3.client('lambda').invoke(
+        FunctionName=context.invoked_function_arn,
+        InvocationType='Event',
+        Payload=json.dumps({'source': 'github_sync.continuation',
+                            'run_started_at': run['run_started_at']})
+    )
+    print("Invoked continuation to resume the sync")
+    return True
 
 # ============================================================================
 # Main Lambda Handler
 # ============================================================================
 
+@metrics.handler('github_sync')
 def lambda_handler(event, context):
     """
     Main Lambda handler for synchronizing GitHub repositories.
 
     This function:
     1. Retrieves API keys from AWS Secrets Manager
-    2. Fetches all repositories for the configured GitHub user
-    3. For each repository:
-       - Checks if it already exists in DynamoDB
-       - Fetches the README file
-       - Calculates MD5 hash to detect changes
-       - Generates AI summaries (if README changed or new repo)
-       - Stores/updates repository data in DynamoDB
-    4. Updates sync metadata with results
+    2. Fetches all repositories for the configured GitHub user (all pages)
+    3. Plans each repository against the stored table (see plan_repo) and
+       processes new / README-changed ones on a bounded worker pool (see
+       prepare_repo), reusing cached summaries by README content and
+       stopping new work when the Lambda deadline gets close. Metadata-only
+       changes are applied in place and repos gone upstream are deleted.
+    4. Checkpoints progress; a run stopped by the deadline resumes on the
+       next invocation (optionally an immediate self re-invocation)
+    5. Updates sync metadata with results
 
     Args:
-        event (dict): EventBridge event (empty for scheduled events)
+        event (dict): EventBridge event, or a continuation event sent by
+                      invoke_continuation (both resume any saved checkpoint)
         context (LambdaContext): Lambda execution context
 
     Returns:
@@ -160,6 +548,7 @@ def lambda_handler(event, context):
         - AI_API_KEY_SECRET: ARN of Anthropic API key in Secrets Manager
         - GITHUB_REPOS_TABLE: DynamoDB table name
         - SYNC_METADATA_TABLE: DynamoDB table name
+        - SUMMARY_CACHE_TABLE: DynamoDB table name
     """
     print("Starting GitHub sync...")
 
@@ -170,96 +559,384 @@ def lambda_handler(event, context):
         # Secrets are stored in Secrets Manager for security
         # Format: {"token": "ghp_..."} and {"api_key": "sk-..."}
 
-        github_secret = get_secret(os.environ['GITHUB_TOKEN_SECRET'])
-        ai_secret = get_secret(os.environ['AI_API_KEY_SECRET'])
+        # Both secrets come back from one BatchGetSecretValue call and stay
+        # cached in the container, so warm invocations skip Secrets Manager
+
+        secrets = secrets_provider.get_many([
+            os.environ['GITHUB_TOKEN_SECRET'],
+            os.environ['AI_API_KEY_SECRET']
+        ])
+        print(f"Secrets: {secrets_provider.stats()}")
 
-        github_token = github_secret['token']
-        ai_api_key = ai_secret['api_key']
+        github_token = secrets[os.environ['GITHUB_TOKEN_SECRET']]['token']
+        ai_api_key = secrets[os.environ['AI_API_KEY_SECRET']]['api_key']
         username = os.environ['GITHUB_USERNAME']
 
         # ------------------------------------------------------------------------
         # Step 2: Initialize API clients
         # ------------------------------------------------------------------------
 
-        github_client = GitHubClient(github_token)
         db_client = DBClient()
 
+        # ETags and Last-Modified values are persisted in the sync metadata
+        # table, so unchanged listings and READMEs come back as 304s that
+        # don't count against the GitHub rate limit
+        http_cache = ConditionalCache(db_client)
+        github_client = GitHubClient(github_token, cache=http_cache)
+
         # ------------------------------------------------------------------------
         # Step 3: Fetch all repositories for the user
         # ------------------------------------------------------------------------
-
-        repos = github_client.get_repos(username)
-        print(f"Found {len(repos)} repositories")
-
-        synced_count = 0  # Track how many repos were actually synced
+        # iter_repos pages through the full listing (100 per page). Later pages
+        # are fetched in the background while page 1 is being processed. The
+        # GraphQL backend returns the same shape plus README blob oids.
+
+        if FETCH_BACKEND == 'graphql':
+            repos = github_client.iter_repos_graphql(username)
+        else:
+            repos = github_client.iter_repos(username)
+
+        # Repos finished by earlier invocations of this run are skipped
+        run = load_checkpoint(db_client)
+        completed = run['completed']
+        last_repo_id = None
+
+        # Projected snapshot of the table for planning: one paginated scan of
+        # the few attributes plan_repo compares, instead of reading each row
+        stored = {item['repo_id']: item for item in db_client.get_all_repos(fields=PLAN_FIELDS)}
+
+        # Rows stored before the sorted list index existed lack its
+        # partition key; add it without regenerating their summaries
+        backfill = db_client.backfill_repo_list_keys(
+            [repo_id for repo_id, item in stored.items() if LIST_KEY not in item]
+        )
+        for repo_id, error in backfill['failed'].items():
+            print(f"  Failed to add {LIST_KEY} to repo {repo_id}: {error}")
+
+        synced_count = 0     # Track how many repos were actually synced
+        repo_count = 0       # Track how many repos were processed
+        deadline_hit = False # Set when we stop scheduling work near the timeout
+        rate_limited = False # Set when the GitHub quota is exhausted
+        budget_skipped = 0   # README-possibly-changed repos skipped to save quota
+        listing_complete = False
+        seen = set()         # every repo id in the upstream listing
+        plan_counts = {'new': 0, 'readme': 0, 'metadata': 0, 'unchanged': 0, 'deleted': 0}
 
         # ------------------------------------------------------------------------
-        # Step 4: Process each repository
+        # Step 4: Process repositories concurrently
         # ------------------------------------------------------------------------
-
-        for repo in repos:
-            # Extract repository metadata from GitHub API response
-            repo_id = str(repo['id'])
-            owner = repo['owner']['login']
-            repo_name = repo['name']
-
-            print(f"Processing repo: {repo_name}")
-
-            # Check if repository already exists in our database
-            existing_repo = db_client.get_repo(repo_id)
-
-            # Fetch README file from GitHub
-            readme_content = github_client.get_readme(owner, repo_name)
-
-            if readme_content:
-                # Calculate MD5 hash to detect if README has changed
-                # This saves on AI API costs by only regenerating summaries when needed
-                readme_hash = hashlib.md5(readme_content.encode()).hexdigest()
-
-                # Skip if README hasn't changed since last sync
-                if existing_repo and existing_repo.get('readme_hash') == readme_hash:
-                    print(f"  Skipping {repo_name} - no changes detected")
+        # Each listing batch is planned first (see plan_repo): unchanged repos
+        # cost nothing and metadata-only changes become small UpdateItem calls.
+        # For new and README-possibly-changed repos, a bounded worker pool
+        # fetches READMEs. At most 2x the pool size is in flight, so the lazy repo listing is only consumed as
+        # fast as we can process. Changed READMEs are queued and summarized a
+        # round at a time: the summary cache is checked in bulk and misses are
+        # packed into multi-README Claude requests (see pack_summary_batches).
+        # Repos are written with BatchWriteItem, 25 at a time.
+        #
+        # GitHub requests are paced by the client's rate-limit governor. When
+        # its remaining budget runs low, only new repos are fetched; if the
+        # quota is exhausted until a distant reset, the run stops scheduling
+        # and reports partial.
+
+        max_in_flight = SYNC_CONCURRENCY * 2
+        in_flight = {}       # future -> repo_id
+        started = set()      # repo ids scheduled by this invocation
+        summary_queue = []
+        pending_writes = []
+        metadata_updates = {}  # repo_id -> listing fields, for unchanged READMEs
+        failed_count = 0
+        summary_stats = {'summary_cache_hits': 0, 'summaries_generated': 0, 'summary_requests': 0}
+
+        def flush_writes():
+            nonlocal synced_count, failed_count, last_repo_id
+            report = db_client.put_repos(pending_writes)
+            pending_writes.clear()
+            synced_count += len(report['succeeded'])
+            failed_count += len(report['failed'])
+            completed.update(report['succeeded'])
+            if report['succeeded']:
+                last_repo_id = report['succeeded'][-1]
+            for repo_id, error in report['failed'].items():
+                print(f"  Failed to write repo {repo_id}: {error}")
+
+        def flush_metadata_updates():
+            nonlocal synced_count, failed_count
+            report = db_client.update_repos(metadata_updates)
+            metadata_updates.clear()
+            synced_count += len(report['succeeded'])
+            failed_count += len(report['failed'])
+            completed.update(report['succeeded'])
+            for repo_id, error in report['failed'].items():
+                print(f"  Failed to update repo {repo_id}: {error}")
+
+        def queue_metadata_update(repo):
+            metadata_updates[str(repo['id'])] = dict(repo_metadata(repo), last_synced=int(time.time()))
+            if len(metadata_updates) >= BATCH_WRITE_SIZE:
+                flush_metadata_updates()
+
+        @metrics.timed('summarize')
+        def summarize_queue(executor):
+            nonlocal deadline_hit
+            keys = {id(item): summary_cache_key(item['readme']) for item in summary_queue}
+            cached = db_client.get_cached_summaries(list(set(keys.values())))
+
+            # Misses are keyed by summary key so duplicate READMEs are sent once
+            misses = {}
+            for item in summary_queue:
+                if keys[id(item)] not in cached:
+                    misses.setdefault(keys[id(item)], item['readme'])
+            batches = pack_summary_batches(misses)
+            if misses:
+                print(f"  Generating AI summaries for {len(misses)} READMEs "
+                      f"in {len(batches)} request(s)")
+            generated = {}
+            time_left = lambda: time_remaining_ms(context)
+            for results in executor.map(lambda batch: summarize_batch(batch, ai_api_key, time_left),
+                                        batches):
+                generated.update(results)
+
+            now = int(time.time())
+            new_entries = {}
+            for key, (high_level, detailed) in generated.items():
+                if high_level == SUMMARY_FAILED:
                     continue
-
-                # Generate AI summaries using Claude
-                print(f"  Generating AI summaries for {repo_name}")
-                high_level, detailed = generate_summaries(readme_content, ai_api_key)
+                cached[key] = new_entries[key] = {
+                    'summary_key': key,
+                    'model': SUMMARY_MODEL,
+                    'prompt_version': PROMPT_VERSION,
+                    'high_level_summary': high_level,
+                    'detailed_summary': detailed,
+                    'created_at': now,
+                    'expires_at': now + SUMMARY_CACHE_TTL_DAYS * 86400
+                }
+            db_client.put_cached_summaries(list(new_entries.values()))
+
+            summary_stats['summary_cache_hits'] += sum(
+                1 for item in summary_queue if keys[id(item)] not in misses
+            )
+            summary_stats['summary_requests'] += len(batches)
+            summary_stats['summaries_generated'] += len(new_entries)
+
+            deferred = 0
+            for item in summary_queue:
+                summary = cached.get(keys[id(item)])
+                if summary:
+                    pending_writes.append(build_repo_data(
+                        item['repo'], item['readme_hash'],
+                        summary['high_level_summary'], summary['detailed_summary']
+                    ))
+                elif keys[id(item)] in generated:
+                    # Store no hash, oid or push time so the planner retries
+                    # summarization next run
+                    pending_writes.append(build_repo_data(
+                        dict(item['repo'], readme_oid=None, pushed_at=None),
+                        None, SUMMARY_FAILED, SUMMARY_FAILED
+                    ))
+                else:
+                    # Skipped for time: not written, so the repo stays
+                    # pending in the checkpoint
+                    deferred += 1
+            if deferred:
+                print(f"  Approaching Lambda timeout - {deferred} READMEs left for the next invocation")
+                deadline_hit = True
+            summary_queue.clear()
+
+        def collect(done, executor):
+            nonlocal repo_count, rate_limited, last_repo_id, failed_count
+            for future in done:
+                repo_id = in_flight.pop(future)
+                repo_count += 1
+                try:
+                    prepared = future.result()
+                except RateLimitExceeded as limit_error:
+                    print(f"  GitHub rate limit reached: {limit_error}")
+                    rate_limited = True
+                    continue
+                except Exception as repo_error:
+                    # One bad repo shouldn't fail the whole sync. It is left
+                    # as stored (not "no README") and retried next run.
+                    print(f"  Error processing repo: {repo_error}")
+                    failed_count += 1
+                    continue
+                if prepared.get('readme_unchanged'):
+                    # Only the listing fields moved
+                    queue_metadata_update(prepared['repo'])
+                    last_repo_id = repo_id
+                    continue
+                if prepared['readme'] is None:
+                    # Repository has no README file
+                    pending_writes.append(build_repo_data(
+                        prepared['repo'], None, "No README available",
+                        "This repository does not contain a README file."
+                    ))
+                else:
+                    summary_queue.append(prepared)
+
+            # Enough queued READMEs for one full batch per worker
+            if len(summary_queue) >= SYNC_CONCURRENCY * SUMMARY_BATCH_MAX:
+                summarize_queue(executor)
+            if len(pending_writes) >= BATCH_WRITE_SIZE:
+                flush_writes()
+
+        with ThreadPoolExecutor(max_workers=SYNC_CONCURRENCY) as executor:
+            for batch in chunked(repos, BATCH_GET_SIZE):
+                seen.update(str(repo['id']) for repo in batch)
+
+                # Skip what earlier invocations of this run already finished
+                batch = [repo for repo in batch if str(repo['id']) not in completed]
+
+                plans = {str(repo['id']): plan_repo(repo, stored.get(str(repo['id'])))
+                         for repo in batch}
+                for plan in plans.values():
+                    plan_counts[plan] += 1
+
+                for repo in batch:
+                    plan = plans[str(repo['id'])]
+                    if plan == 'unchanged':
+                        completed.add(str(repo['id']))
+                    elif plan == 'metadata':
+                        queue_metadata_update(repo)
+
+                # Only new and README-possibly-changed repos need GitHub and
+                # Claude. Spend the budget on work left over from the previous
+                # invocation, then new repos.
+                batch = [repo for repo in batch if plans[str(repo['id'])] in ('new', 'readme')]
+                batch.sort(key=lambda repo: (
+                    str(repo['id']) not in run['pending'],
+                    plans[str(repo['id'])] != 'new'
+                ))
+
+                # One BatchGetItem for the cached READMEs this batch may request,
+                # instead of a GetItem per README on a cold container
+                if FETCH_BACKEND != 'graphql':
+                    http_cache.load([github_client.readme_url(repo['owner']['login'], repo['name'])
+                                     for repo in batch])
+
+                if FETCH_BACKEND == 'graphql':
+                    # Download README text only where the blob oid moved
+                    try:
+                        texts = github_client.get_readme_texts(batch)
+                    except RateLimitExceeded as limit_error:
+                        print(f"  GitHub rate limit reached: {limit_error}")
+                        rate_limited = True
+                        break
+                    for repo in batch:
+                        repo['readme_text'] = texts.get(repo['id'])
+
+                for repo in batch:
+                    # Stop scheduling new work once we're close to the Lambda
+                    # timeout (or summarization already ran out of time)
+                    if deadline_hit or time_remaining_ms(context) < DEADLINE_BUFFER_MS:
+                        print("Approaching Lambda timeout - no new repos will be scheduled")
+                        deadline_hit = True
+                        break
+
+                    if len(in_flight) >= max_in_flight:
+                        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                        collect(done, executor)
+
+                    if rate_limited:
+                        print("GitHub quota exhausted - no new repos will be scheduled")
+                        break
+
+                    available = github_client.governor.available()
+                    if (available is not None and available < max_in_flight
+                            and plans[str(repo['id'])] != 'new'):
+                        budget_skipped += 1
+                        continue
+
+                    started.add(str(repo['id']))
+                    in_flight[executor.submit(
+                        prepare_repo, repo, stored.get(str(repo['id'])), github_client
+                    )] = str(repo['id'])
+
+                if deadline_hit or rate_limited:
+                    break
+
+                # Periodic checkpoint so even a hard timeout loses little work
+                save_checkpoint(db_client, run, started - completed, last_repo_id)
             else:
-                # Repository has no README file
-                readme_hash = None
-                high_level = "No README available"
-                detailed = "This repository does not contain a README file."
-
-            # ------------------------------------------------------------------------
-            # Step 5: Prepare repository data for storage
-            # ------------------------------------------------------------------------
-
-            repo_data = {
-                'repo_id': repo_id,                          # Primary key
-                'name': repo_name,                           # Repository name
-                'description': repo.get('description', ''),  # Short description
-                'language': repo.get('language', 'Unknown'), # Primary language
-                'stars': repo.get('stargazers_count', 0),    # Star count
-                'forks': repo.get('forks_count', 0),         # Fork count
-                'updated_at': repo['updated_at'],            # Last GitHub update
-                'url': repo['html_url'],                     # GitHub URL
-                'high_level_summary': high_level,            # AI-generated summary
-                'detailed_summary': detailed,                # AI-generated detailed summary
-                'last_synced': int(time.time()),             # Unix timestamp
-                'readme_hash': readme_hash                   # MD5 hash for change detection
-            }
-
-            # Store repository data in DynamoDB
-            db_client.put_repo(repo_data)
-            synced_count += 1
-            print(f"  Successfully synced {repo_name}")
+                listing_complete = True
+
+            if deadline_hit:
+                # Drop fetches still queued behind the pool; they stay pending
+                for future in [future for future in in_flight if future.cancel()]:
+                    in_flight.pop(future)
+            collect(wait(in_flight).done, executor)
+            if summary_queue:
+                summarize_queue(executor)
+            flush_writes()
+            flush_metadata_updates()
+
+        # Repos deleted or made private upstream are only pruned after the
+        # whole listing was seen, and never in bulk beyond MAX_DELETE_FRACTION
+        deleted = sorted(set(stored) - seen) if listing_complete else []
+        if deleted and len(deleted) > len(stored) * MAX_DELETE_FRACTION:
+            print(f"Refusing to delete {len(deleted)} of {len(stored)} stored repos")
+            failed_count += len(deleted)
+            deleted = []
+        if deleted:
+            report = db_client.delete_repos(deleted)
+            plan_counts['deleted'] = len(report['succeeded'])
+            failed_count += len(report['failed'])
+            print(f"Deleted {len(report['succeeded'])} repos no longer listed upstream")
+
+            # Their cached READMEs won't be requested again
+            cache_report = http_cache.delete([
+                github_client.readme_url(username, stored[repo_id]['name'])
+                for repo_id in report['succeeded'] if stored[repo_id].get('name')
+            ])
+            for key, error in cache_report['failed'].items():
+                print(f"  Failed to delete cache entry {key}: {error}")
 
         # ------------------------------------------------------------------------
-        # Step 6: Update sync metadata
+        # Step 5: Update sync metadata
         # ------------------------------------------------------------------------
-        # Record sync success and number of items synced for monitoring
-
-        db_client.update_sync_metadata('github', 'success', synced_count)
+        # Record sync status and number of items synced for monitoring. A run
+        # cut short by the deadline or the GitHub quota, or with failed
+        # writes, is recorded as "partial" with its counts.
+
+        # A run stopped early keeps its checkpoint and is reported in progress
+        # until an invocation covers the remaining repos
+        run['synced_total'] += synced_count
+        resumable = CHECKPOINTS_ENABLED and (deadline_hit or rate_limited)
+        if resumable:
+            save_checkpoint(db_client, run, started - completed, last_repo_id)
+            status = 'in_progress'
+        else:
+            if CHECKPOINTS_ENABLED:
+                db_client.delete_checkpoint('github')
+            status = ('partial' if deadline_hit or rate_limited or budget_skipped or failed_count
+                      else 'success')
+        metrics.add('items_synced', synced_count)
+        metrics.add('items_failed', failed_count)
+        metrics.set_property('sync_status', status)
+        print(f"Processed {repo_count} repositories, synced {synced_count}, "
+              f"{failed_count} failed ({status})")
+        print(f"Conditional request cache: {http_cache.stats()}")
+        print(f"Plan: {plan_counts}")
+        print(f"Summaries: {summary_stats}")
+        print(f"GitHub rate limit: {github_client.rate_limit_budget()}, "
+              f"{budget_skipped} repos skipped to save quota")
+
+        # Write the pre-sorted, pre-serialized list the API serves. This must
+        # happen before the metadata update, which bumps the API cache generation.
+        write_snapshot(db_client, 'repos')
+
+        db_client.update_sync_metadata('github', status, synced_count, extra=dict(
+            http_cache.stats(), **summary_stats, **github_client.governor.stats(),
+            **secrets_provider.stats(),
+            **{f'repos_{plan}': count for plan, count in plan_counts.items()},
+            repos_processed=repo_count, items_failed=failed_count,
+            repos_skipped_for_quota=budget_skipped,
+            run_started_at=run['run_started_at'], continuation=run['continuation'],
+            repos_completed_in_run=len(completed), items_synced_in_run=run['synced_total']
+        ))
+
+        # Only chain on the deadline; a quota stop waits for the next schedule
+        if resumable and deadline_hit:
+            invoke_continuation(context, run)
 
         # Return success response
         return {
@@ -277,6 +954,10 @@ def lambda_handler(event, context):
 
         print(f"Error during GitHub sync: {str(e)}")
 
+        # A rejected token may have been rotated; fetch fresh secrets next time
+        if is_auth_error(e):
+            secrets_provider.invalidate()
+
         # Update sync metadata to record failure
         # Note: We create a new db_client here in case the error occurred before initialization
         try:
@@ -2,26 +2,70 @@ import json
 import os
 import time
 import hashlib
-import re
 import sys
+from datetime import timezone
+from email.utils import parsedate_to_datetime
 sys.path.append('/opt/python')
 
-from db_client import DBClient
+from db_client import LIST_KEY, DBClient, is_unchanged
 from api_clients import MediumClient
+from instrumentation import metrics
+from snapshots import write_snapshot
 
-def strip_html(text):
-    """Remove HTML tags from text"""
-    if not text:
-        return ""
-    # Remove HTML tags
-    clean = re.sub('<.*?>', '', text)
-    # Replace multiple spaces with single space
-    clean = re.sub(r'\s+', ' ', clean)
-    # Trim whitespace
-    return clean.strip()
+# Attributes compared against the stored post to detect changes
+COMPARED_FIELDS = ['title', 'excerpt', 'published_date', 'read_time', 'url']
 
+# Medium's own reading speed for its "N min read" estimate
+READ_WORDS_PER_MINUTE = 265
+
+# Guids of the newest posts already synced are kept in the sync metadata;
+# streaming the feed stops at the first of them
+KNOWN_GUIDS_LIMIT = 50
+
+# Format of stored posts, recorded in the sync metadata. A run that finds an
+# older one converts the stored rows and re-reads the whole feed.
+#   2: published_date is ISO 8601 (RSS pubDate is RFC 822, which doesn't
+#      sort by date in the published-index GSI or the snapshot)
+POST_FORMAT_VERSION = 2
+
+def iso_date(pub_date):
+    """RFC 822 pubDate as an ISO 8601 UTC timestamp (None if it can't be parsed)"""
+    try:
+        published = parsedate_to_datetime(pub_date)
+    except (TypeError, ValueError):
+        return None
+    if published.tzinfo is None:
+        published = published.replace(tzinfo=timezone.utc)
+    return published.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+def convert_stored_dates(db_client):
+    """Rewrite the RFC 822 published_date of posts stored by older versions"""
+    updates = {}
+    for post in db_client.get_all_posts(fields=['post_id', 'published_date']):
+        published = post.get('published_date')
+        if published and not published[:1].isdigit():
+            # An unparseable date is left as stored: it is still a valid
+            # index key, where '' would be rejected
+            converted = iso_date(published)
+            if converted:
+                updates[post['post_id']] = {'published_date': converted}
+            else:
+                print(f"  Keeping unparseable published_date of post {post['post_id']}: {published!r}")
+    report = db_client.update_posts(updates)
+    print(f"Converted published_date of {len(report['succeeded'])} stored posts, "
+          f"{len(report['failed'])} failed")
+    return not report['failed']
+
+@metrics.handler('medium_sync')
 def lambda_handler(event, context):
-    """Main handler for Medium sync"""
+    """
+    Main handler for Medium sync.
+
+    The feed is fetched with the ETag / Last-Modified of the last successful
+    run, and a 304 ends the run. Otherwise posts are streamed newest first
+    and reading stops at the first guid a previous run already stored. An
+    event of {"full_sync": true} ignores both and re-reads the whole feed.
+    """
     print("Starting Medium sync...")
 
     db_client = None  # Initialize to None so it's available in except block
@@ -33,41 +77,104 @@ def lambda_handler(event, context):
         medium_client = MediumClient(username)
         db_client = DBClient()
 
-        # Fetch posts
-        posts = medium_client.get_posts()
-        print(f"Found {len(posts)} posts")
+        # Validators and known guids are only recorded by successful runs
+        full_sync = bool((event or {}).get('full_sync'))
+        previous = db_client.get_sync_metadata('medium') or {}
+        converted = True
+        if previous.get('post_format') != POST_FORMAT_VERSION:
+            # Stored rows predate the current format: convert them and
+            # re-read the whole feed
+            converted = convert_stored_dates(db_client)
+            full_sync = True
+        if full_sync:
+            previous = {}
+        feed_state = {
+            'feed_etag': previous.get('feed_etag'),
+            'feed_last_modified': previous.get('feed_last_modified'),
+            'known_guids': list(previous.get('known_guids') or []),
+            'post_format': POST_FORMAT_VERSION
+        }
+
+        feed = medium_client.get_feed(feed_state['feed_etag'], feed_state['feed_last_modified'])
+        if feed is None:
+            print("Feed not modified since the last sync")
+            db_client.update_sync_metadata('medium', 'success', 0,
+                                           extra=dict(feed_state, feed_not_modified=True))
+            return {
+                'statusCode': 200,
+                'body': json.dumps({'message': 'Feed not modified'})
+            }
 
-        synced_count = 0
+        # Stream posts newest first until one that is already stored
+        validators, feed_posts = feed
+        known_guids = set(feed_state['known_guids'])
+        posts = []
+        for post in feed_posts:
+            if post['guid'] in known_guids:
+                break
+            posts.append(post)
+        feed_posts.close()
+        print(f"Found {len(posts)} new posts")
 
-        for post in posts:
-            # Create post ID from URL
-            post_id = hashlib.md5(post['link'].encode()).hexdigest()
+        # Stored posts, in BatchGetItem calls of 100, to skip unchanged ones
+        post_ids = [hashlib.md5(post['link'].encode()).hexdigest() for post in posts]
+        stored_posts = db_client.get_posts_by_id(post_ids, fields=COMPARED_FIELDS + [LIST_KEY])
 
-            # Extract read time (estimated)
-            summary_length = len(post['summary'])
-            read_time = max(1, summary_length // 1000)  # ~1 min per 1000 chars
+        changed_posts = []
 
-            # Strip HTML from summary
-            clean_summary = strip_html(post['summary'])
-            excerpt = clean_summary[:300] + '...' if len(clean_summary) > 300 else clean_summary
+        for post_id, post in zip(post_ids, posts):
+            read_time = max(1, round(post['word_count'] / READ_WORDS_PER_MINUTE))
 
             post_data = {
                 'post_id': post_id,
                 'title': post['title'],
-                'excerpt': excerpt,
-                'published_date': post['published'],
+                'excerpt': post['excerpt'],
                 'read_time': f'{read_time} min read',
                 'url': post['link'],
                 'claps': 0,  # Not available via RSS
                 'last_synced': int(time.time())
             }
-
-            db_client.put_post(post_data)
-            synced_count += 1
-            print(f"Synced: {post['title']}")
-
-        # Update sync metadata
-        db_client.update_sync_metadata('medium', 'success', synced_count)
+            # published_date is the published-index sort key, which rejects
+            # '': a post without a parseable pubDate is stored without it
+            published_date = iso_date(post['published'])
+            if published_date:
+                post_data['published_date'] = published_date
+            else:
+                print(f"Unparseable pubDate for {post['link']}: {post['published']!r}")
+
+            if is_unchanged(stored_posts.get(post_id), post_data, COMPARED_FIELDS):
+                metrics.debug('unchanged', post['title'])
+                continue
+
+            changed_posts.append(post_data)
+
+        # Write all changed posts with parallel BatchWriteItem calls
+        report = db_client.put_posts(changed_posts)
+        synced_count = len(report['succeeded'])
+        for post_id, error in report['failed'].items():
+            print(f"Failed to write post {post_id}: {error}")
+        metrics.add('items_synced', synced_count)
+        metrics.add('items_failed', len(report['failed']))
+        print(f"Synced {synced_count} posts, {len(report['failed'])} failed")
+
+        # Write the pre-sorted, pre-serialized list the API serves. This must
+        # happen before the metadata update, which bumps the API cache generation.
+        write_snapshot(db_client, 'posts')
+
+        # Update sync metadata. After failed writes the validators, known
+        # guids and post format are left out, so the next run re-reads the
+        # whole feed (and retries converting stored rows).
+        status = 'partial' if report['failed'] or not converted else 'success'
+        extra = {'items_failed': len(report['failed'])}
+        if status == 'success':
+            guids = [post['guid'] for post in posts] + feed_state['known_guids']
+            extra.update({
+                'post_format': POST_FORMAT_VERSION,
+                'feed_etag': validators['etag'],
+                'feed_last_modified': validators['last_modified'],
+                'known_guids': list(dict.fromkeys(guids))[:KNOWN_GUIDS_LIMIT]
+            })
+        db_client.update_sync_metadata('medium', status, synced_count, extra=extra)
 
         return {
             'statusCode': 200,
@@ -1,18 +1,17 @@
 import json
 import os
-import boto3
 import time
 import sys
 sys.path.append('/opt/python')
 
-from db_client import DBClient
+from db_client import LIST_KEY, DBClient, is_unchanged
 from api_clients import YouTubeClient
+from secrets_provider import SecretsProvider, is_auth_error
+from instrumentation import metrics
+from snapshots import write_snapshot
 
-def get_secret(secret_arn):
-    """Retrieve secret from AWS Secrets Manager"""
-    client = boto3.client('secretsmanager')
-    response = client.get_secret_value(SecretId=secret_arn)
-    return json.loads(response['SecretString'])
+# Module-level so cached secrets survive across warm invocations
+secrets_provider = SecretsProvider()
 
 def parse_duration(duration):
     """Convert ISO 8601 duration to readable format"""
@@ -30,6 +29,10 @@ def parse_duration(duration):
     else:
         return f"{minutes}:{seconds:02d}"
 
+# Attributes compared against the stored video to detect changes
+COMPARED_FIELDS = ['title', 'description', 'published_date', 'views', 'duration', 'thumbnail_url']
+
+@metrics.handler('youtube_sync')
 def lambda_handler(event, context):
     """Main handler for YouTube sync"""
     print("Starting YouTube sync...")
@@ -38,7 +41,7 @@ def lambda_handler(event, context):
 
     try:
         # Get secrets
-        youtube_secret = get_secret(os.environ['YOUTUBE_API_KEY_SECRET'])
+        youtube_secret = secrets_provider.get(os.environ['YOUTUBE_API_KEY_SECRET'])
         youtube_api_key = youtube_secret['api_key']
         channel_id = os.environ['YOUTUBE_CHANNEL_ID']
 
@@ -50,7 +53,12 @@ def lambda_handler(event, context):
         videos = youtube_client.get_channel_videos(channel_id)
         print(f"Found {len(videos)} videos")
 
-        synced_count = 0
+        # Stored videos, in BatchGetItem calls of 100, to skip unchanged ones
+        stored_videos = db_client.get_videos_by_id(
+            [video['video_id'] for video in videos], fields=COMPARED_FIELDS + [LIST_KEY]
+        )
+
+        changed_videos = []
 
         for video in videos:
             video_data = {
@@ -65,12 +73,30 @@ def lambda_handler(event, context):
                 'last_synced': int(time.time())
             }
 
-            db_client.put_video(video_data)
-            synced_count += 1
-            print(f"Synced: {video['title']}")
+            if is_unchanged(stored_videos.get(video['video_id']), video_data, COMPARED_FIELDS):
+                metrics.debug('unchanged', video['title'])
+                continue
+
+            changed_videos.append(video_data)
+
+        # Write all changed videos with parallel BatchWriteItem calls
+        report = db_client.put_videos(changed_videos)
+        synced_count = len(report['succeeded'])
+        for video_id, error in report['failed'].items():
+            print(f"Failed to write video {video_id}: {error}")
+        metrics.add('items_synced', synced_count)
+        metrics.add('items_failed', len(report['failed']))
+        print(f"Synced {synced_count} videos, {len(report['failed'])} failed")
+
+        # Write the pre-sorted, pre-serialized list the API serves. This must
+        # happen before the metadata update, which bumps the API cache generation.
+        write_snapshot(db_client, 'videos')
 
         # Update sync metadata
-        db_client.update_sync_metadata('youtube', 'success', synced_count)
+        status = 'partial' if report['failed'] else 'success'
+        db_client.update_sync_metadata('youtube', status, synced_count,
+                                       extra=dict(secrets_provider.stats(),
+                                                  items_failed=len(report['failed'])))
 
         return {
             'statusCode': 200,
@@ -81,6 +107,9 @@ def lambda_handler(event, context):
 
     except Exception as e:
         print(f"Error: {str(e)}")
+        # A rejected key may have been rotated; fetch fresh secrets next time
+        if is_auth_error(e):
+            secrets_provider.invalidate()
         if db_client:
             db_client.update_sync_metadata('youtube', 'failed', 0, str(e))
 
@@ -1,108 +1,559 @@
 import requests
 import base64
+import html
+import os
+import re
+import threading
+import xml.etree.ElementTree as ElementTree
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qs, urlencode, urlparse
 
-# Conditional imports - only needed for specific clients
-try:
-    import feedparser
-except ImportError:
-    # feedparser not installed - MediumClient won't work but other clients will
-    feedparser = None
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-try:
-    from googleapiclient.discovery import build
-except ImportError:
-    # Google API client not installed - YouTubeClient won't work but other clients will
-    build = None
+from http_cache import ConditionalCache
+from instrumentation import metrics
+from rate_limiter import RateLimitExceeded, RateLimitGovernor
+
+# googleapiclient is imported lazily by the client that needs it, so Lambdas
+# that don't use it neither need it installed nor pay its import time on
+# cold start
+
+# ============================================================================
+# Shared HTTP transport
+# ============================================================================
+# One pooled Session per container: keep-alive connections (and their TLS
+# sessions) are reused across calls and warm invocations. The pool is sized
+# to the sync concurrency so worker threads don't block on connections.
+
+HTTP_POOL_SIZE = int(os.environ.get('HTTP_POOL_SIZE', '10'))
+
+# (connect, read) timeouts in seconds per upstream, so a stuck response can't
+# consume the whole Lambda budget
+TIMEOUTS = {
+    'github': (3.05, 15),
+    'anthropic': (3.05, 30),
+    'anthropic_batch': (3.05, 60),
+    'medium': (3.05, 10),
+    'youtube': (3.05, 15)
+}
+
+# Idempotent requests are retried on throttling and server errors with
+# exponential backoff, honoring Retry-After. POSTs are never retried here.
+RETRY_POLICY = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset(['GET', 'HEAD']),
+    respect_retry_after_header=True,
+    raise_on_status=False
+)
+
+# GitHub rate limits (403/429 with Retry-After) are left to the client's
+# RateLimitGovernor: retrying them here would sleep through Retry-After while
+# holding a governor slot, unseen by it and unbounded by its max_wait
+GITHUB_RETRY_POLICY = RETRY_POLICY.new(
+    status_forcelist=(500, 502, 503, 504),
+    respect_retry_after_header=False
+)
+
+SESSION_RETRY_POLICIES = {
+    'default': RETRY_POLICY,
+    'github': GITHUB_RETRY_POLICY
+}
+
+_sessions = {}
+_session_lock = threading.Lock()
+
+def get_session(kind='default'):
+    """Shared pooled requests.Session with the retry policy of kind mounted"""
+    session = _sessions.get(kind)
+    if session is None:
+        with _session_lock:
+            session = _sessions.get(kind)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE,
+                                      pool_maxsize=HTTP_POOL_SIZE,
+                                      max_retries=SESSION_RETRY_POLICIES[kind])
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                _sessions[kind] = session
+    return session
+
+# Requests rejected by a rate limit are retried this many times after the
+# governor's pause
+GITHUB_RATE_LIMIT_RETRIES = 2
+
+# GraphQL backend: README candidates probed per repository (the REST /readme
+# endpoint finds these itself) and how many README texts one query fetches
+README_PATHS = ('README.md', 'readme.md', 'Readme.md', 'README.rst', 'README.txt', 'README')
+GRAPHQL_README_BATCH = 25
+
+# The token can see the owner's private repos; only public ones are listed,
+# as with the REST /users/{user}/repos endpoint
+GRAPHQL_REPOS_QUERY = """
+query($login: String!, $cursor: String) {
+  repositoryOwner(login: $login) {
+    repositories(first: 100, after: $cursor, ownerAffiliations: OWNER, privacy: PUBLIC,
+                 orderBy: {field: NAME, direction: ASC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        databaseId name description url updatedAt pushedAt
+        stargazerCount forkCount
+        owner { login }
+        primaryLanguage { name }
+        %s
+      }
+    }
+  }
+}
+""" % '\n        '.join(
+    f'readme{i}: object(expression: "HEAD:{path}") {{ ... on Blob {{ oid }} }}'
+    for i, path in enumerate(README_PATHS)
+)
 
 class GitHubClient:
-    def __init__(self, token):
+    def __init__(self, token, cache=None, governor=None, base_url=None):
         self.token = token
         self.headers = {'Authorization': f'token {token}'}
-        self.base_url = 'https://api.github.com'
+        # Overridable so a local fake GitHub server can be used for testing
+        self.base_url = base_url or os.environ.get('GITHUB_API_URL', 'https://api.github.com')
+        # Optional ConditionalCache; when set, GETs send If-None-Match and
+        # a 304 is answered from the stored payload
+        self.cache = cache
+        # Every request goes through the governor, which paces concurrency
+        # from the X-RateLimit-* headers (see RateLimitGovernor)
+        self.governor = governor or RateLimitGovernor()
+
+    def rate_limit_budget(self):
+        """Current quota and throttle state as seen by the governor"""
+        return self.governor.budget()
+
+    def _send(self, url, headers, params=None, json_body=None):
+        """
+        GET (or POST json_body) through the governor, retrying rate-limit
+        rejections after its pause. Raises RateLimitExceeded if the last
+        attempt is still rejected, so callers can't mistake the 403/429 for
+        a missing resource.
+        """
+        session = get_session('github')
+        for attempt in range(GITHUB_RATE_LIMIT_RETRIES + 1):
+            self.governor.acquire()
+            response = None
+            try:
+                with metrics.stage('github'):
+                    if json_body is None:
+                        response = session.get(url, headers=headers, params=params,
+                                               timeout=TIMEOUTS['github'])
+                    else:
+                        response = session.post(url, headers=headers, json=json_body,
+                                                timeout=TIMEOUTS['github'])
+            finally:
+                self.governor.release(response)
+            if not RateLimitGovernor.is_rate_limited(response):
+                return response
+        raise RateLimitExceeded(self.governor.resume_at())
+
+    def _get(self, url, params=None, transform=None):
+        """
+        GET a JSON resource, using the conditional cache when configured.
+
+        Returns a (payload, link_header) tuple. transform is applied to the
+        JSON body before it is cached, so a 304 skips that work as well.
+        """
+        key = url + ('?' + urlencode(sorted(params.items())) if params else '')
+        entry = self.cache.get(key) if self.cache else None
+
+        headers = dict(self.headers, **ConditionalCache.conditional_headers(entry))
+        response = self._send(url, headers, params)
+
+        if response.status_code == 304 and entry:
+            self.cache.record_hit(entry)
+            return entry['payload'], entry.get('link')
+
+        response.raise_for_status()
+        payload = response.json()
+        if transform:
+            payload = transform(payload)
+
+        if self.cache:
+            self.cache.record_miss()
+            self.cache.put(key, response, payload)
+        return payload, response.headers.get('Link')
 
     def get_repos(self, username):
-        """Fetch all repositories for a user"""
+        """Fetch all repositories for a user (every page)"""
+        return list(self.iter_repos(username))
+
+    def iter_repos(self, username, per_page=100, max_workers=4):
+        """
+        Lazily yield all repositories for a user.
+
+        The first page is fetched synchronously and its Link header tells us
+        the last page number. The remaining pages are then requested
+        concurrently while the caller is still consuming page 1, and are
+        yielded in page order.
+        """
         url = f'{self.base_url}/users/{username}/repos'
-        response = requests.get(url, headers=self.headers)
+        first_page, link = self._get(url, {'per_page': per_page, 'page': 1})
+
+        last_page = self._last_page(link)
+        if last_page <= 1:
+            yield from first_page
+            return
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(self._get, url, {'per_page': per_page, 'page': page})
+                for page in range(2, last_page + 1)
+            ]
+            yield from first_page
+            for future in futures:
+                yield from future.result()[0]
+
+    @staticmethod
+    def _last_page(link_header):
+        """Read the last page number from a GitHub Link header"""
+        for link in requests.utils.parse_header_links(link_header or ''):
+            if link.get('rel') == 'last':
+                query = parse_qs(urlparse(link['url']).query)
+                return int(query.get('page', ['1'])[0])
+        return 1
+
+    # ------------------------------------------------------------------------
+    # GraphQL backend
+    # ------------------------------------------------------------------------
+    # One query returns 100 repositories with their README blob oid (the git
+    # object id, which changes exactly when the README does). README text is
+    # then fetched only for repos whose oid moved, many per query.
+
+    def _graphql(self, query, variables):
+        """Run a GraphQL query and return its data (partial errors are tolerated)"""
+        response = self._send(f'{self.base_url}/graphql', self.headers,
+                              json_body={'query': query, 'variables': variables})
         response.raise_for_status()
-        return response.json()
+        body = response.json()
+        if body.get('data') is None:
+            raise RuntimeError(f"GraphQL query failed: {body.get('errors')}")
+        return body['data']
+
+    def iter_repos_graphql(self, username):
+        """
+        Lazily yield all repositories for a user via GraphQL, in the same
+        shape as the REST listing plus pushed_at, readme_oid and readme_path
+        (None when the repo has no README). The next page is requested in
+        the background while the current one is being consumed.
+        """
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(self._graphql, GRAPHQL_REPOS_QUERY,
+                                     {'login': username, 'cursor': None})
+            while future:
+                owner = future.result()['repositoryOwner']
+                if owner is None:
+                    return
+                page = owner['repositories']
+                future = None
+                if page['pageInfo']['hasNextPage']:
+                    future = executor.submit(self._graphql, GRAPHQL_REPOS_QUERY, {
+                        'login': username, 'cursor': page['pageInfo']['endCursor']
+                    })
+                for node in page['nodes']:
+                    yield self._repo_from_node(node)
+
+    @staticmethod
+    def _repo_from_node(node):
+        """Map a GraphQL repository node onto the REST field names"""
+        readme_oid = readme_path = None
+        for i, path in enumerate(README_PATHS):
+            blob = node.get(f'readme{i}')
+            if blob and blob.get('oid'):
+                readme_oid, readme_path = blob['oid'], path
+                break
+
+        return {
+            'id': node['databaseId'],
+            'name': node['name'],
+            'owner': {'login': node['owner']['login']},
+            'description': node.get('description'),
+            'language': (node.get('primaryLanguage') or {}).get('name'),
+            'stargazers_count': node['stargazerCount'],
+            'forks_count': node['forkCount'],
+            'updated_at': node['updatedAt'],
+            'pushed_at': node.get('pushedAt'),
+            'html_url': node['url'],
+            'readme_oid': readme_oid,
+            'readme_path': readme_path
+        }
+
+    def get_readme_texts(self, repos):
+        """
+        Fetch README text for repos from iter_repos_graphql, up to
+        GRAPHQL_README_BATCH per query.
+
+        Returns:
+            dict: {repo id: README text}; binary READMEs map to '' and
+                  READMEs that couldn't be read are absent
+        """
+        repos = [repo for repo in repos if repo.get('readme_path')]
+        texts = {}
+        for start in range(0, len(repos), GRAPHQL_README_BATCH):
+            batch = repos[start:start + GRAPHQL_README_BATCH]
+            params, fields, variables = [], [], {}
+            for i, repo in enumerate(batch):
+                params.append(f'$o{i}: String!, $n{i}: String!, $e{i}: String!')
+                fields.append(f'r{i}: repository(owner: $o{i}, name: $n{i}) '
+                              f'{{ object(expression: $e{i}) {{ ... on Blob {{ text isBinary }} }} }}')
+                variables.update({f'o{i}': repo['owner']['login'], f'n{i}': repo['name'],
+                                  f'e{i}': f"HEAD:{repo['readme_path']}"})
+
+            query = f"query({', '.join(params)}) {{ {' '.join(fields)} }}"
+            data = self._graphql(query, variables)
+            for i, repo in enumerate(batch):
+                blob = (data.get(f'r{i}') or {}).get('object') or {}
+                if blob.get('isBinary'):
+                    texts[repo['id']] = ''
+                elif blob.get('text') is not None:
+                    texts[repo['id']] = blob['text']
+        return texts
 
     def get_readme(self, owner, repo):
-        """Fetch README content"""
-        url = f'{self.base_url}/repos/{owner}/{repo}/readme'
+        """
+        Fetch README content (decoded text is cached when a cache is set).
+
+        Returns None only if the repository has no README (404) or it isn't
+        UTF-8 text. Any other failure (timeouts, server errors after retries,
+        RateLimitExceeded) is raised, so it isn't stored as "no README".
+        """
+        url = self.readme_url(owner, repo)
         try:
-            response = requests.get(url, headers=self.headers)
-            response.raise_for_status()
-            content = base64.b64decode(response.json()['content'])
-            return content.decode('utf-8')
-        except:
+            content, _ = self._get(url, transform=self._decode_readme)
+            return content
+        except requests.HTTPError as e:
+            if e.response is not None and e.response.status_code == 404:
+                return None
+            raise
+        except UnicodeDecodeError:
             return None
 
+    def readme_url(self, owner, repo):
+        """README endpoint of a repository (also its conditional cache key)"""
+        return f'{self.base_url}/repos/{owner}/{repo}/readme'
+
+    @staticmethod
+    def _decode_readme(payload):
+        return base64.b64decode(payload['content']).decode('utf-8')
+
     def get_repo_contents(self, owner, repo, path=''):
         """Fetch repository file structure"""
         url = f'{self.base_url}/repos/{owner}/{repo}/contents/{path}'
-        response = requests.get(url, headers=self.headers)
+        response = self._send(url, self.headers)
         response.raise_for_status()
         return response.json()
 
+# Medium RSS elements, as ElementTree tags
+RSS_CONTENT = '{http://purl.org/rss/1.0/modules/content/}encoded'
+RSS_ITEM_FIELDS = {'title': 'title', 'link': 'link', 'guid': 'guid', 'pubDate': 'published'}
+
+# Post HTML to text: block-level tags separate words, every other tag (<a>,
+# <em>, <strong>, <code>, ...) is dropped so text runs join across it
+BLOCK_TAG = re.compile(r'<\s*/?\s*(?:p|h[1-6]|li|ul|ol|br|hr|div|figure|figcaption|blockquote|pre)\b[^>]*>',
+                       re.IGNORECASE)
+HTML_TAG = re.compile(r'<[^>]*>')
+
+MEDIUM_EXCERPT_CHARS = 300
+
+def html_excerpt(content, excerpt_chars=MEDIUM_EXCERPT_CHARS):
+    """
+    Plain-text excerpt and word count of an HTML fragment.
+
+    Returns:
+        tuple: (excerpt, word_count); the excerpt is the first excerpt_chars
+               of the whitespace-collapsed text, with '...' if truncated
+    """
+    text = HTML_TAG.sub('', BLOCK_TAG.sub(' ', content or ''))
+    words = (html.unescape(text) if '&' in text else text).split()
+
+    excerpt, excerpt_len = [], 0
+    for word in words:
+        if excerpt_len > excerpt_chars:
+            break
+        excerpt.append(word)
+        excerpt_len += len(word) + 1
+
+    text = ' '.join(excerpt)
+    return (text[:excerpt_chars] + '...' if len(text) > excerpt_chars else text), len(words)
+
+@metrics.timed('parse')
+def parse_rss_item(element):
+    """Post fields of one RSS <item>, with its excerpt and word count"""
+    post = {'title': '', 'link': '', 'guid': '', 'published': ''}
+    content = ''
+    for child in element:
+        if child.tag in RSS_ITEM_FIELDS:
+            post[RSS_ITEM_FIELDS[child.tag]] = (child.text or '').strip()
+        elif child.tag == RSS_CONTENT:
+            content = child.text or ''
+    # Medium always sends a guid; fall back to the link for other feeds
+    post['guid'] = post['guid'] or post['link']
+    post['excerpt'], post['word_count'] = html_excerpt(content)
+    return post
+
 class MediumClient:
-    def __init__(self, username):
+    def __init__(self, username, base_url=None):
         self.username = username
-        self.feed_url = f'https://medium.com/feed/@{username}'
-
-    def get_posts(self):
-        """Fetch Medium posts from RSS feed"""
-        feed = feedparser.parse(self.feed_url)
-        posts = []
-
-        for entry in feed.entries:
-            posts.append({
-                'title': entry.title,
-                'link': entry.link,
-                'published': entry.published,
-                'summary': entry.summary
-            })
+        # Overridable so a local fake feed server can be used for testing
+        base_url = base_url or os.environ.get('MEDIUM_URL', 'https://medium.com')
+        self.feed_url = f'{base_url}/feed/@{username}'
+
+    def get_feed(self, etag=None, last_modified=None):
+        """
+        Fetch the RSS feed, conditionally when validators from a previous
+        fetch are given.
+
+        Returns:
+            None if the feed is unchanged (304), otherwise a tuple of
+            ({'etag', 'last_modified'} of this response, generator of posts
+            newest first). Posts are parsed as the body streams in; closing
+            the generator early stops the download.
+        """
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+
+        with metrics.stage('medium'):
+            response = get_session().get(self.feed_url, headers=headers, stream=True,
+                                         timeout=TIMEOUTS['medium'])
+        if response.status_code == 304 or not response.ok:
+            response.close()
+            response.raise_for_status()
+            return None
+
+        validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified')
+        }
+        return validators, self._iter_posts(response)
 
-        return posts
+    @staticmethod
+    def _iter_posts(response):
+        """Stream <item>s out of the response body with iterparse"""
+        response.raw.decode_content = True
+        try:
+            channel = None
+            for event, element in ElementTree.iterparse(response.raw, events=('start', 'end')):
+                if event == 'start':
+                    if element.tag == 'channel':
+                        channel = element
+                elif element.tag == 'item':
+                    post = parse_rss_item(element)
+                    # Drop the parsed item so memory stays flat however long the feed is
+                    if channel is not None:
+                        channel.remove(element)
+                    yield post
+        finally:
+            response.close()
 
 class YouTubeClient:
-    def __init__(self, api_key):
+    def __init__(self, api_key, base_url=None):
         self.api_key = api_key
-        self.youtube = build('youtube', 'v3', developerKey=api_key)
-
-    def get_channel_videos(self, channel_id, max_results=50):
-        """Fetch videos from a channel"""
-        request = self.youtube.search().list(
-            part='snippet',
-            channelId=channel_id,
-            maxResults=max_results,
-            order='date',
-            type='video'
-        )
-        response = request.execute()
+        import httplib2
+        from googleapiclient.discovery import build
+        # Overridable so a local fake YouTube API can be used for testing
+        base_url = base_url or os.environ.get('YOUTUBE_API_URL')
+        client_options = {'api_endpoint': base_url} if base_url else None
+        # googleapiclient has its own httplib2 transport rather than the shared
+        # session; give it a socket timeout (httplib2 has a single one, applied
+        # to connect and read) so a stuck call can't consume the Lambda budget
+        http = httplib2.Http(timeout=TIMEOUTS['youtube'][1])
+        self.youtube = build('youtube', 'v3', developerKey=api_key, cache_discovery=False,
+                             client_options=client_options, http=http)
+
+    @staticmethod
+    def _execute(request):
+        """Run an API request, retrying throttling and server errors like RETRY_POLICY"""
+        with metrics.stage('youtube'):
+            return request.execute(num_retries=RETRY_POLICY.total)
+
+    def get_channel_videos(self, channel_id, max_results=None):
+        """
+        Fetch videos from a channel, newest first.
+
+        Walks the channel's uploads playlist with nextPageToken pagination
+        (1 quota unit per page of 50, versus 100 for search) and fetches
+        details for each page with a single videos().list call of up to 50
+        comma-joined ids. max_results=None returns the whole channel.
+        """
+        uploads_playlist = self._get_uploads_playlist(channel_id)
+        if not uploads_playlist:
+            return []
+
+        videos = []
+        page_token = None
+        while True:
+            response = self._execute(self.youtube.playlistItems().list(
+                part='contentDetails',
+                playlistId=uploads_playlist,
+                maxResults=50,
+                pageToken=page_token
+            ))
+
+            video_ids = [item['contentDetails']['videoId'] for item in response.get('items', [])]
+            videos.extend(self._get_video_details(video_ids))
+
+            page_token = response.get('nextPageToken')
+            if not page_token or (max_results and len(videos) >= max_results):
+                break
+
+        return videos[:max_results] if max_results else videos
+
+    def _get_uploads_playlist(self, channel_id):
+        """Look up the id of a channel's uploads playlist"""
+        response = self._execute(self.youtube.channels().list(
+            part='contentDetails',
+            id=channel_id
+        ))
+
+        items = response.get('items', [])
+        if not items:
+            return None
+        return items[0]['contentDetails']['relatedPlaylists']['uploads']
+
+    def _get_video_details(self, video_ids):
+        """Fetch snippet, duration and views for up to 50 videos in one call"""
+        if not video_ids:
+            return []
+
+        response = self._execute(self.youtube.videos().list(
+            part='snippet,contentDetails,statistics',
+            id=','.join(video_ids),
+            maxResults=50
+        ))
+
+        # Private and deleted uploads are listed in the playlist but not
+        # returned here; keep playlist order for the rest
+        details = {item['id']: item for item in response.get('items', [])}
 
         videos = []
-        for item in response.get('items', []):
-            video_id = item['id']['videoId']
-
-            # Get video details for duration and views
-            video_request = self.youtube.videos().list(
-                part='contentDetails,statistics',
-                id=video_id
-            )
-            video_response = video_request.execute()
-
-            if video_response['items']:
-                video_info = video_response['items'][0]
-
-                videos.append({
-                    'video_id': video_id,
-                    'title': item['snippet']['title'],
-                    'description': item['snippet']['description'],
-                    'published_date': item['snippet']['publishedAt'],
-                    'thumbnail_url': item['snippet']['thumbnails']['high']['url'],
-                    'duration': video_info['contentDetails']['duration'],
-                    'views': video_info['statistics'].get('viewCount', '0')
-                })
+        for video_id in video_ids:
+            video_info = details.get(video_id)
+            if not video_info:
+                continue
+
+            snippet = video_info['snippet']
+            thumbnails = snippet.get('thumbnails', {})
+            thumbnail = thumbnails.get('high') or thumbnails.get('default') or {}
+
+            videos.append({
+                'video_id': video_id,
+                'title': snippet['title'],
+                'description': snippet.get('description', ''),
+                'published_date': snippet['publishedAt'],
+                'thumbnail_url': thumbnail.get('url', ''),
+                'duration': video_info['contentDetails']['duration'],
+                'views': video_info['statistics'].get('viewCount', '0')
+            })
 
         return videos
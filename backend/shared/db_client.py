@@ -1,9 +1,44 @@
-import boto3
+import base64
 import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from decimal import Decimal
 import json
+from json.encoder import encode_basestring_ascii as encode_json_string
 
-dynamodb = boto3.resource('dynamodb')
+from instrumentation import RETURN_CONSUMED_CAPACITY, metrics
+
+# boto3 is imported and the DynamoDB resource is created on first use, not at
+# import time, to keep Lambda cold starts short. Table handles are memoized
+# for the life of the container.
+_dynamodb = None
+_raw_client = None
+_tables = {}
+_init_lock = threading.Lock()
+
+# DynamoDB limits and retry policy for batch operations
+BATCH_GET_SIZE = 100
+BATCH_WRITE_SIZE = 25
+BATCH_WRITE_WORKERS = 4
+BATCH_MAX_RETRIES = 6
+BATCH_BASE_DELAY = 0.05
+
+# Collection snapshots live in the sync metadata table; large ones are split
+# into chunks that fit under the 400 KB item size limit
+SNAPSHOT_KEY_PREFIX = 'snapshot#'
+SNAPSHOT_CHUNK_SIZE = 350 * 1024
+
+# Resumable sync progress is stored next to the sync status, one item per service
+CHECKPOINT_KEY_PREFIX = 'checkpoint#'
+
+# Every content item carries a constant list_pk so a single GSI partition
+# holds the whole collection in display order (see terraform/modules/database)
+LIST_KEY = 'list_pk'
+REPOS_LIST_INDEX = 'stars-index'
+POSTS_LIST_INDEX = 'published-index'
+VIDEOS_LIST_INDEX = 'published-index'
 
 class DecimalEncoder(json.JSONEncoder):
     def default(self, obj):
@@ -11,49 +46,542 @@ class DecimalEncoder(json.JSONEncoder):
             return int(obj) if obj % 1 == 0 else float(obj)
         return super(DecimalEncoder, self).default(obj)
 
+def get_dynamodb():
+    """Shared DynamoDB resource, created on first use"""
+    global _dynamodb
+    if _dynamodb is None:
+        with _init_lock:
+            if _dynamodb is None:
+                import boto3
+                _dynamodb = boto3.resource('dynamodb')
+    return _dynamodb
+
+def get_raw_client():
+    """
+    Shared low-level DynamoDB client for the raw read path, created on first
+    use. Not the resource's meta.client: creating a Table registers the
+    resource's (de)serializers on that client, so its responses would no
+    longer be AttributeValue maps.
+    """
+    global _raw_client
+    if _raw_client is None:
+        with _init_lock:
+            if _raw_client is None:
+                import boto3
+                _raw_client = boto3.client('dynamodb')
+    return _raw_client
+
+def get_table(env_var):
+    """Memoized Table handle for the table named in env_var, or None if unset"""
+    name = os.environ.get(env_var)
+    if name is None:
+        return None
+    table = _tables.get(name)
+    if table is None:
+        table = _tables.setdefault(name, get_dynamodb().Table(name))
+    return table
+
+def call(kind, operation, **kwargs):
+    """
+    Run one DynamoDB operation (a Table or client method) as a timed
+    dynamodb_read / dynamodb_write stage, recording its consumed capacity.
+    """
+    with metrics.stage(f'dynamodb_{kind}'):
+        response = operation(ReturnConsumedCapacity=RETURN_CONSUMED_CAPACITY, **kwargs)
+    metrics.record_capacity(response, kind)
+    return response
+
+def attribute_to_json(value):
+    """
+    Transcode one raw DynamoDB AttributeValue straight to JSON text.
+
+    Numbers arrive as strings in DynamoDB's canonical form and are written
+    verbatim, skipping the Decimal round trip of the resource layer and the
+    per-number DecimalEncoder.default() hook.
+    """
+    type_name, data = next(iter(value.items()))
+    if type_name == 'S':
+        return encode_json_string(data)
+    if type_name == 'N':
+        return data
+    if type_name == 'M':
+        return item_to_json(data)
+    if type_name == 'L':
+        return '[' + ','.join(attribute_to_json(v) for v in data) + ']'
+    if type_name == 'BOOL':
+        return 'true' if data else 'false'
+    if type_name == 'NULL':
+        return 'null'
+    if type_name == 'SS':
+        return '[' + ','.join(encode_json_string(v) for v in data) + ']'
+    if type_name == 'NS':
+        return '[' + ','.join(data) + ']'
+    if type_name == 'B':
+        return '"' + base64.b64encode(data).decode('ascii') + '"'
+    if type_name == 'BS':
+        return '[' + ','.join('"' + base64.b64encode(v).decode('ascii') + '"' for v in data) + ']'
+    raise TypeError(f'Unsupported DynamoDB type: {type_name}')
+
+def item_to_json(item):
+    """Transcode a raw DynamoDB item (AttributeValue map) to a JSON object"""
+    return '{' + ','.join(
+        encode_json_string(name) + ':' + attribute_to_json(value) for name, value in item.items()
+    ) + '}'
+
+def items_to_json(items):
+    """Transcode raw DynamoDB items to a JSON array"""
+    return '[' + ','.join(item_to_json(item) for item in items) + ']'
+
+def raw_sort_value(value, default):
+    """Comparable value of a raw AttributeValue, for sorting raw items"""
+    if not value:
+        return default
+    if 'N' in value:
+        return Decimal(value['N'])
+    return next(iter(value.values()))
+
+def binary_value(value):
+    """Unwrap a DynamoDB Binary attribute into bytes"""
+    return bytes(value.value if hasattr(value, 'value') else value)
+
+def projection(fields):
+    """Build ProjectionExpression kwargs, aliasing names to dodge reserved words"""
+    names = {f'#f{i}': name for i, name in enumerate(fields)}
+    return {
+        'ProjectionExpression': ', '.join(names),
+        'ExpressionAttributeNames': names
+    }
+
+def is_unchanged(stored, item, fields):
+    """
+    True if a stored item already has the item's values for fields, so the
+    write can be skipped. stored is the row as loaded up front with the
+    get_*_by_id batch lookups (projected to fields + LIST_KEY), or None.
+    """
+    if stored is None or LIST_KEY not in stored:
+        # Rows written before the list index existed need a rewrite to get list_pk
+        return False
+    return all(stored.get(f) == item.get(f) for f in fields)
+
 class DBClient:
-    def __init__(self):
-        # Only initialize tables if their environment variables are set
-        self.github_table = dynamodb.Table(os.environ['GITHUB_REPOS_TABLE']) if 'GITHUB_REPOS_TABLE' in os.environ else None
-        self.medium_table = dynamodb.Table(os.environ['MEDIUM_POSTS_TABLE']) if 'MEDIUM_POSTS_TABLE' in os.environ else None
-        self.youtube_table = dynamodb.Table(os.environ['YOUTUBE_VIDEOS_TABLE']) if 'YOUTUBE_VIDEOS_TABLE' in os.environ else None
-        self.sync_table = dynamodb.Table(os.environ['SYNC_METADATA_TABLE']) if 'SYNC_METADATA_TABLE' in os.environ else None
+    # Tables are resolved lazily, and only if their environment variables are set
+
+    @property
+    def github_table(self):
+        return get_table('GITHUB_REPOS_TABLE')
+
+    @property
+    def medium_table(self):
+        return get_table('MEDIUM_POSTS_TABLE')
+
+    @property
+    def youtube_table(self):
+        return get_table('YOUTUBE_VIDEOS_TABLE')
+
+    @property
+    def sync_table(self):
+        return get_table('SYNC_METADATA_TABLE')
+
+    @property
+    def summary_table(self):
+        return get_table('SUMMARY_CACHE_TABLE')
 
     def put_repo(self, repo_data):
         """Store a GitHub repository"""
-        return self.github_table.put_item(Item=repo_data)
+        return call('write', self.github_table.put_item, Item=dict(repo_data, **{LIST_KEY: 'repo'}))
+
+    def put_repos(self, repos):
+        """Store many GitHub repositories (see _batch_write for the report format)"""
+        return self._batch_write(self.github_table, 'repo_id',
+                                 [dict(repo, **{LIST_KEY: 'repo'}) for repo in repos])
+
+    def backfill_repo_list_keys(self, repo_ids):
+        """
+        Add list_pk to repos stored before the list index existed, with
+        parallel UpdateItem calls (see update_repos for the report format)
+        """
+        return self.update_repos({repo_id: {LIST_KEY: 'repo'} for repo_id in repo_ids})
+
+    def update_repos(self, updates):
+        """
+        Set attributes on stored repositories without rewriting them
+        ({repo_id: {field: value}}, see _batch_update for the report format)
+        """
+        return self._batch_update(self.github_table, 'repo_id', updates)
+
+    def delete_repos(self, repo_ids):
+        """Remove many repositories (see _batch_write for the report format)"""
+        return self._batch_write(self.github_table, 'repo_id',
+                                 [{'repo_id': repo_id} for repo_id in repo_ids], delete=True)
 
     def get_repo(self, repo_id):
         """Get a single repository"""
-        response = self.github_table.get_item(Key={'repo_id': repo_id})
+        response = call('read', self.github_table.get_item, Key={'repo_id': repo_id})
         return response.get('Item')
 
-    def get_all_repos(self):
-        """Get all repositories"""
-        response = self.github_table.scan()
-        return response.get('Items', [])
+    def get_repo_json(self, repo_id):
+        """Get a single repository as JSON text (see item_to_json), or None"""
+        response = call(
+            'read', get_raw_client().get_item,
+            TableName=self.github_table.name, Key={'repo_id': {'S': repo_id}}
+        )
+        item = response.get('Item')
+        return item_to_json(item) if item else None
+
+    def get_all_repos(self, fields=None, segments=1, raw=False):
+        """Stream all repositories (see _scan for fields/segments/raw)"""
+        return self._scan(self.github_table, fields, segments, raw)
+
+    def get_repos_page(self, limit, start_key=None, fields=None):
+        """One page of repositories, most stars first (see _query_page)"""
+        return self._query_page(self.github_table, REPOS_LIST_INDEX, 'repo', limit, start_key, fields)
 
     def put_post(self, post_data):
         """Store a Medium post"""
-        return self.medium_table.put_item(Item=post_data)
+        return call('write', self.medium_table.put_item, Item=dict(post_data, **{LIST_KEY: 'post'}))
+
+    def put_posts(self, posts):
+        """Store many Medium posts (see _batch_write for the report format)"""
+        return self._batch_write(self.medium_table, 'post_id',
+                                 [dict(post, **{LIST_KEY: 'post'}) for post in posts])
+
+    def update_posts(self, updates):
+        """
+        Set attributes on stored Medium posts without rewriting them
+        ({post_id: {field: value}}, see _batch_update for the report format)
+        """
+        return self._batch_update(self.medium_table, 'post_id', updates)
+
+    def get_posts_by_id(self, post_ids, fields=None):
+        """Get many Medium posts at once, as a dict keyed by post_id"""
+        return self._batch_get(self.medium_table, 'post_id', post_ids, fields)
+
+    def get_all_posts(self, fields=None, segments=1, raw=False):
+        """Stream all Medium posts (see _scan for fields/segments/raw)"""
+        return self._scan(self.medium_table, fields, segments, raw)
 
-    def get_all_posts(self):
-        """Get all Medium posts"""
-        response = self.medium_table.scan()
-        return response.get('Items', [])
+    def get_posts_page(self, limit, start_key=None, fields=None):
+        """One page of Medium posts, newest first (see _query_page)"""
+        return self._query_page(self.medium_table, POSTS_LIST_INDEX, 'post', limit, start_key, fields)
 
     def put_video(self, video_data):
         """Store a YouTube video"""
-        return self.youtube_table.put_item(Item=video_data)
+        return call('write', self.youtube_table.put_item, Item=dict(video_data, **{LIST_KEY: 'video'}))
+
+    def put_videos(self, videos):
+        """Store many YouTube videos (see _batch_write for the report format)"""
+        return self._batch_write(self.youtube_table, 'video_id',
+                                 [dict(video, **{LIST_KEY: 'video'}) for video in videos])
+
+    def get_videos_by_id(self, video_ids, fields=None):
+        """Get many YouTube videos at once, as a dict keyed by video_id"""
+        return self._batch_get(self.youtube_table, 'video_id', video_ids, fields)
+
+    def get_all_videos(self, fields=None, segments=1, raw=False):
+        """Stream all YouTube videos (see _scan for fields/segments/raw)"""
+        return self._scan(self.youtube_table, fields, segments, raw)
+
+    def get_videos_page(self, limit, start_key=None, fields=None):
+        """One page of YouTube videos, newest first (see _query_page)"""
+        return self._query_page(self.youtube_table, VIDEOS_LIST_INDEX, 'video', limit, start_key, fields)
+
+    def get_cached_summaries(self, summary_keys):
+        """Look up cached AI summaries by content key; {} if no cache table is configured"""
+        if self.summary_table is None:
+            return {}
+        return self._batch_get(self.summary_table, 'summary_key', summary_keys,
+                               ['high_level_summary', 'detailed_summary'])
+
+    def put_cached_summaries(self, entries):
+        """Store AI summaries keyed by summary_key (see _batch_write for the report format)"""
+        if self.summary_table is None:
+            return {'succeeded': [], 'failed': {}}
+        return self._batch_write(self.summary_table, 'summary_key', entries)
+
+    @staticmethod
+    def _query_page(table, index_name, list_value, limit, start_key=None, fields=None):
+        """
+        Read one page of a collection from its sorted list index.
+
+        The index is already in display order, so page cost is independent
+        of table size. Returns (items, last_key); last_key is None on the
+        final page and is passed back as start_key for the next one.
+        """
+        query_kwargs = {
+            'IndexName': index_name,
+            'KeyConditionExpression': '#pk = :pk',
+            'ExpressionAttributeNames': {'#pk': LIST_KEY},
+            'ExpressionAttributeValues': {':pk': list_value},
+            'ScanIndexForward': False,
+            'Limit': limit
+        }
+        if fields:
+            fields_kwargs = projection(fields)
+            query_kwargs['ProjectionExpression'] = fields_kwargs['ProjectionExpression']
+            query_kwargs['ExpressionAttributeNames'].update(fields_kwargs['ExpressionAttributeNames'])
+        if start_key:
+            query_kwargs['ExclusiveStartKey'] = start_key
+
+        response = call('read', table.query, **query_kwargs)
+        return response.get('Items', []), response.get('LastEvaluatedKey')
+
+    def _scan(self, table, fields=None, segments=1, raw=False):
+        """
+        Yield every item in a table, following LastEvaluatedKey so results
+        are never truncated at 1 MB.
+
+        fields limits the attributes returned (ProjectionExpression), e.g. to
+        leave heavy summaries out of list endpoints. segments > 1 runs a
+        parallel scan with one thread per Segment; items are then yielded a
+        segment at a time, in no particular order. raw=True scans through the
+        low-level client and yields AttributeValue maps (no Decimal
+        conversion), for use with item_to_json.
+        """
+        scan_kwargs = projection(fields) if fields else {}
+        if segments <= 1:
+            yield from self._scan_segment(table, scan_kwargs, raw)
+            return
+
+        def scan_segment(segment):
+            return list(self._scan_segment(
+                table, dict(scan_kwargs, Segment=segment, TotalSegments=segments), raw
+            ))
+
+        with ThreadPoolExecutor(max_workers=segments) as executor:
+            futures = [executor.submit(scan_segment, segment) for segment in range(segments)]
+            for future in as_completed(futures):
+                yield from future.result()
+
+    @staticmethod
+    def _scan_segment(table, scan_kwargs, raw=False):
+        """Yield items from one (possibly segmented) scan, page by page"""
+        scan = table.scan
+        if raw:
+            scan = get_raw_client().scan
+            scan_kwargs = dict(scan_kwargs, TableName=table.name)
+
+        while True:
+            response = call('read', scan, **scan_kwargs)
+            yield from response.get('Items', [])
+
+            last_key = response.get('LastEvaluatedKey')
+            if not last_key:
+                return
+            scan_kwargs = dict(scan_kwargs, ExclusiveStartKey=last_key)
+
+    def _batch_get(self, table, key_name, ids, fields=None):
+        """
+        Look up many items by key with BatchGetItem.
+
+        Keys are sent in chunks of 100 and UnprocessedKeys are retried with
+        jittered exponential backoff. fields limits the attributes returned
+        (the key is always included). Missing items are simply absent from
+        the returned dict.
+        """
+        ids = list(dict.fromkeys(ids))  # BatchGetItem rejects duplicate keys
+        request_template = projection([key_name, *fields]) if fields else {}
+
+        items = {}
+        for start in range(0, len(ids), BATCH_GET_SIZE):
+            chunk = ids[start:start + BATCH_GET_SIZE]
+            request = {table.name: dict(request_template, Keys=[{key_name: i} for i in chunk])}
+
+            for attempt in range(BATCH_MAX_RETRIES + 1):
+                response = call('read', get_dynamodb().batch_get_item, RequestItems=request)
+                for item in response.get('Responses', {}).get(table.name, []):
+                    items[item[key_name]] = item
+
+                request = response.get('UnprocessedKeys')
+                if not request:
+                    break
+                if attempt == BATCH_MAX_RETRIES:
+                    raise RuntimeError(f'Unprocessed keys remain for {table.name} after retries')
+                time.sleep(random.uniform(0, BATCH_BASE_DELAY * 2 ** attempt))
+
+        return items
+
+    def _batch_write(self, table, key_name, items, delete=False):
+        """
+        Store many items with BatchWriteItem (or remove them when delete is
+        set, in which case items only need their key).
+
+        Items are grouped into batches of 25 which are written in parallel.
+        UnprocessedItems are retried with jittered exponential backoff.
+
+        Returns:
+            dict: {'succeeded': [ids], 'failed': {id: error message}}
+        """
+        # BatchWriteItem rejects duplicate keys within a batch; last one wins
+        items = list({item[key_name]: item for item in items}.values())
+        batches = [items[i:i + BATCH_WRITE_SIZE] for i in range(0, len(items), BATCH_WRITE_SIZE)]
+
+        report = {'succeeded': [], 'failed': {}}
+        if not batches:
+            return report
+
+        with ThreadPoolExecutor(max_workers=min(BATCH_WRITE_WORKERS, len(batches))) as executor:
+            for succeeded, failed in executor.map(
+                lambda batch: self._write_batch(table, key_name, batch, delete), batches
+            ):
+                report['succeeded'].extend(succeeded)
+                report['failed'].update(failed)
+
+        return report
+
+    def _write_batch(self, table, key_name, batch, delete=False):
+        """Write one batch of up to 25 items, returning (succeeded ids, failed dict)"""
+        request_type, field = ('DeleteRequest', 'Key') if delete else ('PutRequest', 'Item')
+        pending = {item[key_name]: item for item in batch}
+        try:
+            for attempt in range(BATCH_MAX_RETRIES + 1):
+                response = call('write', get_dynamodb().batch_write_item, RequestItems={
+                    table.name: [{request_type: {field: item}} for item in pending.values()]
+                })
+                unprocessed = response.get('UnprocessedItems', {}).get(table.name, [])
+                pending = {r[request_type][field][key_name]: r[request_type][field] for r in unprocessed}
+                if not pending or attempt == BATCH_MAX_RETRIES:
+                    break
+                time.sleep(random.uniform(0, BATCH_BASE_DELAY * 2 ** attempt))
+        except Exception as e:
+            # The whole batch was rejected (validation error, throttling, ...)
+            succeeded = [k for k in (item[key_name] for item in batch) if k not in pending]
+            return succeeded, {key: str(e) for key in pending}
+
+        succeeded = [item[key_name] for item in batch if item[key_name] not in pending]
+        return succeeded, {key: 'Unprocessed after retries' for key in pending}
+
+    def _batch_update(self, table, key_name, updates):
+        """
+        Apply {key: {field: value}} with one UpdateItem per item, in parallel.
+        UpdateItem has no batch form, but a small SET is much cheaper than
+        rewriting the whole item.
+
+        Returns:
+            dict: {'succeeded': [ids], 'failed': {id: error message}}
+        """
+        report = {'succeeded': [], 'failed': {}}
+        if not updates:
+            return report
+
+        def update(key, fields):
+            names = {f'#f{i}': field for i, field in enumerate(fields)}
+            values = {f':v{i}': value for i, value in enumerate(fields.values())}
+            try:
+                call(
+                    'write', table.update_item,
+                    Key={key_name: key},
+                    UpdateExpression='SET ' + ', '.join(f'#f{i} = :v{i}' for i in range(len(fields))),
+                    ExpressionAttributeNames=names,
+                    ExpressionAttributeValues=values
+                )
+                return key, None
+            except Exception as e:
+                return key, str(e)
+
+        with ThreadPoolExecutor(max_workers=min(BATCH_WRITE_WORKERS, len(updates))) as executor:
+            for key, error in executor.map(lambda entry: update(*entry), updates.items()):
+                if error:
+                    report['failed'][key] = error
+                else:
+                    report['succeeded'].append(key)
+        return report
+
+    def get_sync_generations(self, service_names):
+        """Get last_sync_time per service, a cheap marker of when data changed"""
+        items = self._batch_get(self.sync_table, 'service_name', service_names, ['last_sync_time'])
+        return {name: item.get('last_sync_time') for name, item in items.items()}
+
+    def put_snapshot(self, name, data):
+        """
+        Store a binary collection snapshot.
+
+        Small snapshots are stored inline in a single manifest item. Larger
+        ones are written as versioned chunk items first and the manifest is
+        switched over last, so readers never see a half-written snapshot.
+        Chunks of the previous version are deleted afterwards.
+        """
+        key = SNAPSHOT_KEY_PREFIX + name
+        previous = call('read', self.sync_table.get_item, Key={'service_name': key}).get('Item')
+
+        version = str(int(time.time() * 1000))
+        chunks = [data[i:i + SNAPSHOT_CHUNK_SIZE] for i in range(0, len(data), SNAPSHOT_CHUNK_SIZE)] or [b'']
+        manifest = {
+            'service_name': key,
+            'version': version,
+            'chunk_count': len(chunks),
+            'size': len(data),
+            'created_at': int(time.time())
+        }
+
+        if len(chunks) == 1:
+            manifest['data'] = chunks[0]
+        else:
+            report = self._batch_write(self.sync_table, 'service_name', [
+                {'service_name': f'{key}#{version}#{i}', 'data': chunk}
+                for i, chunk in enumerate(chunks)
+            ])
+            if report['failed']:
+                raise RuntimeError(f'Failed to write {len(report["failed"])} chunks of snapshot {name}')
+
+        call('write', self.sync_table.put_item, Item=manifest)
+
+        if previous and previous.get('chunk_count', 1) > 1:
+            for i in range(int(previous['chunk_count'])):
+                call('write', self.sync_table.delete_item,
+                     Key={'service_name': f'{key}#{previous["version"]}#{i}'})
+
+    def delete_snapshot(self, name):
+        """Drop a snapshot's manifest so readers fall back to a live scan"""
+        call('write', self.sync_table.delete_item, Key={'service_name': SNAPSHOT_KEY_PREFIX + name})
+
+    def get_snapshot(self, name):
+        """Return a collection snapshot as bytes, or None if there isn't a complete one"""
+        key = SNAPSHOT_KEY_PREFIX + name
+        manifest = call('read', self.sync_table.get_item, Key={'service_name': key}).get('Item')
+        if not manifest:
+            return None
+        if 'data' in manifest:
+            return binary_value(manifest['data'])
+
+        chunk_keys = [f'{key}#{manifest["version"]}#{i}' for i in range(int(manifest['chunk_count']))]
+        chunks = self._batch_get(self.sync_table, 'service_name', chunk_keys)
+        if len(chunks) != len(chunk_keys):
+            return None
+        return b''.join(binary_value(chunks[k]['data']) for k in chunk_keys)
+
+    def get_checkpoint(self, service_name):
+        """Return the saved progress of an unfinished sync run, or None"""
+        return call(
+            'read', self.sync_table.get_item,
+            Key={'service_name': CHECKPOINT_KEY_PREFIX + service_name}, ConsistentRead=True
+        ).get('Item')
+
+    def put_checkpoint(self, service_name, state):
+        """Save the progress of a sync run so the next invocation can resume it"""
+        call('write', self.sync_table.put_item, Item=dict(
+            state, service_name=CHECKPOINT_KEY_PREFIX + service_name, updated_at=int(time.time())
+        ))
+
+    def delete_checkpoint(self, service_name):
+        """Drop a checkpoint once its run has covered every item"""
+        call('write', self.sync_table.delete_item,
+             Key={'service_name': CHECKPOINT_KEY_PREFIX + service_name})
+
+    def get_sync_items(self, names):
+        """Look up many sync metadata table rows by service_name (see _batch_get)"""
+        return self._batch_get(self.sync_table, 'service_name', names)
+
+    def delete_sync_items(self, names):
+        """Remove many sync metadata table rows (see _batch_write for the report format)"""
+        return self._batch_write(self.sync_table, 'service_name',
+                                 [{'service_name': name} for name in names], delete=True)
 
-    def get_all_videos(self):
-        """Get all YouTube videos"""
-        response = self.youtube_table.scan()
-        return response.get('Items', [])
+    def get_sync_metadata(self, service_name):
+        """Get a service's last sync record (status, counters and extras), or None"""
+        return call('read', self.sync_table.get_item, Key={'service_name': service_name}).get('Item')
 
-    def update_sync_metadata(self, service_name, status, items_synced=0, error_message=None):
-        """Update sync metadata"""
-        import time
+    def update_sync_metadata(self, service_name, status, items_synced=0, error_message=None, extra=None):
+        """Update sync metadata (extra holds additional counters to record)"""
         item = {
             'service_name': service_name,
             'last_sync_time': int(time.time()),
@@ -62,5 +590,7 @@ class DBClient:
         }
         if error_message:
             item['error_message'] = error_message
+        if extra:
+            item.update(extra)
 
-        return self.sync_table.put_item(Item=item)
+        return call('write', self.sync_table.put_item, Item=item)
@@ -0,0 +1,170 @@
+import json
+import os
+import threading
+import time
+import zlib
+
+from db_client import binary_value, call
+
+# Cache entries share the sync metadata table, namespaced by this prefix
+CACHE_KEY_PREFIX = 'http_cache#'
+
+# Compressed payloads above this aren't persisted; DynamoDB items are
+# limited to 400 KB including the key and validators
+CACHE_MAX_PAYLOAD_BYTES = 350 * 1024
+
+# Persisted entries carry an expires_at that the table's TTL removes, so
+# entries nobody asks for again (renamed or deleted repos, old listing
+# pages) don't pile up. A 304 doesn't extend it; an expired entry costs one
+# full 200 response and is stored afresh.
+CACHE_TTL_DAYS = int(os.environ.get('HTTP_CACHE_TTL_DAYS', '30'))
+
+class ConditionalCache:
+    """
+    ETag / Last-Modified cache for conditional HTTP requests.
+
+    Entries are kept in memory for the lifetime of the cache and persisted
+    to the sync metadata table (with a TTL) so they survive cold starts.
+    Callers that know which URLs they are about to request load them in
+    bulk with load(); get() falls back to one GetItem per key. Payloads are stored already decoded (e.g. README text rather than the
+    base64 API response) and zlib-compressed to stay well under the
+    DynamoDB item size limit. Persisting is best-effort: a payload that is
+    too large or a failed write only costs a future 304.
+    """
+
+    def __init__(self, db_client=None):
+        self.db_client = db_client
+        self.table = db_client.sync_table if db_client else None
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.bytes_saved = 0
+        self.write_errors = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached entry for a request key, or None"""
+        if key in self.entries:
+            return self.entries[key]
+        if self.table is None:
+            return None
+
+        response = call('read', self.table.get_item, Key={'service_name': CACHE_KEY_PREFIX + key})
+        entry = self._entry(response.get('Item'))
+        with self._lock:
+            self.entries[key] = entry
+        return entry
+
+    def load(self, keys):
+        """
+        Read the persisted entries for many request keys with BatchGetItem.
+
+        Keys without a stored entry are remembered as misses, so get() won't
+        look them up again one by one.
+        """
+        keys = [key for key in keys if key not in self.entries]
+        if self.table is None or not keys:
+            return
+        try:
+            items = self.db_client.get_sync_items([CACHE_KEY_PREFIX + key for key in keys])
+        except Exception as e:
+            # get() still looks each key up on its own
+            print(f"  Failed to load {len(keys)} cache entries: {e}")
+            return
+        with self._lock:
+            for key in keys:
+                self.entries[key] = self._entry(items.get(CACHE_KEY_PREFIX + key))
+
+    def delete(self, keys):
+        """Remove the entries for request keys that will not be asked for again"""
+        with self._lock:
+            for key in keys:
+                self.entries.pop(key, None)
+        if self.table is None or not keys:
+            return {'succeeded': [], 'failed': {}}
+        return self.db_client.delete_sync_items([CACHE_KEY_PREFIX + key for key in keys])
+
+    @staticmethod
+    def _entry(item):
+        """In-memory entry for a stored item; None if missing or past its expiry"""
+        if not item or int(item.get('expires_at', 0)) < time.time():
+            return None
+        return {
+            'etag': item.get('etag'),
+            'last_modified': item.get('last_modified'),
+            'link': item.get('link'),
+            'size': int(item.get('size', 0)),
+            'payload': json.loads(zlib.decompress(binary_value(item['payload'])))
+        }
+
+    def put(self, key, response, payload):
+        """Store the validators and decoded payload of a 200 response"""
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+
+        entry = {
+            'etag': etag,
+            'last_modified': last_modified,
+            'link': response.headers.get('Link'),
+            'size': len(response.content),
+            'payload': payload
+        }
+        with self._lock:
+            self.entries[key] = entry
+        if self.table is None:
+            return
+
+        compressed = zlib.compress(json.dumps(payload).encode('utf-8'))
+        if len(compressed) > CACHE_MAX_PAYLOAD_BYTES:
+            print(f"  Not persisting {len(compressed)} byte cache entry for {key}")
+            return
+
+        now = int(time.time())
+        item = {
+            'service_name': CACHE_KEY_PREFIX + key,
+            'size': entry['size'],
+            'cached_at': now,
+            'expires_at': now + CACHE_TTL_DAYS * 86400,
+            'payload': compressed
+        }
+        for field in ('etag', 'last_modified', 'link'):
+            if entry[field]:
+                item[field] = entry[field]
+        try:
+            call('write', self.table.put_item, Item=item)
+        except Exception as e:
+            # The fetch already succeeded; don't fail it over the cache
+            print(f"  Failed to persist cache entry for {key}: {e}")
+            with self._lock:
+                self.write_errors += 1
+
+    @staticmethod
+    def conditional_headers(entry):
+        """Build If-None-Match / If-Modified-Since headers for an entry"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def record_hit(self, entry):
+        with self._lock:
+            self.hits += 1
+            self.bytes_saved += entry.get('size', 0)
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def stats(self):
+        """Hit/miss counters for logging and sync metadata"""
+        return {
+            'cache_hits': self.hits,
+            'cache_misses': self.misses,
+            'cache_bytes_saved': self.bytes_saved,
+            'cache_write_errors': self.write_errors
+        }
@@ -0,0 +1,160 @@
+import functools
+import json
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+# Metrics are written as CloudWatch Embedded Metric Format (EMF) log lines:
+# CloudWatch extracts them into metrics asynchronously, so there is no
+# PutMetricData call on the hot path.
+METRICS_NAMESPACE = os.environ.get('METRICS_NAMESPACE', 'PortfolioAggregator')
+
+# Fraction of invocations whose debug output (e.g. the full event) is logged
+DEBUG_SAMPLE_RATE = float(os.environ.get('DEBUG_SAMPLE_RATE', '0.01'))
+
+# Passed as ReturnConsumedCapacity on DynamoDB calls; NONE turns it off
+RETURN_CONSUMED_CAPACITY = os.environ.get('DYNAMODB_RETURN_CAPACITY', 'TOTAL')
+
+class Instrumentation:
+    """
+    Per-invocation stage timings, counters and DynamoDB consumed capacity.
+
+    Wrap a Lambda handler with @metrics.handler('name'). Inside it, time
+    stages with `with metrics.stage('dynamodb_read'):` (or @metrics.timed),
+    count things with metrics.add(), and pass DynamoDB responses to
+    record_capacity(). When the handler returns, one EMF record and one
+    human-readable summary line are printed. Stage times are summed across
+    threads, so a parallel stage can exceed the invocation's wall time.
+    """
+
+    def __init__(self, namespace=METRICS_NAMESPACE, debug_sample_rate=DEBUG_SAMPLE_RATE):
+        self.namespace = namespace
+        self.debug_sample_rate = debug_sample_rate
+        self.service = None
+        self.cold_start = True
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.started = time.perf_counter()
+        self.stages = {}
+        self.counters = {}
+        self.properties = {}
+        self.sampled = random.random() < self.debug_sample_rate
+
+    def start(self, service, event=None, context=None):
+        """Begin an invocation; the event is logged only when sampled"""
+        self.service = service
+        self._reset()
+        if context is not None and hasattr(context, 'aws_request_id'):
+            self.properties['request_id'] = context.aws_request_id
+        self.debug('event', event)
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block and add it to the named stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            with self._lock:
+                total, count = self.stages.get(name, (0.0, 0))
+                self.stages[name] = (total + elapsed, count + 1)
+
+    def timed(self, name):
+        """Decorator form of stage()"""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def add(self, name, value=1):
+        """Increment a counter metric"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def set_property(self, name, value):
+        """Attach a non-metric field (route, status, ...) to the EMF record"""
+        self.properties[name] = value
+
+    def record_capacity(self, response, kind):
+        """Add the ConsumedCapacity of a DynamoDB response to the rcu/wcu counters"""
+        consumed = response.get('ConsumedCapacity') if isinstance(response, dict) else None
+        if not consumed:
+            return
+        if isinstance(consumed, dict):
+            consumed = [consumed]
+        units = sum(float(entry.get('CapacityUnits', 0)) for entry in consumed)
+        self.add('dynamodb_rcu' if kind == 'read' else 'dynamodb_wcu', units)
+
+    def debug(self, message, data=None):
+        """Log only for sampled invocations"""
+        if self.sampled:
+            print(f"DEBUG {message}: {json.dumps(data, default=str)}" if data is not None
+                  else f"DEBUG {message}")
+
+    def flush(self, status=None):
+        """Print the EMF record and the summary line for this invocation"""
+        duration = (time.perf_counter() - self.started) * 1000
+        with self._lock:
+            stages = dict(self.stages)
+            counters = dict(self.counters)
+
+        values = {'duration_ms': round(duration, 2), 'cold_start': int(self.cold_start)}
+        units = {'duration_ms': 'Milliseconds', 'cold_start': 'Count'}
+        for name, (total, count) in stages.items():
+            values[f'{name}_ms'] = round(total, 2)
+            units[f'{name}_ms'] = 'Milliseconds'
+            values[f'{name}_calls'] = count
+            units[f'{name}_calls'] = 'Count'
+        for name, value in counters.items():
+            values[name] = round(value, 2)
+            units[name] = 'Count'
+
+        record = {
+            '_aws': {
+                'Timestamp': int(time.time() * 1000),
+                'CloudWatchMetrics': [{
+                    'Namespace': self.namespace,
+                    'Dimensions': [['Service']],
+                    'Metrics': [{'Name': name, 'Unit': unit} for name, unit in units.items()]
+                }]
+            },
+            'Service': self.service,
+            'status': status,
+            **self.properties,
+            **values
+        }
+        print(json.dumps(record, default=str))
+
+        parts = [f"SUMMARY {self.service} status={status} duration={duration:.1f}ms",
+                 f"cold_start={self.cold_start}"]
+        parts += [f"{name}={total:.1f}ms/{count}" for name, (total, count) in sorted(stages.items())]
+        parts += [f"{name}={value:g}" for name, value in sorted(counters.items())]
+        print(' '.join(parts))
+        self.cold_start = False
+
+    def handler(self, service):
+        """Decorator for a Lambda handler: start, then flush with the status code"""
+        def decorate(fn):
+            @functools.wraps(fn)
+            def wrapper(event, context):
+                self.start(service, event, context)
+                status = 'exception'
+                try:
+                    result = fn(event, context)
+                    status = result.get('statusCode') if isinstance(result, dict) else None
+                    return result
+                finally:
+                    self.flush(status)
+            return wrapper
+        return decorate
+
+# One instance per container, shared by the handler and the shared modules
+metrics = Instrumentation()
@@ -0,0 +1,142 @@
+import os
+import threading
+import time
+
+class RateLimitExceeded(Exception):
+    """The quota is exhausted and resets later than the caller is willing to wait"""
+
+    def __init__(self, reset_at):
+        self.reset_at = reset_at
+        super().__init__(f'Rate limit exhausted until {int(reset_at)}')
+
+class RateLimitGovernor:
+    """
+    Adaptive client-side throttle driven by X-RateLimit-* response headers.
+
+    Every request takes a slot with acquire() and hands its response to
+    release(). The number of concurrent slots starts at max_concurrency and
+    is halved whenever the remaining quota drops below low_water of the
+    limit (or a secondary rate limit is hit), then grows back one at a time
+    while the quota is healthy. Once remaining falls to the floor, acquire()
+    waits for the reset - or raises RateLimitExceeded if the reset is more
+    than max_wait seconds away, so a Lambda can stop cleanly instead of
+    sleeping through its timeout.
+    """
+
+    def __init__(self, max_concurrency=None, floor=None, max_wait=None, low_water=0.2):
+        self.max_concurrency = max_concurrency or int(os.environ.get('GITHUB_MAX_CONCURRENCY', '8'))
+        self.floor = floor if floor is not None else int(os.environ.get('GITHUB_RATE_LIMIT_FLOOR', '50'))
+        self.max_wait = max_wait if max_wait is not None else float(os.environ.get('GITHUB_MAX_RATE_LIMIT_WAIT', '60'))
+        self.low_water = low_water
+
+        self.concurrency = self.max_concurrency
+        self.in_flight = 0
+        self.limit = None
+        self.remaining = None
+        self.reset_at = None
+        self.paused_until = 0.0
+        self.waited = 0.0
+        self.secondary_limits = 0
+        self._cond = threading.Condition()
+
+    def acquire(self):
+        """Block until a request may be sent"""
+        with self._cond:
+            while True:
+                now = time.time()
+                resume_at = self._resume_at(now)
+                if resume_at > now:
+                    if resume_at - now > self.max_wait:
+                        raise RateLimitExceeded(resume_at)
+                    self._cond.wait(resume_at - now)
+                    self.waited += time.time() - now
+                    continue
+                if self.in_flight < self.concurrency:
+                    self.in_flight += 1
+                    return
+                self._cond.wait()
+
+    def release(self, response=None):
+        """Give the slot back and learn from the response headers"""
+        with self._cond:
+            self.in_flight -= 1
+            if response is not None:
+                self._observe(response)
+            self._cond.notify_all()
+
+    def resume_at(self):
+        """When the next request may go out, after a rate-limit rejection"""
+        with self._cond:
+            now = time.time()
+            return max(now, self._resume_at(now))
+
+    def _resume_at(self, now):
+        """When the next request may go out (<= now means immediately)"""
+        resume_at = self.paused_until
+        if self.remaining is not None and self.remaining <= self.floor and self.reset_at:
+            if self.reset_at > now:
+                resume_at = max(resume_at, self.reset_at)
+            else:
+                # The window has rolled over; trust the next response
+                self.remaining = None
+        return resume_at
+
+    def _observe(self, response):
+        headers = response.headers
+        if 'X-RateLimit-Remaining' in headers:
+            self.remaining = int(headers['X-RateLimit-Remaining'])
+        if 'X-RateLimit-Limit' in headers:
+            self.limit = int(headers['X-RateLimit-Limit'])
+        if 'X-RateLimit-Reset' in headers:
+            self.reset_at = float(headers['X-RateLimit-Reset'])
+
+        if self.is_rate_limited(response):
+            if self.remaining != 0:
+                # Secondary (abuse) limit: back off hard and go single file
+                self.secondary_limits += 1
+                self.paused_until = time.time() + float(headers.get('Retry-After', 60))
+                self.concurrency = 1
+            return
+
+        if self.limit and self.remaining is not None:
+            if self.remaining < self.limit * self.low_water:
+                self.concurrency = max(1, self.concurrency // 2)
+            elif self.concurrency < self.max_concurrency:
+                self.concurrency += 1
+
+    @staticmethod
+    def is_rate_limited(response):
+        """True for primary or secondary rate-limit rejections"""
+        if response.status_code == 429:
+            return True
+        if response.status_code != 403:
+            return False
+        return (response.headers.get('X-RateLimit-Remaining') == '0'
+                or 'Retry-After' in response.headers
+                or 'rate limit' in response.text.lower())
+
+    def budget(self):
+        """Snapshot of the current quota and throttle state"""
+        with self._cond:
+            return {
+                'limit': self.limit,
+                'remaining': self.remaining,
+                'reset_at': int(self.reset_at) if self.reset_at else None,
+                'concurrency': self.concurrency,
+                'paused_until': int(self.paused_until) if self.paused_until > time.time() else None
+            }
+
+    def available(self):
+        """Requests that can still be made before hitting the floor (None if unknown yet)"""
+        with self._cond:
+            if self.remaining is None:
+                return None
+            return max(0, self.remaining - self.floor - self.in_flight)
+
+    def stats(self):
+        """Counters for logging and sync metadata"""
+        return {
+            'rate_limit_remaining': self.remaining,
+            'rate_limit_wait_ms': int(self.waited * 1000),
+            'secondary_rate_limits': self.secondary_limits
+        }
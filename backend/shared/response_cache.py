@@ -0,0 +1,64 @@
+import threading
+import time
+from collections import OrderedDict
+
+class ResponseCache:
+    """
+    In-process cache of finished API responses for warm Lambda containers.
+
+    Each entry is tagged with the sync generation (last_sync_time) of the
+    service it was built from. Generations are re-read with load_generations
+    at most once per check_interval seconds; an entry is served only while
+    its generation is current and it is younger than ttl. The cache holds at
+    most max_entries responses, evicting the least recently used.
+    """
+
+    def __init__(self, load_generations, ttl=300, max_entries=64, check_interval=30):
+        self.load_generations = load_generations
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.check_interval = check_interval
+        self.entries = OrderedDict()
+        self.generations = {}
+        self.checked_at = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def generation(self, service):
+        """Current sync generation for a service (throttled lookup)"""
+        now = time.time()
+        if now - self.checked_at >= self.check_interval:
+            try:
+                self.generations = self.load_generations()
+            except Exception as e:
+                # Keep serving the last known generations; TTL still applies
+                print(f"Failed to load sync generations: {e}")
+            self.checked_at = now
+        return self.generations.get(service)
+
+    def get(self, key, service):
+        """Return the cached response for key, or None if missing or stale"""
+        generation = self.generation(service)
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry and entry['generation'] == generation and time.time() < entry['expires_at']:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry['value']
+
+            self.entries.pop(key, None)
+            self.misses += 1
+            return None
+
+    def put(self, key, service, value):
+        """Cache a response under the service's current generation"""
+        with self._lock:
+            self.entries[key] = {
+                'generation': self.generations.get(service),
+                'expires_at': time.time() + self.ttl,
+                'value': value
+            }
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
@@ -0,0 +1,112 @@
+import json
+import os
+import threading
+import time
+
+from instrumentation import metrics
+
+class SecretsProvider:
+    """
+    Cached access to JSON secrets in AWS Secrets Manager.
+
+    One Secrets Manager client is reused for the life of the container and
+    parsed secrets are cached in memory for ttl seconds, so warm invocations
+    skip the round trip entirely. Several secrets are fetched with a single
+    BatchGetSecretValue call. Call invalidate() after an authentication
+    failure so the next lookup fetches fresh values.
+    """
+
+    def __init__(self, ttl=None):
+        self.ttl = ttl if ttl is not None else int(os.environ.get('SECRETS_TTL_SECONDS', '900'))
+        self.cache = {}
+        self.client = None
+        self.fetch_ms = 0.0
+        self.fetches = 0
+        self.hits = 0
+        self._lock = threading.Lock()
+
+    def _get_client(self):
+        if self.client is None:
+            import boto3
+            self.client = boto3.client('secretsmanager')
+        return self.client
+
+    def get(self, secret_id, force_refresh=False):
+        """Return one parsed secret"""
+        return self.get_many([secret_id], force_refresh)[secret_id]
+
+    def get_many(self, secret_ids, force_refresh=False):
+        """Return {secret_id: parsed secret}, fetching expired ones in one call"""
+        now = time.time()
+        with self._lock:
+            result = {}
+            missing = []
+            for secret_id in secret_ids:
+                entry = self.cache.get(secret_id)
+                if entry and not force_refresh and now < entry['expires_at']:
+                    result[secret_id] = entry['value']
+                    self.hits += 1
+                else:
+                    missing.append(secret_id)
+
+            if missing:
+                start = time.perf_counter()
+                fetched = self._fetch(missing)
+                self.fetch_ms += (time.perf_counter() - start) * 1000
+                self.fetches += 1
+
+                for secret_id, value in fetched.items():
+                    self.cache[secret_id] = {'value': value, 'expires_at': now + self.ttl}
+                result.update(fetched)
+
+        return result
+
+    @metrics.timed('secrets')
+    def _fetch(self, secret_ids):
+        """Fetch and parse secrets, batched when there is more than one"""
+        client = self._get_client()
+        if len(secret_ids) == 1:
+            response = client.get_secret_value(SecretId=secret_ids[0])
+            return {secret_ids[0]: json.loads(response['SecretString'])}
+
+        response = client.batch_get_secret_value(SecretIdList=secret_ids)
+        if response.get('Errors'):
+            error = response['Errors'][0]
+            raise RuntimeError(f"Failed to fetch secret {error.get('SecretId')}: {error.get('Message')}")
+
+        # Results come back keyed by ARN and name; map them to what was asked for
+        values = {}
+        for secret in response['SecretValues']:
+            for secret_id in secret_ids:
+                if secret_id in (secret['ARN'], secret['Name']):
+                    values[secret_id] = json.loads(secret['SecretString'])
+        return values
+
+    def invalidate(self, secret_id=None):
+        """Drop one cached secret (or all), e.g. after an auth failure"""
+        with self._lock:
+            if secret_id is None:
+                self.cache.clear()
+            else:
+                self.cache.pop(secret_id, None)
+
+    def stats(self):
+        """
+        Fetch timing and cache counters for logging and sync metadata. They
+        cover the life of the container: a warm invocation that was served
+        from the cache adds hits, not fetches or time. Whole milliseconds,
+        so the values can be stored in DynamoDB as they are.
+        """
+        return {
+            'secret_fetch_ms': round(self.fetch_ms),
+            'secret_fetches': self.fetches,
+            'secret_cache_hits': self.hits
+        }
+
+def is_auth_error(error):
+    """True for HTTP 401/403 errors from requests or googleapiclient"""
+    response = getattr(error, 'response', None)
+    status = getattr(response, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'resp', None), 'status', None)
+    return status in (401, 403)
@@ -0,0 +1,85 @@
+import gzip
+
+from db_client import items_to_json, raw_sort_value
+from instrumentation import metrics
+
+# List collections served by the API. Each one is written as a pre-sorted,
+# pre-serialized, gzip-compressed snapshot at the end of its sync, so the API
+# answers list requests with a GetItem instead of a scan + sort + dumps.
+COLLECTIONS = {
+    'repos': {
+        'key': 'repo_id',
+        'service': 'github',
+        'loader': 'get_all_repos',
+        'page_loader': 'get_repos_page',
+        # detailed_summary is only needed by GET /api/repos/{id}
+        'fields': ['repo_id', 'name', 'description', 'language', 'stars', 'forks',
+                   'updated_at', 'url', 'high_level_summary'],
+        'sort_key': 'stars',
+        'sort_default': 0
+    },
+    'posts': {
+        'key': 'post_id',
+        'service': 'medium',
+        'loader': 'get_all_posts',
+        'page_loader': 'get_posts_page',
+        'fields': ['post_id', 'title', 'excerpt', 'published_date', 'read_time', 'url', 'claps'],
+        'sort_key': 'published_date',
+        'sort_default': ''
+    },
+    'videos': {
+        'key': 'video_id',
+        'service': 'youtube',
+        'loader': 'get_all_videos',
+        'page_loader': 'get_videos_page',
+        'fields': ['video_id', 'title', 'description', 'published_date', 'views',
+                   'duration', 'thumbnail_url', 'url'],
+        'sort_key': 'published_date',
+        'sort_default': ''
+    }
+}
+
+def serialize_collection(db_client, name, segments=1):
+    """
+    Scan, sort (newest / most starred first) and serialize a collection.
+
+    Uses the raw read path: items stay as AttributeValue maps and are
+    transcoded straight to JSON text, with no Decimal conversion.
+    """
+    collection = COLLECTIONS[name]
+    items = getattr(db_client, collection['loader'])(
+        fields=collection['fields'], segments=segments, raw=True
+    )
+    sort_key, default = collection['sort_key'], collection['sort_default']
+    items = sorted(items, key=lambda x: raw_sort_value(x.get(sort_key), default), reverse=True)
+    with metrics.stage('serialize'):
+        return items_to_json(items)
+
+def write_snapshot(db_client, name):
+    """
+    Materialize a collection snapshot at the end of a sync.
+
+    Errors are logged rather than raised: the sync itself succeeded. In that
+    case the old snapshot is dropped so the API falls back to a live scan
+    instead of serving stale data.
+    """
+    try:
+        body = serialize_collection(db_client, name)
+        with metrics.stage('compress'):
+            data = gzip.compress(body.encode('utf-8'))
+        db_client.put_snapshot(name, data)
+        print(f"Wrote {name} snapshot ({len(data)} bytes compressed)")
+    except Exception as e:
+        print(f"Failed to write {name} snapshot: {e}")
+        try:
+            db_client.delete_snapshot(name)
+        except Exception as delete_error:
+            print(f"Failed to drop stale {name} snapshot: {delete_error}")
+
+def read_snapshot(db_client, name):
+    """Return a collection's serialized JSON body, or None if no snapshot exists"""
+    data = db_client.get_snapshot(name)
+    if data is None:
+        return None
+    with metrics.stage('decompress'):
+        return gzip.decompress(data).decode('utf-8')
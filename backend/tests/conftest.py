@@ -0,0 +1,159 @@
+"""
+================================================================================
+Shared Test Fixtures
+================================================================================
+The tests run the shared layer and the sync handlers against the local
+stand-ins in backend/benchmarks (fake GitHub, Anthropic stub, Medium feed,
+in-memory DynamoDB / Secrets Manager), so no AWS account or network access is needed.
+
+Usage:
+    python -m pytest backend/tests
+================================================================================
+"""
+
+import importlib.util
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# The handlers import the shared layer as top-level modules, as on Lambda
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'shared'))
+sys.path.insert(0, os.path.join(BACKEND_DIR, 'benchmarks'))
+
+import anthropic_stub
+import aws_stub
+import github_stub
+import medium_stub
+
+SECRETS = {
+    'test/github-token': {'token': 'ghp_test'},
+    'test/anthropic-key': {'api_key': 'sk-test'}
+}
+
+
+def url(server):
+    return f'http://127.0.0.1:{server.server_port}'
+
+
+@pytest.fixture
+def github_server():
+    """Starts a fake GitHub API: call with github_stub.FakeGitHub options"""
+    servers = []
+
+    def start(**options):
+        server, github = github_stub.serve(**options)
+        servers.append(server)
+        return url(server), github
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+@pytest.fixture
+def anthropic_server():
+    """Starts an Anthropic stub: call with anthropic_stub.StubState options"""
+    servers = []
+
+    def start(**options):
+        server, state = anthropic_stub.serve(**options)
+        servers.append(server)
+        return url(server) + '/v1/messages', state
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+@pytest.fixture
+def medium_server():
+    """Starts a Medium feed: call with medium_stub.FakeMedium options"""
+    servers = []
+
+    def start(**options):
+        server, medium = medium_stub.serve(**options)
+        servers.append(server)
+        return url(server), medium
+
+    yield start
+    for server in servers:
+        server.shutdown()
+
+
+@pytest.fixture(scope='session')
+def aws():
+    """
+    One DynamoDB / Secrets Manager stand-in for the session. boto3 clients
+    are created once per process, so the endpoint environment has to be in
+    place before the first DynamoDB call and stay for the whole session.
+    """
+    server, state = aws_stub.serve(prefix='test', secrets=SECRETS)
+    with pytest.MonkeyPatch.context() as env:
+        for name, value in dict(
+            aws_stub.table_env('test'),
+            AWS_DEFAULT_REGION='us-east-1',
+            AWS_ACCESS_KEY_ID='test',
+            AWS_SECRET_ACCESS_KEY='test',
+            AWS_ENDPOINT_URL_DYNAMODB=url(server),
+            AWS_ENDPOINT_URL_SECRETS_MANAGER=url(server),
+            DEBUG_SAMPLE_RATE='0'
+        ).items():
+            env.setenv(name, value)
+        yield state
+    server.shutdown()
+
+
+@pytest.fixture
+def tables(aws):
+    """Empty tables for each test"""
+    for table in aws.tables.values():
+        table.items.clear()
+    return aws
+
+
+def load_handler(name):
+    """Import a Lambda handler module by function name"""
+    path = os.path.join(BACKEND_DIR, 'lambda_functions', name, 'handler.py')
+    spec = importlib.util.spec_from_file_location(f'{name}_handler', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture(scope='session')
+def github_sync():
+    return load_handler('github_sync')
+
+
+@pytest.fixture(scope='session')
+def api_handler(aws):
+    # Creates its DBClient at import, so the AWS environment must be set
+    return load_handler('api_handler')
+
+
+@pytest.fixture(scope='session')
+def medium_sync():
+    return load_handler('medium_sync')
+
+
+@pytest.fixture
+def sync_env(tables, github_sync, github_server, anthropic_server, monkeypatch):
+    """
+    github_sync wired to a fake GitHub and the Anthropic stub. Call with the
+    fetch backend and FakeGitHub options; returns (fake GitHub, stub state).
+    """
+    def start(backend='rest', **options):
+        github_url, github = github_server(**options)
+        anthropic_url, anthropic = anthropic_server()
+        monkeypatch.setenv('GITHUB_USERNAME', 'octocat')
+        monkeypatch.setenv('GITHUB_TOKEN_SECRET', 'test/github-token')
+        monkeypatch.setenv('AI_API_KEY_SECRET', 'test/anthropic-key')
+        monkeypatch.setenv('GITHUB_API_URL', github_url)
+        monkeypatch.setattr(github_sync, 'FETCH_BACKEND', backend)
+        monkeypatch.setattr(github_sync, 'ANTHROPIC_API_URL', anthropic_url)
+        return github, anthropic
+
+    return start
@@ -0,0 +1,54 @@
+"""api_handler cursor pagination: following cursors and rejecting bad ones"""
+
+import base64
+import json
+
+import pytest
+
+from db_client import DBClient
+
+
+@pytest.fixture
+def api(tables, api_handler):
+    """GET /api/repos?... against 25 stored repos, returning (status, body)"""
+    DBClient().put_repos([{'repo_id': str(i), 'name': f'project-{i}', 'stars': i} for i in range(25)])
+    api_handler.response_cache.entries.clear()
+
+    def get(**params):
+        response = api_handler.lambda_handler(
+            {'routeKey': 'GET /api/repos', 'queryStringParameters': params, 'headers': {}}, None)
+        return response['statusCode'], json.loads(response['body'])
+
+    return get
+
+
+def cursor(start_key):
+    return base64.urlsafe_b64encode(json.dumps(start_key).encode()).decode().rstrip('=')
+
+
+def test_cursors_walk_the_collection(api):
+    status, page = api(limit='10')
+    stars = [item['stars'] for item in page['items']]
+    while page['next_cursor']:
+        status, page = api(limit='10', cursor=page['next_cursor'])
+        assert status == 200
+        stars += [item['stars'] for item in page['items']]
+
+    assert stars == list(reversed(range(25)))
+
+
+@pytest.mark.parametrize('start_key', [
+    'not base64 json',
+    ['repo_id', '3'],
+    # Not the stars-index key schema
+    {'repo_id': '3'},
+    {'repo_id': '3', 'list_pk': 'repo', 'stars': 3, 'name': 'project-3'},
+    {'repo_id': {'S': '3'}, 'list_pk': 'repo', 'stars': 3},
+    # The right keys, refused by DynamoDB
+    {'repo_id': '3', 'list_pk': 'post', 'stars': 3},
+    {'repo_id': '3', 'list_pk': 'repo', 'stars': 'three'}
+])
+def test_bad_cursors_are_a_400(api, start_key):
+    token = start_key if isinstance(start_key, str) else cursor(start_key)
+
+    assert api(limit='10', cursor=token) == (400, {'error': 'Invalid cursor'})
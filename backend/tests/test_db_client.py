@@ -0,0 +1,63 @@
+"""Raw DynamoDB-to-JSON read path through the real boto3 clients, change detection"""
+
+import json
+from decimal import Decimal
+
+from db_client import DBClient, DecimalEncoder, get_dynamodb, get_raw_client, is_unchanged, items_to_json
+
+REPO = {
+    'repo_id': '1001',
+    'name': 'project-1',
+    'description': 'A "quoted" description',
+    'stars': 42,
+    'forks': Decimal('3'),
+    'topics': ['python', 'aws'],
+    'summary': {'score': Decimal('0.5'), 'fresh': True},
+    'pushed_at': None
+}
+
+
+def test_raw_client_is_not_the_resource_client(tables):
+    # The resource registers its (de)serializers on its own client once a
+    # Table exists; the raw path must not share it
+    DBClient().github_table
+    assert get_raw_client() is not get_dynamodb().meta.client
+
+
+def test_get_repo_json_returns_the_stored_item(tables):
+    db_client = DBClient()
+    db_client.put_repo(REPO)
+
+    item = json.loads(db_client.get_repo_json('1001'))
+
+    assert item == json.loads(json.dumps(dict(REPO, list_pk='repo'), cls=DecimalEncoder))
+    assert db_client.get_repo_json('missing') is None
+
+
+def test_raw_scan_yields_attribute_value_maps(tables):
+    db_client = DBClient()
+    db_client.put_repos([dict(REPO, repo_id=str(i), stars=i) for i in range(30)])
+    fields = ['repo_id', 'stars', 'topics', 'summary']
+
+    raw = list(db_client.get_all_repos(fields=fields, segments=2, raw=True))
+    decoded = list(db_client.get_all_repos(fields=fields))
+
+    assert len(raw) == 30
+    assert all(item['stars'].keys() == {'N'} for item in raw)
+    assert raw[0]['topics'] == {'L': [{'S': 'python'}, {'S': 'aws'}]}
+
+    # Transcoded raw items match the resource path's Decimal round trip
+    by_id = lambda item: item['repo_id']
+    assert sorted(json.loads(items_to_json(raw)), key=by_id) == \
+           sorted(json.loads(json.dumps(decoded, cls=DecimalEncoder)), key=by_id)
+
+
+def test_is_unchanged_compares_fields_and_needs_the_list_key():
+    item = {'title': 'A', 'views': '10', 'last_synced': 2}
+    stored = {'title': 'A', 'views': '10', 'last_synced': 1, 'list_pk': 'video'}
+
+    assert is_unchanged(stored, item, ['title', 'views'])
+    assert not is_unchanged(dict(stored, views='11'), item, ['title', 'views'])
+    # Rows from before the list index are rewritten to get list_pk
+    assert not is_unchanged({'title': 'A', 'views': '10'}, item, ['title', 'views'])
+    assert not is_unchanged(None, item, ['title', 'views'])
@@ -0,0 +1,99 @@
+"""github_sync planning: README errors, missing READMEs, pruning and the HTTP cache"""
+
+import time
+
+import pytest
+
+from db_client import DBClient
+
+
+@pytest.mark.parametrize('backend', ['rest', 'graphql'])
+def test_readme_errors_are_retried_not_stored(github_sync, sync_env, backend):
+    github, anthropic = sync_env(backend, repos=5)
+    github.missing_readmes.add('project-1')
+    db_client = DBClient()
+
+    github_sync.lambda_handler({}, None)
+    assert db_client.get_repo('1001')['high_level_summary'] == 'No README available'
+    stored = db_client.get_repo('1002')
+
+    # A failed fetch leaves the row (and its push time / oid) as it was
+    github.edit_readme('project-2')
+    github.broken_readmes.add('project-2')
+    github_sync.lambda_handler({}, None)
+    assert db_client.get_repo('1002') == stored
+    assert db_client.get_sync_metadata('github')['last_sync_status'] == 'partial'
+
+    # so the next run picks the README up again
+    github.broken_readmes.clear()
+    github_sync.lambda_handler({}, None)
+    repo = db_client.get_repo('1002')
+    assert repo['readme_hash'] != stored['readme_hash']
+    assert repo['high_level_summary'] != 'No README available'
+    assert db_client.get_sync_metadata('github')['last_sync_status'] == 'success'
+
+
+def test_repos_gone_upstream_are_pruned(github_sync, sync_env, tables):
+    github, anthropic = sync_env(repos=10)
+    github_sync.lambda_handler({}, None)
+
+    del github.repos[3]
+    github_sync.lambda_handler({}, None)
+
+    assert tables.item_count('test-github-repos') == 9
+    assert DBClient().get_repo('1003') is None
+    assert DBClient().get_sync_metadata('github')['repos_deleted'] == 1
+
+
+def test_secret_stats_are_recorded(github_sync, sync_env, monkeypatch):
+    sync_env(repos=3)
+    monkeypatch.setattr(github_sync, 'secrets_provider', github_sync.SecretsProvider())
+
+    github_sync.lambda_handler({}, None)
+    github_sync.lambda_handler({}, None)
+
+    # Both secrets in one fetch; the warm run is served from the container cache
+    metadata = DBClient().get_sync_metadata('github')
+    assert metadata['secret_fetches'] == 1
+    assert metadata['secret_cache_hits'] == 2
+    assert metadata['secret_fetch_ms'] >= 0
+
+
+def http_cache_items(tables):
+    items = tables.tables['test-sync-metadata'].items.values()
+    return {item['service_name']['S']: item for item in items
+            if item['service_name']['S'].startswith('http_cache#')}
+
+
+def dynamodb_operations(tables, run):
+    before = tables.stats()['dynamodb']['operations']
+    run()
+    after = tables.stats()['dynamodb']['operations']
+    return {name: count - before.get(name, 0) for name, count in after.items()}
+
+
+def test_http_cache_is_loaded_in_bulk_expires_and_is_pruned(github_sync, sync_env, tables):
+    github, anthropic = sync_env(repos=10)
+    github_sync.lambda_handler({}, None)
+
+    # The listing page and every README, each with an expiry for the table TTL
+    items = http_cache_items(tables)
+    assert len(items) == 11
+    assert all(int(item['expires_at']['N']) > time.time() for item in items.values())
+
+    # Cached READMEs of replanned repos are read in one BatchGetItem, so the
+    # GetItem count doesn't grow with the number of READMEs requested
+    def edit_and_sync(names):
+        for name in names:
+            github.edit_readme(name)
+        return dynamodb_operations(tables, lambda: github_sync.lambda_handler({}, None))
+
+    few = edit_and_sync(['project-1'])
+    many = edit_and_sync(['project-2', 'project-4', 'project-5', 'project-6', 'project-7'])
+    assert few['GetItem'] == many['GetItem']
+
+    # A pruned repo's cached README goes with it
+    del github.repos[3]
+    github_sync.lambda_handler({}, None)
+    assert not any(key.endswith('/project-3/readme') for key in http_cache_items(tables))
+    assert len(http_cache_items(tables)) == 10
@@ -0,0 +1,79 @@
+"""GraphQL fetch backend: listing, README texts and oid-based skipping"""
+
+from api_clients import GitHubClient
+from db_client import DBClient
+
+LISTING_FIELDS = ['id', 'name', 'owner', 'description', 'language', 'stargazers_count',
+                  'forks_count', 'updated_at', 'pushed_at', 'html_url']
+
+
+def test_nodes_map_onto_the_rest_listing(github_server):
+    base_url, github = github_server(repos=150)
+    github.missing_readmes.add('project-7')
+    github_client = GitHubClient('ghp_test', base_url=base_url)
+
+    rest = {repo['id']: repo for repo in github_client.iter_repos('octocat')}
+    graphql = {repo['id']: repo for repo in github_client.iter_repos_graphql('octocat')}
+
+    assert set(graphql) == set(rest)
+    for repo_id, repo in graphql.items():
+        assert {field: repo[field] for field in LISTING_FIELDS} == \
+               {field: rest[repo_id][field] for field in LISTING_FIELDS}
+    assert graphql[1001]['readme_path'] == 'README.md'
+    assert graphql[1001]['readme_oid'] == github.readme_oid('project-1')
+    assert graphql[1007]['readme_oid'] is None and graphql[1007]['readme_path'] is None
+
+
+def test_private_repos_are_not_listed(github_server):
+    base_url, github = github_server(repos=20, private=5)
+    github_client = GitHubClient('ghp_test', base_url=base_url)
+
+    listed = {repo['id'] for repo in github_client.iter_repos_graphql('octocat')}
+
+    assert listed == {repo['id'] for repo in github.repos if not repo['private']}
+    assert listed == {repo['id'] for repo in github_client.iter_repos('octocat')}
+
+
+def test_readme_texts_match_rest(github_server):
+    base_url, github = github_server(repos=30)
+    github.missing_readmes.add('project-2')
+    github.broken_readmes.add('project-3')
+    github_client = GitHubClient('ghp_test', base_url=base_url)
+    repos = list(github_client.iter_repos_graphql('octocat'))
+
+    texts = github_client.get_readme_texts(repos)
+
+    # 28 READMEs in two queries of up to GRAPHQL_README_BATCH
+    assert github.graphql_requests == 1 + 2
+    assert 1002 not in texts and 1003 not in texts
+    assert texts[1010] == github_client.get_readme('octocat', 'project-10')
+    assert len(texts) == 28
+
+
+def test_only_moved_readmes_are_fetched(github_sync, sync_env):
+    github, anthropic = sync_env('graphql', repos=20)
+    db_client = DBClient()
+
+    github_sync.lambda_handler({}, None)
+    assert anthropic.stats()['entries'] == 20
+    first = db_client.get_repo('1004')
+
+    # One README edited, one repo pushed without touching its README
+    github.edit_readme('project-4')
+    github.repos[5]['pushed_at'] = '2024-06-01T00:00:00Z'
+    graphql_before, anthropic_before = github.graphql_requests, anthropic.stats()['entries']
+    github_sync.lambda_handler({}, None)
+
+    metadata = db_client.get_sync_metadata('github')
+    assert metadata['repos_readme'] == 1
+    assert metadata['repos_metadata'] == 1
+    assert metadata['repos_unchanged'] == 18
+    # The listing plus one README text query; no REST requests
+    assert github.graphql_requests - graphql_before == 2
+    assert github.requests == github.graphql_requests
+    assert anthropic.stats()['entries'] - anthropic_before == 1
+
+    second = db_client.get_repo('1004')
+    assert second['readme_oid'] == github.readme_oid('project-4') != first['readme_oid']
+    assert second['readme_hash'] != first['readme_hash']
+    assert db_client.get_repo('1005')['pushed_at'] == '2024-06-01T00:00:00Z'
@@ -0,0 +1,46 @@
+"""medium_sync: ISO 8601 published dates and the conversion of older rows"""
+
+import re
+
+import pytest
+
+from db_client import DBClient
+
+
+@pytest.fixture
+def medium(tables, medium_server, monkeypatch):
+    """medium_sync pointed at a five-post feed"""
+    base_url, medium = medium_server(posts=5, words=50)
+    monkeypatch.setenv('MEDIUM_USERNAME', medium.user)
+    monkeypatch.setenv('MEDIUM_URL', base_url)
+    return medium
+
+
+def test_unparseable_pub_date_is_left_out(medium_sync, medium):
+    medium.feed = re.sub(rb'<pubDate>[^<]*', b'<pubDate>sometime last week', medium.feed, count=1)
+
+    assert medium_sync.lambda_handler({}, None)['statusCode'] == 200
+
+    # Stored without the published-index sort key rather than with ''
+    posts = list(DBClient().get_all_posts())
+    assert len(posts) == 5
+    assert sum('published_date' not in post for post in posts) == 1
+    assert DBClient().get_sync_metadata('medium')['last_sync_status'] == 'success'
+
+
+def test_unparseable_stored_dates_do_not_block_conversion(medium_sync, medium):
+    db_client = DBClient()
+    db_client.put_posts([
+        {'post_id': 'old', 'published_date': 'Tue, 05 Mar 2024 10:00:00 GMT'},
+        {'post_id': 'garbled', 'published_date': 'sometime last week'}
+    ])
+
+    assert medium_sync.lambda_handler({}, None)['statusCode'] == 200
+
+    # An unparseable date is kept as it was and doesn't hold the upgrade back
+    stored = db_client.get_posts_by_id(['old', 'garbled'])
+    assert stored['old']['published_date'] == '2024-03-05T10:00:00Z'
+    assert stored['garbled']['published_date'] == 'sometime last week'
+    metadata = db_client.get_sync_metadata('medium')
+    assert metadata['last_sync_status'] == 'success'
+    assert metadata['post_format'] == medium_sync.POST_FORMAT_VERSION
@@ -0,0 +1,100 @@
+"""RateLimitGovernor and GitHubClient pacing against the fake GitHub API"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from api_clients import GitHubClient
+from rate_limiter import RateLimitExceeded, RateLimitGovernor
+
+
+def client(base_url, **governor_options):
+    return GitHubClient('ghp_test', base_url=base_url, governor=RateLimitGovernor(**governor_options))
+
+
+def test_concurrency_is_capped(github_server):
+    base_url, github = github_server(repos=40, latency=0.02)
+    github_client = client(base_url, max_concurrency=3, floor=0)
+
+    with ThreadPoolExecutor(max_workers=12) as executor:
+        readmes = list(executor.map(
+            lambda repo: github_client.get_readme('octocat', repo['name']), github.repos
+        ))
+
+    assert all(readmes)
+    assert github.max_in_flight <= 3
+
+
+def test_pauses_at_the_floor_until_reset(github_server):
+    base_url, github = github_server(repos=5, limit=10, window=2)
+    github_client = client(base_url, max_concurrency=1, floor=3, max_wait=5)
+
+    for i in range(12):
+        assert github_client.get_readme('octocat', f'project-{i % 5}')
+
+    # Waited for the window to roll over instead of spending the reserve
+    assert github.rejected == 0
+    assert github_client.governor.waited > 0
+
+
+def test_raises_when_reset_is_too_far(github_server):
+    base_url, github = github_server(repos=5, limit=3, window=3600)
+    github_client = client(base_url, max_concurrency=1, floor=0, max_wait=1)
+
+    for i in range(3):
+        github_client.get_readme('octocat', f'project-{i}')
+    with pytest.raises(RateLimitExceeded):
+        github_client.get_readme('octocat', 'project-3')
+
+    # The request that would have been rejected was never sent
+    assert github.requests == 3
+    assert github.rejected == 0
+
+
+def test_halves_when_quota_runs_low_and_regrows(github_server):
+    base_url, github = github_server(repos=5, limit=40, window=2)
+    github_client = client(base_url, max_concurrency=8, floor=0, max_wait=5, low_water=0.5)
+    governor = github_client.governor
+
+    # Below half of the limit every response halves the concurrency
+    for i in range(24):
+        github_client.get_readme('octocat', f'project-{i % 5}')
+    assert governor.concurrency == 1
+
+    # After the reset the quota is healthy again and it grows one at a time
+    time.sleep(max(0, github.reset_at - time.time()) + 0.1)
+    for i in range(3):
+        github_client.get_readme('octocat', f'project-{i}')
+    assert governor.concurrency == 4
+
+
+@pytest.mark.parametrize('status', [403, 429])
+def test_secondary_limit_is_retried_after_retry_after(github_server, status):
+    base_url, github = github_server(repos=5, secondary_every=3, retry_after=1, secondary_status=status)
+    github_client = client(base_url, max_concurrency=4, floor=0, max_wait=5)
+
+    start = time.time()
+    readmes = [github_client.get_readme('octocat', f'project-{i}') for i in range(4)]
+
+    assert all(readmes)
+    assert github.rejected == 1
+    assert github_client.governor.secondary_limits == 1
+    assert github_client.governor.concurrency < 4
+    assert time.time() - start >= 1
+
+
+@pytest.mark.parametrize('status', [403, 429])
+def test_raises_when_retries_are_exhausted(github_server, status):
+    base_url, github = github_server(repos=5, secondary_every=1, retry_after=1, secondary_status=status)
+    github_client = client(base_url, floor=0, max_wait=5)
+
+    start = time.time()
+    # Not reported as "no README"
+    with pytest.raises(RateLimitExceeded):
+        github_client.get_readme('octocat', 'project-0')
+
+    # Every rejection went through the governor: one request per attempt and
+    # only its pauses between them, none slept inside the HTTP layer
+    assert github.requests == github.rejected == 3
+    assert time.time() - start < 3
@@ -0,0 +1,112 @@
+"""Batched summarization, its per-README fallback and deadline handling"""
+
+import pytest
+
+from api_clients import TIMEOUTS
+from db_client import DBClient
+
+READMES = {f'key{i}': f'# project-{i}\n\nREADME of project {i}.' for i in range(3)}
+
+
+class Context:
+    """Lambda context with a fixed amount of time left"""
+
+    def __init__(self, remaining_ms):
+        self.remaining_ms = remaining_ms
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining_ms
+
+
+@pytest.fixture
+def anthropic(github_sync, anthropic_server, monkeypatch):
+    """Point github_sync at an Anthropic stub started with the given options"""
+    def start(**options):
+        anthropic_url, state = anthropic_server(**options)
+        monkeypatch.setattr(github_sync, 'ANTHROPIC_API_URL', anthropic_url)
+        return state
+
+    return start
+
+
+def test_one_request_per_batch(github_sync, anthropic):
+    state = anthropic()
+    results = github_sync.summarize_batch(READMES, 'sk-test')
+
+    assert set(results) == set(READMES)
+    assert state.stats() == {'requests': 1, 'batched_requests': 1, 'entries': 3}
+
+    # Sent under short ordinal ids and mapped back to the keys
+    assert state.batch_ids == [['1', '2', '3']]
+    assert results['key1'][0] == 'Stub summary of 2.'
+
+
+def test_single_readme_is_not_batched(github_sync, anthropic):
+    state = anthropic()
+    results = github_sync.summarize_batch({'key0': READMES['key0']}, 'sk-test')
+
+    assert results['key0'][0] != github_sync.SUMMARY_FAILED
+    assert state.stats()['batched_requests'] == 0
+
+
+def test_dropped_entries_fall_back_to_single_requests(github_sync, anthropic):
+    state = anthropic(drop_rate=1.0)
+    results = github_sync.summarize_batch(READMES, 'sk-test')
+
+    assert set(results) == set(READMES)
+    assert all(high_level != github_sync.SUMMARY_FAILED for high_level, _ in results.values())
+    assert state.stats()['requests'] == 1 + len(READMES)
+
+
+def test_garbled_replies_are_reported_as_failed(github_sync, anthropic):
+    state = anthropic(garble_rate=1.0)
+    results = github_sync.summarize_batch(READMES, 'sk-test')
+
+    assert results == {key: (github_sync.SUMMARY_FAILED,) * 2 for key in READMES}
+    assert state.stats()['requests'] == 1 + len(READMES)
+
+
+def test_pack_respects_entry_limit_and_token_budget(github_sync, monkeypatch):
+    monkeypatch.setattr(github_sync, 'SUMMARY_BATCH_MAX', 2)
+    monkeypatch.setattr(github_sync, 'SUMMARY_BATCH_TOKEN_BUDGET', 600)
+    readmes = {'a': 'x' * 400, 'b': 'x' * 400, 'c': 'x' * 400, 'big': 'x' * 4000, 'd': 'x' * 40}
+
+    batches = github_sync.pack_summary_batches(readmes)
+
+    assert [list(batch) for batch in batches] == [['a', 'b'], ['c'], ['big'], ['d']]
+
+
+def test_no_request_is_started_without_time(github_sync, anthropic):
+    state = anthropic()
+    results = github_sync.summarize_batch(READMES, 'sk-test', time_left=lambda: 10000)
+
+    assert results == {}
+    assert state.stats()['requests'] == 0
+
+
+def test_batch_is_skipped_when_only_single_requests_fit(github_sync, anthropic):
+    state = anthropic()
+    single_ms = sum(TIMEOUTS['anthropic']) * 1000 + github_sync.WRAP_UP_MS
+    results = github_sync.summarize_batch(READMES, 'sk-test', time_left=lambda: single_ms + 1)
+
+    assert set(results) == set(READMES)
+    assert state.stats() == {'requests': 3, 'batched_requests': 0, 'entries': 3}
+
+
+def test_sync_leaves_unsummarized_repos_pending(github_sync, sync_env, tables, monkeypatch):
+    github, anthropic = sync_env(repos=10)
+    monkeypatch.setattr(github_sync, 'DEADLINE_BUFFER_MS', 0)
+    db_client = DBClient()
+
+    # Enough time to fetch READMEs, not to summarize them
+    assert github_sync.lambda_handler({}, Context(20000))['statusCode'] == 200
+    assert anthropic.stats()['requests'] == 0
+    assert tables.item_count('test-github-repos') == 0
+    assert db_client.get_sync_metadata('github')['last_sync_status'] == 'in_progress'
+    assert len(db_client.get_checkpoint('github')['pending']) == 10
+
+    # The next invocation resumes and finishes them
+    assert github_sync.lambda_handler({}, None)['statusCode'] == 200
+    assert tables.item_count('test-github-repos') == 10
+    assert db_client.get_sync_metadata('github')['last_sync_status'] == 'success'
+    assert db_client.get_checkpoint('github') is None
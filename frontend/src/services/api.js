@@ -5,17 +5,30 @@ const API_BASE_URL = import.meta.env.VITE_API_URL || 'https://your-api-gateway-u
 console.log('[API] Using API Base URL:', API_BASE_URL);
 console.log('[API] VITE_API_URL env var:', import.meta.env.VITE_API_URL);
 
+// No custom request headers: a plain GET is a CORS "simple request", so the
+// browser skips the OPTIONS preflight and can serve/revalidate responses from
+// its HTTP cache using the API's ETag and Cache-Control headers (a 304 from
+// the API surfaces here as a normal 200 with the cached body).
 const api = axios.create({
-  baseURL: API_BASE_URL,
-  headers: {
-    'Content-Type': 'application/json'
-  }
+  baseURL: API_BASE_URL
 });
 
+// Share one request between callers asking for the same URL at the same time
+// (e.g. React StrictMode double effects, quick page switches)
+const inFlight = new Map();
+
+const cachedGet = (url) => {
+  if (!inFlight.has(url)) {
+    const request = api.get(url).finally(() => inFlight.delete(url));
+    inFlight.set(url, request);
+  }
+  return inFlight.get(url);
+};
+
 export const getRepos = async () => {
   console.log('[API] Fetching repos from:', `${API_BASE_URL}/api/repos`);
   try {
-    const response = await api.get('/api/repos');
+    const response = await cachedGet('/api/repos');
     console.log('[API] Repos response:', response.data);
     return response.data;
   } catch (error) {
@@ -25,14 +38,14 @@ export const getRepos = async () => {
 };
 
 export const getRepo = async (id) => {
-  const response = await api.get(`/api/repos/${id}`);
+  const response = await cachedGet(`/api/repos/${id}`);
   return response.data;
 };
 
 export const getPosts = async () => {
   console.log('[API] Fetching posts from:', `${API_BASE_URL}/api/posts`);
   try {
-    const response = await api.get('/api/posts');
+    const response = await cachedGet('/api/posts');
     console.log('[API] Posts response:', response.data);
     return response.data;
   } catch (error) {
@@ -44,7 +57,7 @@ export const getPosts = async () => {
 export const getVideos = async () => {
   console.log('[API] Fetching videos from:', `${API_BASE_URL}/api/videos`);
   try {
-    const response = await api.get('/api/videos');
+    const response = await cachedGet('/api/videos');
     console.log('[API] Videos response:', response.data);
     return response.data;
   } catch (error) {
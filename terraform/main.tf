@@ -69,6 +69,7 @@ module "frontend" {
 #   - medium_posts: Medium blog posts
 #   - youtube_videos: YouTube videos with metadata
 #   - sync_metadata: Tracks sync status and timestamps
+#   - summary_cache: AI summaries keyed by README content hash
 
 module "database" {
   source = "./modules/database"
@@ -128,9 +129,10 @@ module "sync" {
   tags         = local.common_tags
 
   # Content source identifiers
-  github_username    = var.github_username
-  medium_username    = var.medium_username
-  youtube_channel_id = var.youtube_channel_id
+  github_username      = var.github_username
+  github_fetch_backend = var.github_fetch_backend
+  medium_username      = var.medium_username
+  youtube_channel_id   = var.youtube_channel_id
 
   # AWS Secrets Manager ARNs from secrets module
   # Secrets are auto-populated by GitHub Actions during deployment
@@ -147,4 +149,6 @@ module "sync" {
   youtube_videos_table_arn  = module.database.youtube_videos_table_arn
   sync_metadata_table_name  = module.database.sync_metadata_table_name
   sync_metadata_table_arn   = module.database.sync_metadata_table_arn
+  summary_cache_table_name  = module.database.summary_cache_table_name
+  summary_cache_table_arn   = module.database.summary_cache_table_arn
 }
@@ -39,6 +39,7 @@ resource "aws_iam_role_policy" "api_lambda" {
         Effect = "Allow"
         Action = [
           "dynamodb:GetItem",
+          "dynamodb:BatchGetItem",
           "dynamodb:Query",
           "dynamodb:Scan"
         ]
@@ -46,7 +47,10 @@ resource "aws_iam_role_policy" "api_lambda" {
           var.github_repos_table_arn,
           var.medium_posts_table_arn,
           var.youtube_videos_table_arn,
-          var.sync_metadata_table_arn
+          var.sync_metadata_table_arn,
+          "${var.github_repos_table_arn}/index/*",
+          "${var.medium_posts_table_arn}/index/*",
+          "${var.youtube_videos_table_arn}/index/*"
         ]
       }
     ]
@@ -9,6 +9,25 @@ resource "aws_dynamodb_table" "github_repos" {
     type = "S"
   }
 
+  attribute {
+    name = "list_pk"
+    type = "S"
+  }
+
+  attribute {
+    name = "stars"
+    type = "N"
+  }
+
+  # Every repo carries list_pk = "repo", so this index holds the whole
+  # collection sorted by stars for cursor-paginated list queries
+  global_secondary_index {
+    name            = "stars-index"
+    hash_key        = "list_pk"
+    range_key       = "stars"
+    projection_type = "ALL"
+  }
+
   ttl {
     attribute_name = "ttl"
     enabled        = false
@@ -28,6 +47,25 @@ resource "aws_dynamodb_table" "medium_posts" {
     type = "S"
   }
 
+  attribute {
+    name = "list_pk"
+    type = "S"
+  }
+
+  attribute {
+    name = "published_date"
+    type = "S"
+  }
+
+  # All posts share list_pk = "post"; sorted by published_date (ISO 8601,
+  # converted from the RSS pubDate by medium_sync) for paging
+  global_secondary_index {
+    name            = "published-index"
+    hash_key        = "list_pk"
+    range_key       = "published_date"
+    projection_type = "ALL"
+  }
+
   tags = var.tags
 }
 
@@ -42,6 +80,24 @@ resource "aws_dynamodb_table" "youtube_videos" {
     type = "S"
   }
 
+  attribute {
+    name = "list_pk"
+    type = "S"
+  }
+
+  attribute {
+    name = "published_date"
+    type = "S"
+  }
+
+  # All videos share list_pk = "video"; sorted by published_date for paging
+  global_secondary_index {
+    name            = "published-index"
+    hash_key        = "list_pk"
+    range_key       = "published_date"
+    projection_type = "ALL"
+  }
+
   tags = var.tags
 }
 
@@ -56,5 +112,33 @@ resource "aws_dynamodb_table" "sync_metadata" {
     type = "S"
   }
 
+  # Conditional request cache entries (http_cache#...) carry expires_at;
+  # sync records, checkpoints and snapshots don't, so they never expire
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
+  tags = var.tags
+}
+
+# AI Summary Cache Table
+# Summaries keyed by a hash of the README text, model and prompt version, so
+# identical READMEs are only ever summarized once. Entries expire via TTL.
+resource "aws_dynamodb_table" "summary_cache" {
+  name         = "${var.project_name}-summary-cache-${var.environment}"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "summary_key"
+
+  attribute {
+    name = "summary_key"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+
   tags = var.tags
 }
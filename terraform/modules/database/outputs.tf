@@ -37,3 +37,13 @@ output "sync_metadata_table_arn" {
   description = "Sync metadata table ARN"
   value       = aws_dynamodb_table.sync_metadata.arn
 }
+
+output "summary_cache_table_name" {
+  description = "AI summary cache table name"
+  value       = aws_dynamodb_table.summary_cache.name
+}
+
+output "summary_cache_table_arn" {
+  description = "AI summary cache table ARN"
+  value       = aws_dynamodb_table.summary_cache.arn
+}
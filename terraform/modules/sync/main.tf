@@ -39,7 +39,10 @@ resource "aws_iam_role_policy" "sync_lambda" {
         Action = [
           "dynamodb:PutItem",
           "dynamodb:GetItem",
+          "dynamodb:BatchGetItem",
+          "dynamodb:BatchWriteItem",
           "dynamodb:UpdateItem",
+          "dynamodb:DeleteItem",
           "dynamodb:Query",
           "dynamodb:Scan"
         ]
@@ -47,7 +50,8 @@ resource "aws_iam_role_policy" "sync_lambda" {
           var.github_repos_table_arn,
           var.medium_posts_table_arn,
           var.youtube_videos_table_arn,
-          var.sync_metadata_table_arn
+          var.sync_metadata_table_arn,
+          var.summary_cache_table_arn
         ]
       },
       {
@@ -60,6 +64,33 @@ resource "aws_iam_role_policy" "sync_lambda" {
           var.youtube_api_key_secret_arn,
           var.ai_api_key_secret_arn
         ]
+      },
+      {
+        # BatchGetSecretValue is authorized on "*"; each secret it returns is
+        # still checked against the GetSecretValue statement above
+        Effect = "Allow"
+        Action = [
+          "secretsmanager:BatchGetSecretValue"
+        ]
+        Resource = "*"
+      }
+    ]
+  })
+}
+
+# Lets a github_sync run that hits its deadline invoke itself to resume from
+# the checkpoint (see SYNC_SELF_INVOKE)
+resource "aws_iam_role_policy" "github_sync_continuation" {
+  name = "${var.project_name}-github-sync-continuation"
+  role = aws_iam_role.sync_lambda.id
+
+  policy = jsonencode({
+    Version = "2012-10-17"
+    Statement = [
+      {
+        Effect   = "Allow"
+        Action   = ["lambda:InvokeFunction"]
+        Resource = aws_lambda_function.github_sync.arn
       }
     ]
   })
@@ -121,11 +152,14 @@ resource "aws_lambda_function" "github_sync" {
 
   environment {
     variables = {
-      GITHUB_USERNAME     = var.github_username
-      GITHUB_TOKEN_SECRET = var.github_token_secret_arn
-      AI_API_KEY_SECRET   = var.ai_api_key_secret_arn
-      GITHUB_REPOS_TABLE  = var.github_repos_table_name
-      SYNC_METADATA_TABLE = var.sync_metadata_table_name
+      GITHUB_USERNAME      = var.github_username
+      GITHUB_TOKEN_SECRET  = var.github_token_secret_arn
+      AI_API_KEY_SECRET    = var.ai_api_key_secret_arn
+      GITHUB_REPOS_TABLE   = var.github_repos_table_name
+      SYNC_METADATA_TABLE  = var.sync_metadata_table_name
+      SUMMARY_CACHE_TABLE  = var.summary_cache_table_name
+      SYNC_SELF_INVOKE     = "true"
+      GITHUB_FETCH_BACKEND = var.github_fetch_backend
     }
   }
 
@@ -13,6 +13,12 @@ variable "github_username" {
   type        = string
 }
 
+variable "github_fetch_backend" {
+  description = "How github_sync fetches repos and READMEs: rest or graphql"
+  type        = string
+  default     = "rest"
+}
+
 variable "medium_username" {
   description = "Medium username"
   type        = string
@@ -78,6 +84,16 @@ variable "sync_metadata_table_arn" {
   type        = string
 }
 
+variable "summary_cache_table_name" {
+  description = "AI summary cache table name"
+  type        = string
+}
+
+variable "summary_cache_table_arn" {
+  description = "AI summary cache table ARN"
+  type        = string
+}
+
 variable "tags" {
   description = "Common tags"
   type        = map(string)
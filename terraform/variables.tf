@@ -36,6 +36,12 @@ variable "github_username" {
   # No default - must be provided by user
 }
 
+variable "github_fetch_backend" {
+  description = "GitHub fetch backend for the sync: rest (per-repo README calls) or graphql (bulk queries)"
+  type        = string
+  default     = "rest"
+}
+
 variable "medium_username" {
   description = "Medium username for fetching blog posts via RSS"
   type        = string